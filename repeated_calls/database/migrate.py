@@ -2,12 +2,14 @@
 
 import argparse
 import os
+from datetime import date
 
 import pandas as pd
-from sqlalchemy import insert
+from sqlalchemy import insert, text
 from sqlalchemy.orm import Session
 
-from repeated_calls.database import engine, tables
+from repeated_calls.database import engine, partitions, tables
+from repeated_calls.database.settings import RetentionSettings
 from repeated_calls.utils.loggers import Logger
 
 logger = Logger()
@@ -35,6 +37,13 @@ def main(data_path: str):
     metadata.drop_all(engine)
     metadata.create_all(engine)
 
+    # Create the default partition and those of the coming months, also without a seed file
+    today = date.today()
+    with engine.begin() as conn:
+        partitions.create_partitions(
+            conn, today, partitions.add_months(today, RetentionSettings().months_ahead)
+        )
+
     # Load data from CSV files into the database
     for t in metadata.sorted_tables:
         path = os.path.join(abs_path, f"{t.name}.csv")
@@ -44,7 +53,16 @@ def main(data_path: str):
 
         logger.info(f"Inserting data {path} -> {t.name}")
         df = pd.read_csv(path)
-        records = df.to_dict(orient="records")
+        if t.name == partitions.PARTITIONED_TABLE:
+            # Create the monthly partitions covering the data
+            start_times = pd.to_datetime(df["start_time"])
+            with engine.begin() as conn:
+                partitions.create_partitions(
+                    conn, start_times.min().date(), start_times.max().date()
+                )
+
+        # Empty cells (e.g. the end of an ongoing outage) are read as NaN, insert them as NULL
+        records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
 
         with Session(engine) as session:
             try:
@@ -55,6 +73,26 @@ def main(data_path: str):
             else:
                 session.commit()
 
+    # The CSV files contain explicit IDs, move the ID sequences past them so rows inserted later
+    # (e.g. ingested call events) get fresh IDs
+    with engine.begin() as conn:
+        reset_sequences(conn, metadata)
+
+
+def reset_sequences(conn, metadata) -> None:
+    """Set the sequence of every serial `id` column to the highest ID in its table."""
+    for t in metadata.sorted_tables:
+        if "id" not in t.c or not t.c.id.autoincrement:
+            continue
+        conn.execute(
+            text(
+                f"SELECT setval(seq, max_id, max_id IS NOT NULL) "
+                f"FROM pg_get_serial_sequence('public.{t.name}', 'id') AS seq, "
+                f"(SELECT max(id) AS max_id FROM public.{t.name}) AS m "
+                f"WHERE seq IS NOT NULL"
+            )
+        )
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Database migration script.")
@@ -0,0 +1,208 @@
+"""Module for maintaining the monthly partitions of the historic call event table.
+
+The `historic_call_event` table is range partitioned by `start_time`, one partition per calendar
+month, plus a default partition catching rows outside of all monthly ranges. Queries with a
+`start_time` predicate only scan the partitions of the requested months, and each partition keeps
+its own (small) indexes.
+
+Run this module periodically (e.g. daily) to create the partitions of the coming months and to
+detach partitions that fell out of the retention period:
+
+    python -m repeated_calls.database.partitions
+"""
+
+import argparse
+import re
+from datetime import date
+
+from sqlalchemy import Connection, text
+
+from repeated_calls.database import engine, tables
+from repeated_calls.database.settings import RetentionSettings
+from repeated_calls.utils.loggers import Logger
+
+logger = Logger()
+
+PARTITIONED_TABLE = tables.HistoricCallEvent.__tablename__
+DEFAULT_PARTITION = f"{PARTITIONED_TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{PARTITIONED_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(value: date) -> date:
+    """Return the first day of the month of `value`."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Return the first day of the month `months` after the month of `value`."""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Return the name of the partition holding the rows of `month`."""
+    return f"{PARTITIONED_TABLE}_p{month:%Y%m}"
+
+
+def list_partitions(conn: Connection) -> dict[str, date]:
+    """Return the monthly partitions attached to the table, mapped to their month."""
+    rows = conn.execute(
+        text(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:table AS regclass)
+            """
+        ),
+        {"table": f"public.{PARTITIONED_TABLE}"},
+    )
+    partitions = {}
+    for (name,) in rows:
+        if match := _PARTITION_NAME.match(name):
+            partitions[name] = date(int(match[1]), int(match[2]), 1)
+    return partitions
+
+
+def create_partitions(conn: Connection, first: date, last: date) -> list[str]:
+    """Create the default partition and the monthly partitions from `first` up to `last`.
+
+    Existing partitions are left untouched. Rows of a new partition's month that the default
+    partition caught are moved into it, within the transaction of `conn`.
+
+    Args:
+        conn (Connection): The database connection.
+        first (date): A day in the first month to create a partition for.
+        last (date): A day in the last month to create a partition for.
+
+    Returns:
+        list[str]: Names of the created monthly partitions.
+    """
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS public.{DEFAULT_PARTITION} "
+            f"PARTITION OF public.{PARTITIONED_TABLE} DEFAULT"
+        )
+    )
+
+    existing = list_partitions(conn)
+    created = []
+    month = month_start(first)
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            _create_partition(conn, name, month)
+            created.append(name)
+        month = add_months(month, 1)
+
+    if created:
+        logger.info(f"Created partitions {created[0]} .. {created[-1]} ({len(created)})")
+    return created
+
+
+def _create_partition(conn: Connection, name: str, month: date) -> None:
+    """Create the partition of `month`, moving its rows out of the default partition.
+
+    Creating a partition fails while the default partition holds rows of its range. The default
+    partition is then detached while the partition is created and the rows are moved into it.
+    """
+    # Bounds are dates formatted by us, DDL does not accept bind parameters
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+    in_range = f"start_time >= '{lower}' AND start_time < '{upper}'"
+    stranded = conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM public.{DEFAULT_PARTITION} WHERE {in_range})")
+    ).scalar()
+    if stranded:
+        conn.execute(
+            text(
+                f"ALTER TABLE public.{PARTITIONED_TABLE} "
+                f"DETACH PARTITION public.{DEFAULT_PARTITION}"
+            )
+        )
+
+    conn.execute(
+        text(
+            f"CREATE TABLE public.{name} PARTITION OF public.{PARTITIONED_TABLE} "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        )
+    )
+
+    if stranded:
+        # Generated columns cannot be inserted, they are computed again
+        columns = ", ".join(
+            column.name
+            for column in tables.HistoricCallEvent.__table__.columns
+            if column.computed is None
+        )
+        moved = conn.execute(
+            text(
+                f"WITH moved AS (DELETE FROM public.{DEFAULT_PARTITION} WHERE {in_range} "
+                f"RETURNING {columns}) "
+                f"INSERT INTO public.{name} ({columns}) SELECT {columns} FROM moved"
+            )
+        ).rowcount
+        conn.execute(
+            text(
+                f"ALTER TABLE public.{PARTITIONED_TABLE} "
+                f"ATTACH PARTITION public.{DEFAULT_PARTITION} DEFAULT"
+            )
+        )
+        logger.info(f"Moved {moved} row(s) from {DEFAULT_PARTITION} to {name}")
+
+
+def apply_retention(
+    conn: Connection,
+    months: int,
+    today: date | None = None,
+    archive_schema: str = "archive",
+    drop: bool = False,
+) -> list[str]:
+    """Detach the monthly partitions older than the retention period.
+
+    Args:
+        conn (Connection): The database connection.
+        months (int): Number of months, including the current one, to keep.
+        today (date | None): Reference date, defaults to today.
+        archive_schema (str): Schema the detached partitions are moved to.
+        drop (bool): Whether to drop the detached partitions instead of archiving them.
+
+    Returns:
+        list[str]: Names of the detached partitions.
+    """
+    cutoff = add_months(today or date.today(), -(months - 1))
+    expired = sorted(name for name, month in list_partitions(conn).items() if month < cutoff)
+    if expired and not drop:
+        conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+
+    for name in expired:
+        conn.execute(text(f"ALTER TABLE public.{PARTITIONED_TABLE} DETACH PARTITION public.{name}"))
+        if drop:
+            conn.execute(text(f"DROP TABLE public.{name}"))
+            logger.info(f"Detached and dropped partition {name}")
+        else:
+            conn.execute(text(f"ALTER TABLE public.{name} SET SCHEMA {archive_schema}"))
+            logger.info(f"Detached partition {name} to schema {archive_schema}")
+    return expired
+
+
+def main(settings: RetentionSettings) -> None:
+    """Create the partitions of the coming months and apply the retention period."""
+    today = date.today()
+    with engine.begin() as conn:
+        create_partitions(conn, today, add_months(today, settings.months_ahead))
+        apply_retention(conn, settings.months, today, settings.archive_schema, settings.drop)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Historic call event partition maintenance.")
+    parser.add_argument("--months", type=int, help="Number of months to keep.")
+    parser.add_argument("--months-ahead", type=int, help="Number of future partitions to create.")
+    parser.add_argument("--drop", action="store_true", help="Drop old partitions, not archive.")
+    args = parser.parse_args()
+
+    overrides = {
+        "months": args.months,
+        "months_ahead": args.months_ahead,
+        "drop": args.drop or None,
+    }
+    main(RetentionSettings(**{k: v for k, v in overrides.items() if v is not None}))
@@ -181,3 +181,53 @@ class SoftwareUpdate(BaseModel):
         with open(file_path, mode="r", encoding="utf-8") as f:
             reader = csv.DictReader(f)
             return [SoftwareUpdate(**row) for row in reader]
+
+
+class Outage(BaseModel):
+    """An outage of a product service."""
+
+    id: int = Field(..., description="Outage ID")
+    product_id: int = Field(..., description="Product ID")
+    description: str = Field(..., description="Description of the outage")
+    start_time: datetime = Field(..., description="Outage start time")
+    end_time: datetime | None = Field(None, description="Outage end time, empty while ongoing")
+
+    def is_active(self, at: datetime) -> bool:
+        """Whether the outage was active at `at`."""
+        return self.start_time <= at and (self.end_time is None or at < self.end_time)
+
+    @staticmethod
+    def from_csv(file_path: str) -> list["Outage"]:
+        """Load a collection of items from a CSV file.
+
+        Args:
+            file_path (str): Path to the CSV file.
+        """
+        with open(file_path, mode="r", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            return [Outage(**{k: v or None for k, v in row.items()}) for row in reader]
+
+
+class KnownBug(BaseModel):
+    """A known bug in a product."""
+
+    id: int = Field(..., description="Bug ID")
+    product_id: int = Field(..., description="Product ID")
+    description: str = Field(..., description="Description of the bug")
+    reported_at: datetime = Field(..., description="Time the bug was reported")
+    resolved_at: datetime | None = Field(None, description="Bug resolution time, empty if open")
+
+    def is_active(self, at: datetime) -> bool:
+        """Whether the bug was known and unresolved at `at`."""
+        return self.reported_at <= at and (self.resolved_at is None or at < self.resolved_at)
+
+    @staticmethod
+    def from_csv(file_path: str) -> list["KnownBug"]:
+        """Load a collection of items from a CSV file.
+
+        Args:
+            file_path (str): Path to the CSV file.
+        """
+        with open(file_path, mode="r", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            return [KnownBug(**{k: v or None for k, v in row.items()}) for row in reader]
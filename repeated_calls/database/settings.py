@@ -19,6 +19,26 @@ class DatabaseSettings(BaseSettings):
         password (SecretStr): The password to connect to the PostgreSQL server.
         database (str): The name of the database to connect to.
         port (int): The port number of the PostgreSQL server. Defaults to 5432.
+        prepared_statements (bool): Whether queries are sent as named server-side prepared
+            statements. Disable when connecting through a transaction-pooling proxy (e.g. PgBouncer
+            in transaction mode). Defaults to `True`.
+        prepare_threshold (int): Number of times a query must be executed on a connection before it
+            is prepared. `0` prepares every query on its first execution. Defaults to 0.
+        prepared_max (int): Maximum number of prepared statements cached per connection. Defaults
+            to 100.
+        pool_min_size (int): Minimum number of connections kept open by a connection pool. Defaults
+            to 5.
+        pool_max_size (int): Maximum number of connections a connection pool may open. Defaults to
+            20.
+        pool_timeout (float): Seconds a client waits for a pool connection before failing. Defaults
+            to 30.
+        pool_max_idle (float): Seconds a connection above `pool_min_size` may stay unused before it
+            is closed. Defaults to 600.
+        pool_max_lifetime (float): Seconds after which a connection is replaced, to spread out
+            reconnects and pick up server-side changes. Defaults to 3600.
+        pool_check_connection (bool): Whether a connection is checked with a round trip before it is
+            handed out, discarding connections broken by e.g. a server restart or idle timeout.
+            Defaults to `False`.
     """
 
     host: str
@@ -26,7 +46,45 @@ class DatabaseSettings(BaseSettings):
     password: SecretStr
     database: str
     port: int = 5432
+    prepared_statements: bool = True
+    prepare_threshold: int = 0
+    prepared_max: int = 100
+    pool_min_size: int = 5
+    pool_max_size: int = 20
+    pool_timeout: float = 30.0
+    pool_max_idle: float = 600.0
+    pool_max_lifetime: float = 3600.0
+    pool_check_connection: bool = False
 
     model_config = SettingsConfigDict(
         env_nested_delimiter="__", env_file=".env", env_prefix="POSTGRES_", extra="ignore"
     )
+
+
+class RetentionSettings(BaseSettings):
+    """Configuration for the monthly partitions of the historic call events.
+
+    Pydantic will determine the values of all fields in the following order of precedence
+    (descending order of priority):
+    1. Arguments passed to the class constructor
+    2. Environment variables (prefixed with `HISTORY_RETENTION_`)
+    3. Variables in a .env file if present (prefixed with `HISTORY_RETENTION_`)
+
+    Attributes:
+        months (int): Number of months, including the current one, kept in the historic call event
+            table. Older partitions are detached by the retention job. Defaults to 24.
+        months_ahead (int): Number of future monthly partitions created in advance, so incoming
+            calls never land in the default partition. Defaults to 3.
+        archive_schema (str): Schema detached partitions are moved to. Defaults to `archive`.
+        drop (bool): Whether detached partitions are dropped instead of archived. Defaults to
+            `False`.
+    """
+
+    months: int = 24
+    months_ahead: int = 3
+    archive_schema: str = "archive"
+    drop: bool = False
+
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__", env_file=".env", env_prefix="HISTORY_RETENTION_", extra="ignore"
+    )
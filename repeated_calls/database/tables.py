@@ -1,8 +1,23 @@
 """This module defines the database tables using SQLAlchemy ORM."""
 
 from datetime import date, datetime
-
-from sqlalchemy import Date, DateTime, Float, ForeignKey, Integer, String
+from typing import Optional
+
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Computed,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    event,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -25,6 +40,7 @@ class Subscription(Base):
     """Subscription table."""
 
     __tablename__ = "subscription"
+    __table_args__ = (Index("ix_subscription_customer_id_product_id", "customer_id", "product_id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     customer_id: Mapped[int] = mapped_column(Integer(), ForeignKey("customer.id"))
@@ -50,13 +66,119 @@ class HistoricCallEvent(Base):
     """Historic call event table."""
 
     __tablename__ = "historic_call_event"
+    __table_args__ = (
+        # Serves the per-customer history lookups: newest first, bounded by time and keyset cursor
+        Index("ix_historic_call_event_customer_id_start_time", "customer_id", "start_time", "id"),
+        # Full-text search over the call reason and summary, e.g. to find similar earlier calls
+        Index("ix_historic_call_event_search_vector", "search_vector", postgresql_using="gin"),
+        # One history entry per ingested call event, makes the ingestion idempotent
+        Index("ux_historic_call_event_call_event_id", "call_event_id", "start_time", unique=True),
+        # Monthly partitions by start time, maintained by repeated_calls.database.partitions
+        {"postgresql_partition_by": "RANGE (start_time)"},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     customer_id: Mapped[int] = mapped_column(Integer(), ForeignKey("customer.id"))
     sdc: Mapped[str] = mapped_column(String())
     call_summary: Mapped[str] = mapped_column(String())
-    start_time: Mapped[datetime] = mapped_column(DateTime())
+    # Part of the primary key, as unique constraints on a partitioned table must include the
+    # partition key
+    start_time: Mapped[datetime] = mapped_column(DateTime(), primary_key=True)
     end_time: Mapped[datetime] = mapped_column(DateTime())
+    # The call event this entry was ingested from, empty for history loaded from other sources
+    call_event_id: Mapped[Optional[int]] = mapped_column(
+        Integer(), ForeignKey("call_event.id"), nullable=True
+    )
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR(),
+        Computed(
+            "setweight(to_tsvector('english', coalesce(sdc, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(call_summary, '')), 'B')",
+            persisted=True,
+        ),
+    )
+
+
+class CustomerCallStats(Base):
+    """Per-customer call statistics, maintained by a trigger on `historic_call_event`."""
+
+    __tablename__ = "customer_call_stats"
+
+    customer_id: Mapped[int] = mapped_column(ForeignKey("customer.id"), primary_key=True)
+    total_calls: Mapped[int] = mapped_column(Integer())
+    first_call_at: Mapped[datetime] = mapped_column(DateTime())
+    last_call_at: Mapped[datetime] = mapped_column(DateTime())
+    last_call_id: Mapped[int] = mapped_column(Integer())
+    # Start times of the calls in the 30 days up to `last_call_at`, newest first
+    recent_call_times: Mapped[list[datetime]] = mapped_column(ARRAY(DateTime()))
+
+
+# Upsert the statistics of the customer for every inserted historic call event
+event.listen(
+    HistoricCallEvent.__table__,
+    "after_create",
+    DDL(
+        """
+        CREATE OR REPLACE FUNCTION public.update_customer_call_stats() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO public.customer_call_stats AS s (
+                customer_id, total_calls, first_call_at, last_call_at, last_call_id,
+                recent_call_times
+            )
+            VALUES (
+                NEW.customer_id, 1, NEW.start_time, NEW.start_time, NEW.id, ARRAY[NEW.start_time]
+            )
+            ON CONFLICT (customer_id) DO UPDATE SET
+                total_calls = s.total_calls + 1,
+                first_call_at = LEAST(s.first_call_at, EXCLUDED.first_call_at),
+                last_call_at = GREATEST(s.last_call_at, EXCLUDED.last_call_at),
+                last_call_id = CASE
+                    WHEN EXCLUDED.last_call_at >= s.last_call_at THEN EXCLUDED.last_call_id
+                    ELSE s.last_call_id
+                END,
+                recent_call_times = ARRAY(
+                    SELECT t
+                    FROM unnest(s.recent_call_times || EXCLUDED.recent_call_times) AS t
+                    WHERE t >= GREATEST(s.last_call_at, EXCLUDED.last_call_at) - interval '30 days'
+                    ORDER BY t DESC
+                );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        CREATE TRIGGER trg_historic_call_event_customer_call_stats
+        AFTER INSERT ON public.historic_call_event
+        FOR EACH ROW EXECUTE FUNCTION public.update_customer_call_stats();
+        """
+    ).execute_if(dialect="postgresql"),
+)
+
+
+class CallEventClaim(Base):
+    """Claims of the call events being processed, so each is processed by one worker at a time."""
+
+    __tablename__ = "call_event_claim"
+
+    call_event_id: Mapped[int] = mapped_column(Integer(), primary_key=True, autoincrement=False)
+    # The Service Bus message the call event was received in
+    message_id: Mapped[Optional[str]] = mapped_column(String(), nullable=True)
+    # Identifies the claim, so a worker only releases its own
+    token: Mapped[str] = mapped_column(String())
+    # A claim of a worker that died can be taken over after this time
+    claimed_until: Mapped[datetime] = mapped_column(DateTime())
+
+
+class Checkpoint(Base):
+    """Checkpoints of the runs in progress, to resume a run after a crash."""
+
+    __tablename__ = "checkpoint"
+
+    call_event_id: Mapped[int] = mapped_column(Integer(), primary_key=True, autoincrement=False)
+    # The last completed step of the run
+    step: Mapped[str] = mapped_column(String())
+    # The process state after that step
+    state: Mapped[dict] = mapped_column(JSONB())
+    saved_at: Mapped[datetime] = mapped_column(DateTime())
 
 
 class Product(Base):
@@ -86,8 +208,81 @@ class SoftwareUpdate(Base):
     """Software update table."""
 
     __tablename__ = "software_update"
+    __table_args__ = (
+        # Serves the lookup of updates rolled out on a product shortly before a call
+        Index("ix_software_update_product_id_rollout_date", "product_id", "rollout_date"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     product_id: Mapped[int] = mapped_column(Integer(), ForeignKey("product.id"))
     rollout_date: Mapped[date] = mapped_column(Date())
     type: Mapped[str] = mapped_column(String())
+
+
+class Outage(Base):
+    """Outage table, an outage without `end_time` is ongoing."""
+
+    __tablename__ = "outage"
+    __table_args__ = (
+        # GiST index on the outage period, serves "which outages were active at time T" lookups
+        Index("ix_outage_period", text("tsrange(start_time, end_time)"), postgresql_using="gist"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    product_id: Mapped[int] = mapped_column(Integer(), ForeignKey("product.id"))
+    description: Mapped[str] = mapped_column(String())
+    start_time: Mapped[datetime] = mapped_column(DateTime())
+    end_time: Mapped[Optional[datetime]] = mapped_column(DateTime(), nullable=True)
+
+
+class KnownBug(Base):
+    """Known bug table, a bug without `resolved_at` is still open."""
+
+    __tablename__ = "known_bug"
+    __table_args__ = (
+        # GiST index on the period a bug was open, serves "which bugs were open at time T" lookups
+        Index(
+            "ix_known_bug_period",
+            text("tsrange(reported_at, resolved_at)"),
+            postgresql_using="gist",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    product_id: Mapped[int] = mapped_column(Integer(), ForeignKey("product.id"))
+    description: Mapped[str] = mapped_column(String())
+    reported_at: Mapped[datetime] = mapped_column(DateTime())
+    resolved_at: Mapped[Optional[datetime]] = mapped_column(DateTime(), nullable=True)
+
+
+class Advice(Base):
+    """Advice table, the outcome of every processed call event."""
+
+    __tablename__ = "advice"
+    __table_args__ = (
+        # Serves the lookup of the latest advice of a customer
+        Index("ix_advice_customer_id_created_at", "customer_id", "created_at"),
+        # Serves the check whether a redelivered call event was already processed
+        Index("ix_advice_call_event_id_created_at", "call_event_id", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    # No foreign key to `call_event`, as the call event may be written after its advice
+    call_event_id: Mapped[int] = mapped_column(Integer())
+    customer_id: Mapped[int] = mapped_column(Integer(), ForeignKey("customer.id"))
+    product_id: Mapped[Optional[int]] = mapped_column(
+        Integer(), ForeignKey("product.id"), nullable=True
+    )
+    call_timestamp: Mapped[datetime] = mapped_column(DateTime())
+    is_repeated_call: Mapped[Optional[bool]] = mapped_column(Boolean(), nullable=True)
+    repeated_call_conclusion: Mapped[Optional[str]] = mapped_column(String(), nullable=True)
+    is_relevant: Mapped[Optional[bool]] = mapped_column(Boolean(), nullable=True)
+    cause_conclusion: Mapped[Optional[str]] = mapped_column(String(), nullable=True)
+    advice: Mapped[Optional[str]] = mapped_column(String(), nullable=True)
+    # Whether the reviewer approved the advice, not when the chat ended or timed out without it
+    approved: Mapped[Optional[bool]] = mapped_column(Boolean(), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime())
+    # The Service Bus message the call event was received in
+    message_id: Mapped[Optional[str]] = mapped_column(String(), nullable=True)
+    # The complete process state, returned when the call event is delivered again
+    state: Mapped[Optional[dict]] = mapped_column(JSONB(), nullable=True)
@@ -1,8 +1,14 @@
 """Database utilities for managing PostgreSQL connection pool and executing queries."""
 
-from typing import Any, Dict, Iterable, List
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Iterable, List, Optional
 
+import psycopg
 import psycopg_pool
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+from starlette.applications import Starlette
 
 from repeated_calls.database.settings import DatabaseSettings
 from repeated_calls.utils.loggers import Logger
@@ -10,6 +16,20 @@ from repeated_calls.utils.loggers import Logger
 logger = Logger()
 settings = DatabaseSettings()
 
+_shared_pool: Optional[psycopg_pool.AsyncConnectionPool] = None
+_shared_pool_lock = asyncio.Lock()
+
+
+async def configure_connection(conn: psycopg.AsyncConnection) -> None:
+    """Apply the prepared statement policy to a freshly opened pool connection.
+
+    Every DAO query is a static, parametrised statement, so psycopg can prepare it once per
+    connection under a name (`_pg3_<n>`) and afterwards only send the statement name and the
+    parameters. Setting `prepare_threshold` to `None` disables preparing altogether.
+    """
+    conn.prepare_threshold = settings.prepare_threshold if settings.prepared_statements else None
+    conn.prepared_max = settings.prepared_max
+
 
 async def create_pool() -> psycopg_pool.AsyncConnectionPool:
     """Create a global async connection-pool with retry policy."""
@@ -22,22 +42,182 @@ async def create_pool() -> psycopg_pool.AsyncConnectionPool:
             f"user={settings.user} "
             f"password={settings.password.get_secret_value()}"
         ),
-        min_size=5,
-        max_size=20,
-        timeout=30,
+        min_size=settings.pool_min_size,
+        max_size=settings.pool_max_size,
+        timeout=settings.pool_timeout,
+        max_idle=settings.pool_max_idle,
+        max_lifetime=settings.pool_max_lifetime,
+        check=(
+            psycopg_pool.AsyncConnectionPool.check_connection
+            if settings.pool_check_connection
+            else None
+        ),
+        configure=configure_connection,
+        open=False,
     )
     await pool.open()  # first connect happens at start-up
     return pool
 
 
+async def get_shared_pool(pool_name: str) -> psycopg_pool.AsyncConnectionPool:
+    """Return the process-wide connection pool, opening it on first use.
+
+    FastMCP enters the server lifespan once per client session (every SSE connection), so creating
+    the pool there would open a separate pool per connected client. Sharing one pool per process
+    keeps the number of database connections bounded by the configured pool size per replica.
+
+    Args:
+        pool_name: Name used for the pool metrics, e.g. `customer`.
+    """
+    global _shared_pool
+    async with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = await create_pool()
+            register_pool_metrics(_shared_pool, pool_name)
+    return _shared_pool
+
+
+async def close_shared_pool() -> None:
+    """Close the process-wide connection pool, if it was opened."""
+    global _shared_pool
+    async with _shared_pool_lock:
+        if _shared_pool is not None:
+            logger.info("Closing PostgreSQL connection-pool")
+            await _shared_pool.close()
+            _shared_pool = None
+
+
+def close_pool_on_shutdown(app: Starlette) -> Starlette:
+    """Close the process-wide connection pool when the ASGI `app` shuts down.
+
+    The FastMCP lifespan only spans a client session, so the pool shared by all sessions is closed
+    by the lifespan of the app instead.
+    """
+    app_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        async with app_lifespan(app) as state:
+            try:
+                yield state
+            finally:
+                await close_shared_pool()
+
+    app.router.lifespan_context = lifespan
+    return app
+
+
+def pool_stats(pool: psycopg_pool.AsyncConnectionPool) -> Dict[str, Any]:
+    """Return a snapshot of the pool health counters.
+
+    Gauges (`pool_size`, `pool_available`, `requests_waiting`, ...) reflect the current state,
+    counters (`requests_num`, `requests_wait_ms`, `connections_errors`, ...) are cumulative since
+    the pool was opened. See the psycopg_pool documentation for the meaning of each key.
+    """
+    stats = pool.get_stats()  # counters that never fired are omitted
+    keys = (
+        "pool_min",
+        "pool_max",
+        "pool_size",
+        "pool_available",
+        "requests_waiting",
+        "requests_num",
+        "requests_queued",
+        "requests_wait_ms",
+        "requests_errors",
+        "usage_ms",
+        "returns_bad",
+        "connections_num",
+        "connections_ms",
+        "connections_errors",
+        "connections_lost",
+    )
+    snapshot = {key: stats.get(key, 0) for key in keys}
+    snapshot["connections_in_use"] = snapshot["pool_size"] - snapshot["pool_available"]
+    queued = snapshot["requests_queued"]
+    snapshot["avg_wait_ms"] = round(snapshot["requests_wait_ms"] / queued, 2) if queued else 0.0
+    return snapshot
+
+
+def register_pool_metrics(pool: psycopg_pool.AsyncConnectionPool, pool_name: str) -> None:
+    """Export the pool health counters as OpenTelemetry metrics.
+
+    The instruments are observed on every collection cycle of the configured meter provider; without
+    a meter provider (telemetry not configured) they are no-ops.
+
+    Args:
+        pool: The pool to observe.
+        pool_name: Value of the `db.client.connection.pool.name` attribute.
+    """
+    meter = metrics.get_meter("repeated_calls.mcp_server")
+    attrs = {"db.client.connection.pool.name": pool_name}
+
+    def observe(*keys: str, **extra: str):
+        def callback(options: CallbackOptions) -> Iterable[Observation]:
+            stats = pool_stats(pool)
+            return [Observation(sum(stats[k] for k in keys), {**attrs, **extra})]
+
+        return callback
+
+    meter.create_observable_up_down_counter(
+        "db.client.connection.count",
+        callbacks=[
+            observe("connections_in_use", **{"db.client.connection.state": "used"}),
+            observe("pool_available", **{"db.client.connection.state": "idle"}),
+        ],
+        unit="{connection}",
+        description="Number of connections in the pool by state",
+    )
+    meter.create_observable_up_down_counter(
+        "db.client.connection.max",
+        callbacks=[observe("pool_max")],
+        unit="{connection}",
+        description="Maximum number of connections the pool may open",
+    )
+    meter.create_observable_up_down_counter(
+        "db.client.connection.pending_requests",
+        callbacks=[observe("requests_waiting")],
+        unit="{request}",
+        description="Number of clients currently waiting for a connection",
+    )
+    meter.create_observable_counter(
+        "db.client.connection.wait_time.total",
+        callbacks=[observe("requests_wait_ms")],
+        unit="ms",
+        description="Total time clients spent waiting for a connection",
+    )
+    meter.create_observable_counter(
+        "db.client.connection.timeouts",
+        callbacks=[observe("requests_errors")],
+        unit="{request}",
+        description="Number of connection requests that timed out or were rejected",
+    )
+    meter.create_observable_counter(
+        "db.client.connection.errors",
+        callbacks=[observe("connections_errors", "connections_lost", "returns_bad")],
+        unit="{connection}",
+        description="Number of failed connection attempts and connections discarded as broken",
+    )
+
+
 async def fetch_dicts(
     pool: psycopg_pool.AsyncConnectionPool,
     sql: str,
     params: Iterable[Any] | tuple = (),
+    prepare: bool | None = None,
 ) -> List[Dict[str, Any]]:
-    """Run a query and return every row as a dict (column-name → value)."""
+    """Run a query and return every row as a dict (column-name → value).
+
+    Args:
+        pool: The connection pool to borrow a connection from.
+        sql: The query to execute. Must be a static string with `%s` placeholders, so it maps onto
+            a single prepared statement per connection.
+        params: The query parameters.
+        prepare: Force (`True`) or prevent (`False`) preparing the statement. Defaults to `None`,
+            which applies the connection's `prepare_threshold`.
+    """
     async with pool.connection() as conn, conn.cursor() as cur:
-        await cur.execute(sql, params)
+        await cur.execute(sql, params, prepare=prepare)
         cols = [d[0] for d in cur.description]
         rows = await cur.fetchall()
     return [dict(zip(cols, r)) for r in rows]
@@ -0,0 +1,35 @@
+"""Pydantic models shared by the MCP servers."""
+
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class PoolStats(BaseModel):
+    """Health counters of a database connection pool."""
+
+    pool_min: int = Field(description="Configured minimum number of connections")
+    pool_max: int = Field(description="Configured maximum number of connections")
+    pool_size: int = Field(description="Connections currently managed by the pool")
+    pool_available: int = Field(description="Idle connections ready to be handed out")
+    connections_in_use: int = Field(description="Connections currently lent to a client")
+    requests_waiting: int = Field(description="Clients currently waiting for a connection")
+    requests_num: int = Field(description="Total connection requests")
+    requests_queued: int = Field(description="Requests that had to wait for a connection")
+    requests_wait_ms: int = Field(description="Total time spent waiting for a connection")
+    avg_wait_ms: float = Field(description="Average wait of the queued requests")
+    requests_errors: int = Field(description="Requests that timed out or were rejected")
+    usage_ms: int = Field(description="Total time connections were lent out")
+    returns_bad: int = Field(description="Connections returned in a bad state")
+    connections_num: int = Field(description="Connection attempts to the server")
+    connections_ms: int = Field(description="Total time spent establishing connections")
+    connections_errors: int = Field(description="Failed connection attempts")
+    connections_lost: int = Field(description="Connections found broken and discarded")
+
+
+class PoolStatsResponse(BaseModel):
+    """Response model for connection pool statistics."""
+
+    stats: Optional[PoolStats] = None
+    query_time_ms: float
+    error: Optional[str] = None
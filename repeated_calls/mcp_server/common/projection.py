@@ -0,0 +1,95 @@
+"""Column projection and compact tabular encoding for MCP tool responses.
+
+Tools accept an optional list of `fields` and/or a `compact` flag. The DAO narrows its SELECT
+list to the requested columns and the tool answers with a compact JSON table instead of the
+indented pydantic response:
+
+    {"columns":["id","sdc"],"rows":[[1,"My mower stopped"],[2,"..."]],"count":2}
+
+Metadata that is rarely useful to an agent (`query_time_ms`, a null `error`) is left out.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Annotated, Any, Iterable, List, Optional, Sequence, Type, TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Tool parameters shared by every tool supporting the compact projection mode
+FieldsParam = Annotated[
+    Optional[List[str]],
+    "Optional list of columns to return, e.g. ['id', 'sdc']. The response is then a compact table",
+]
+CompactParam = Annotated[
+    bool, "Return a compact table {columns, rows, count} instead of the full response"
+]
+
+
+def select_columns(
+    fields: Optional[Sequence[str]], allowed: Sequence[str], required: Sequence[str] = ()
+) -> List[str]:
+    """Validate requested fields against the columns a DAO may select.
+
+    Args:
+        fields: Requested columns, `None` selects all `allowed` columns.
+        allowed: Whitelist of selectable columns, in their default order.
+        required: Columns the DAO needs itself (e.g. for a keyset cursor); added when missing.
+
+    Returns:
+        The columns to select. Because every name comes from `allowed`, the resulting SQL is one
+        of a bounded set of static statements.
+
+    Raises:
+        ValueError: If a requested field is not a selectable column.
+    """
+    if not fields:
+        return list(allowed)
+
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown field(s) {unknown}, choose from {list(allowed)}")
+
+    columns = list(dict.fromkeys(fields))  # de-duplicate, keep order
+    return columns + [c for c in required if c not in columns]
+
+
+def to_models(
+    model: Type[ModelT], rows: Iterable[dict], fields: Optional[Sequence[str]]
+) -> List[ModelT]:
+    """Build models from rows; projected rows skip validation as required fields may be absent."""
+    if not fields:
+        return [model(**r) for r in rows]
+    return [model.model_construct(**r) for r in rows]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ", timespec="seconds")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_table(
+    items: Iterable[BaseModel], columns: Sequence[str], error: Optional[str] = None, **extra: Any
+) -> str:
+    """Encode models as a compact JSON table with only `columns`.
+
+    Args:
+        items: The models to encode.
+        columns: The columns to include, in order.
+        error: Optional error message, omitted when `None`.
+        **extra: Additional top-level keys (e.g. `next_cursor`), omitted when `None`.
+    """
+    items = list(items)
+    payload = {
+        "columns": list(columns),
+        "rows": [[getattr(item, c) for c in columns] for item in items],
+        "count": len(items),
+        **{k: v for k, v in extra.items() if v is not None},
+    }
+    if error is not None:
+        payload["error"] = error
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=_default)
@@ -3,10 +3,12 @@
 import asyncio
 
 # ────────────────────────────── std-lib ──────────────────────────────
+import os
 import sys
 import time
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
+from datetime import date, datetime
 from typing import Annotated, AsyncIterator, Optional
 
 # ────────────────────────────── 3rd-party ───────────────────────────
@@ -15,24 +17,38 @@ from dotenv import load_dotenv
 from mcp.server.fastmcp import Context, FastMCP
 
 from repeated_calls.mcp_server.common.auth import check_api_key
-from repeated_calls.mcp_server.common.db import create_pool
+from repeated_calls.mcp_server.common.db import (
+    close_pool_on_shutdown,
+    get_shared_pool,
+    pool_stats,
+)
+from repeated_calls.mcp_server.common.models import PoolStats, PoolStatsResponse
+from repeated_calls.mcp_server.common.projection import CompactParam, FieldsParam, encode_table
 
 # ────────────────────────────── project ─────────────────────────────
+from repeated_calls.mcp_server.customer.dao import advice as advice_dao
 from repeated_calls.mcp_server.customer.dao import call_event as call_event_dao
 from repeated_calls.mcp_server.customer.dao import customer as customer_dao
+from repeated_calls.mcp_server.customer.dao import customer_call_stats as call_stats_dao
 from repeated_calls.mcp_server.customer.dao import discount as discount_dao
+from repeated_calls.mcp_server.customer.dao import eligible_discount as eligible_discount_dao
 from repeated_calls.mcp_server.customer.dao import historic_call_event as hce_dao
 from repeated_calls.mcp_server.customer.dao import product as product_dao
 from repeated_calls.mcp_server.customer.dao import subscription as subscription_dao
 from repeated_calls.mcp_server.customer.models import (
+    AdviceResponse,
     CallEventResponse,
+    CustomerCallStatsResponse,
     CustomerResponse,
     DiscountResponse,
+    EligibleDiscountResponse,
     HistoricCallEventResponse,
     ProductResponse,
+    SimilarHistoricCallEventResponse,
     SubscriptionResponse,
 )
 from repeated_calls.utils.loggers import Logger
+from repeated_calls.utils.otel import configure_telemetry
 
 # ────────────────────────────── runtime set-up ──────────────────────
 if sys.platform == "win32":
@@ -40,6 +56,9 @@ if sys.platform == "win32":
 
 load_dotenv()
 
+if os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING"):
+    configure_telemetry(service_name="repeated-calls-customer-mcp-server")
+
 logger = Logger()
 logger.info("Starting Repeated Calls Customer MCP server")
 
@@ -55,16 +74,13 @@ class AppContext:
 @asynccontextmanager
 async def lifespan(app) -> AsyncIterator[AppContext]:
     """Manage the lifespan of the application context."""
-    pool = await create_pool()
-    try:
-        yield AppContext(pool=pool)
-    finally:
-        await pool.close()
+    # Runs once per client session; all sessions borrow from the same process-wide pool
+    yield AppContext(pool=await get_shared_pool("customer"))
 
 
 # ────────────────────────────── FastMCP init ────────────────────────
 mcp = FastMCP("Repeated Calls Customer Data Service", lifespan=lifespan)
-app = mcp.sse_app
+app = close_pool_on_shutdown(mcp.sse_app())
 
 
 # ────────────────────────────── Tools  ──────────────────────────────
@@ -72,22 +88,29 @@ app = mcp.sse_app
 async def get_call_event(
     customer_id: Annotated[int, "Customer ID, e.g. 42"],
     mcp_api_key: Annotated[str, "MCP API Key for authentication"],
+    fields: FieldsParam = None,
+    compact: CompactParam = False,
     ctx: Context = None,
-) -> CallEventResponse:
+) -> CallEventResponse | str:
     """Fetch the latest call event for a given customer."""
     check_api_key(mcp_api_key)
     start = time.time()
     pool = ctx.request_context.lifespan_context.pool
     try:
-        events = await call_event_dao.latest_by_customer(pool, customer_id)
+        events = await call_event_dao.latest_by_customer(pool, customer_id, fields)
+        error = None if events else f"No call event for customer {customer_id}"
+        if fields or compact:
+            return encode_table(events, fields or call_event_dao.COLUMNS, error=error)
         return CallEventResponse(
             events=events,
             count=len(events),
             query_time_ms=round((time.time() - start) * 1000, 2),
-            error=None if events else f"No call event for customer {customer_id}",
+            error=error,
         )
     except Exception as exc:
         logger.error("get_call_event failed", exc_info=True)
+        if fields or compact:
+            return encode_table([], fields or call_event_dao.COLUMNS, error=str(exc))
         return CallEventResponse(
             events=[],
             count=0,
@@ -96,25 +119,50 @@ async def get_call_event(
         )
 
 
-@mcp.tool(description="List all historic call events for a customer")
+@mcp.tool(
+    description=(
+        "List historic call events for a customer, newest first. Use `since` and `limit` to "
+        "request only the relevant window, and pass `next_cursor` of a response as `cursor` to "
+        "fetch the next page"
+    )
+)
 async def get_historic_call_events(
     customer_id: Annotated[int, "Customer ID"],
     mcp_api_key: Annotated[str, "MCP API Key for authentication"],
+    limit: Annotated[Optional[int], "Optional maximum number of events, at least 1"] = None,
+    since: Annotated[
+        Optional[datetime], "Optional ISO timestamp, only return calls started at or after it"
+    ] = None,
+    cursor: Annotated[
+        Optional[str], "Optional cursor of the page to fetch (`next_cursor` of a response)"
+    ] = None,
+    before: Annotated[
+        Optional[datetime], "Optional ISO timestamp, only return calls started before it"
+    ] = None,
+    fields: FieldsParam = None,
+    compact: CompactParam = False,
     ctx: Context = None,
-) -> HistoricCallEventResponse:
-    """Fetch all historic call events for a given customer."""
+) -> HistoricCallEventResponse | str:
+    """Fetch a page of historic call events for a given customer."""
     check_api_key(mcp_api_key)
     start = time.time()
     pool = ctx.request_context.lifespan_context.pool
     try:
-        events = await hce_dao.all_by_customer(pool, customer_id)
+        events, next_cursor = await hce_dao.all_by_customer(
+            pool, customer_id, limit, since, cursor, fields, before
+        )
+        if fields or compact:
+            return encode_table(events, fields or hce_dao.COLUMNS, next_cursor=next_cursor)
         return HistoricCallEventResponse(
             events=events,
             count=len(events),
+            next_cursor=next_cursor,
             query_time_ms=round((time.time() - start) * 1000, 2),
         )
     except Exception as exc:
         logger.error("get_historic_call_events failed", exc_info=True)
+        if fields or compact:
+            return encode_table([], fields or hce_dao.COLUMNS, error=str(exc))
         return HistoricCallEventResponse(
             events=[],
             count=0,
@@ -123,25 +171,146 @@ async def get_historic_call_events(
         )
 
 
+@mcp.tool(
+    description=(
+        "Find the historic call events whose reason and summary are most similar to a text, e.g. "
+        "the reason of an incoming call. Returns the best matches first with a similarity score"
+    )
+)
+async def find_similar_historic_calls(
+    text: Annotated[str, "Text to compare with, e.g. the reason of the incoming call"],
+    mcp_api_key: Annotated[str, "MCP API Key for authentication"],
+    customer_id: Annotated[Optional[int], "Optional customer ID, defaults to all customers"] = None,
+    limit: Annotated[int, "Maximum number of events to return"] = 5,
+    before: Annotated[
+        Optional[datetime], "Optional ISO timestamp, only return calls started before it"
+    ] = None,
+    since: Annotated[
+        Optional[datetime], "Optional ISO timestamp, only return calls started at or after it"
+    ] = None,
+    ctx: Context = None,
+) -> SimilarHistoricCallEventResponse:
+    """Full-text similarity search over the historic call events."""
+    check_api_key(mcp_api_key)
+    start = time.time()
+    pool = ctx.request_context.lifespan_context.pool
+    try:
+        events = await hce_dao.similar_to(pool, text, customer_id, limit, before, since)
+        return SimilarHistoricCallEventResponse(
+            events=events,
+            count=len(events),
+            query_time_ms=round((time.time() - start) * 1000, 2),
+        )
+    except Exception as exc:
+        logger.error("find_similar_historic_calls failed", exc_info=True)
+        return SimilarHistoricCallEventResponse(
+            events=[],
+            count=0,
+            query_time_ms=round((time.time() - start) * 1000, 2),
+            error=str(exc),
+        )
+
+
+@mcp.tool(
+    description=(
+        "Return call statistics of a customer at a moment (default now): total calls, calls in the "
+        "last 24 hours, 7 days and 30 days, and the hours since the last call"
+    )
+)
+async def get_customer_call_stats(
+    customer_id: Annotated[int, "Customer ID"],
+    mcp_api_key: Annotated[str, "MCP API Key for authentication"],
+    at_timestamp: Annotated[Optional[datetime], "Optional ISO timestamp, e.g. of the call"] = None,
+    ctx: Context = None,
+) -> CustomerCallStatsResponse:
+    """Fetch the incrementally maintained call statistics of a customer."""
+    check_api_key(mcp_api_key)
+    start = time.time()
+    pool = ctx.request_context.lifespan_context.pool
+    try:
+        at = at_timestamp or datetime.now()
+        stats = await call_stats_dao.get_by_customer(pool, customer_id, at)
+        return CustomerCallStatsResponse(
+            stats=stats,
+            query_time_ms=round((time.time() - start) * 1000, 2),
+            error=None if stats else f"No calls of customer {customer_id} before {at}",
+        )
+    except Exception as exc:
+        logger.error("get_customer_call_stats failed", exc_info=True)
+        return CustomerCallStatsResponse(
+            stats=None,
+            query_time_ms=round((time.time() - start) * 1000, 2),
+            error=str(exc),
+        )
+
+
+@mcp.tool(
+    description=(
+        "Return the latest advice for a customer, newest first: whether the call was a repeated "
+        "call, its cause and the advice for the customer service employee"
+    )
+)
+async def get_latest_advice(
+    customer_id: Annotated[int, "Customer ID"],
+    mcp_api_key: Annotated[str, "MCP API Key for authentication"],
+    limit: Annotated[int, "Maximum number of advices to return"] = 1,
+    fields: FieldsParam = None,
+    compact: CompactParam = False,
+    ctx: Context = None,
+) -> AdviceResponse | str:
+    """Fetch the latest persisted results of the process for a customer."""
+    check_api_key(mcp_api_key)
+    start = time.time()
+    pool = ctx.request_context.lifespan_context.pool
+    try:
+        advices = await advice_dao.latest_by_customer(pool, customer_id, limit, fields)
+        error = None if advices else f"No advice for customer {customer_id}"
+        if fields or compact:
+            return encode_table(advices, fields or advice_dao.COLUMNS, error=error)
+        return AdviceResponse(
+            advices=advices,
+            count=len(advices),
+            query_time_ms=round((time.time() - start) * 1000, 2),
+            error=error,
+        )
+    except Exception as exc:
+        logger.error("get_latest_advice failed", exc_info=True)
+        if fields or compact:
+            return encode_table([], fields or advice_dao.COLUMNS, error=str(exc))
+        return AdviceResponse(
+            advices=[],
+            count=0,
+            query_time_ms=round((time.time() - start) * 1000, 2),
+            error=str(exc),
+        )
+
+
 @mcp.tool(description="Return a single customer record by id")
 async def get_customer_by_id(
     customer_id: Annotated[int, "Customer ID"],
     mcp_api_key: Annotated[str, "MCP API Key for authentication"],
+    fields: FieldsParam = None,
+    compact: CompactParam = False,
     ctx: Context = None,
-) -> CustomerResponse:
+) -> CustomerResponse | str:
     """Fetch a single customer record by ID."""
     check_api_key(mcp_api_key)
     start = time.time()
     pool = ctx.request_context.lifespan_context.pool
     try:
-        cust = await customer_dao.get_by_id(pool, customer_id)
+        cust = await customer_dao.get_by_id(pool, customer_id, fields)
+        error = None if cust else f"No customer {customer_id}"
+        if fields or compact:
+            return encode_table([cust] if cust else [], fields or customer_dao.COLUMNS, error=error)
         return CustomerResponse(
             customer=cust,
             query_time_ms=round((time.time() - start) * 1000, 2),
-            error=None if cust else f"No customer {customer_id}",
+            error=error,
         )
     except Exception as exc:
         logger.error("get_customer_by_id failed", exc_info=True)
+        if fields or compact:
+            return encode_table([], fields or customer_dao.COLUMNS, error=str(exc))
         return CustomerResponse(
             customer=None,
             query_time_ms=round((time.time() - start) * 1000, 2),
@@ -153,14 +322,18 @@ async def get_customer_by_id(
 async def get_subscriptions(
     customer_id: Annotated[int, "Customer ID"],
     mcp_api_key: Annotated[str, "MCP API Key for authentication"],
+    fields: FieldsParam = None,
+    compact: CompactParam = False,
     ctx: Context = None,
-) -> SubscriptionResponse:
+) -> SubscriptionResponse | str:
     """Fetch all subscriptions for a given customer."""
     check_api_key(mcp_api_key)
     start = time.time()
     pool = ctx.request_context.lifespan_context.pool
     try:
-        subs = await subscription_dao.by_customer(pool, customer_id)
+        subs = await subscription_dao.by_customer(pool, customer_id, fields)
+        if fields or compact:
+            return encode_table(subs, fields or subscription_dao.COLUMNS)
         return SubscriptionResponse(
             subscriptions=subs,
             count=len(subs),
@@ -168,6 +341,8 @@ async def get_subscriptions(
         )
     except Exception as exc:
         logger.error("get_subscriptions failed", exc_info=True)
+        if fields or compact:
+            return encode_table([], fields or subscription_dao.COLUMNS, error=str(exc))
         return SubscriptionResponse(
             subscriptions=[],
             count=0,
@@ -180,26 +355,33 @@ async def get_subscriptions(
 async def get_products(
     mcp_api_key: Annotated[str, "MCP API Key for authentication"],
     product_id: Annotated[Optional[int], "Optional product id filter"] = None,
+    fields: FieldsParam = None,
+    compact: CompactParam = False,
     ctx: Context = None,
-) -> ProductResponse:
+) -> ProductResponse | str:
     """Fetch the product catalogue or a specific product by ID."""
     check_api_key(mcp_api_key)
     start = time.time()
     pool = ctx.request_context.lifespan_context.pool
     try:
         if product_id is None:
-            items = await product_dao.get_all(pool)
+            items = await product_dao.get_all(pool, fields)
         else:
-            p = await product_dao.get_by_id(pool, product_id)
+            p = await product_dao.get_by_id(pool, product_id, fields)
             items = [p] if p else []
+        error = None if items else f"No product {product_id}" if product_id else None
+        if fields or compact:
+            return encode_table(items, fields or product_dao.COLUMNS, error=error)
         return ProductResponse(
             products=items,
             count=len(items),
             query_time_ms=round((time.time() - start) * 1000, 2),
-            error=None if items else f"No product {product_id}" if product_id else None,
+            error=error,
         )
     except Exception as exc:
         logger.error("get_products failed", exc_info=True)
+        if fields or compact:
+            return encode_table([], fields or product_dao.COLUMNS, error=str(exc))
         return ProductResponse(
             products=[],
             count=0,
@@ -212,14 +394,18 @@ async def get_products(
 async def get_discounts(
     mcp_api_key: Annotated[str, "MCP API Key for authentication"],
     product_id: Annotated[Optional[int], "Optional product id filter"] = None,
+    fields: FieldsParam = None,
+    compact: CompactParam = False,
     ctx: Context = None,
-) -> DiscountResponse:
+) -> DiscountResponse | str:
     """Fetch active discount rules, optionally filtered by product."""
     check_api_key(mcp_api_key)
     start = time.time()
     pool = ctx.request_context.lifespan_context.pool
     try:
-        discounts = await discount_dao.find(pool, product_id)
+        discounts = await discount_dao.find(pool, product_id, fields)
+        if fields or compact:
+            return encode_table(discounts, fields or discount_dao.COLUMNS)
         return DiscountResponse(
             discounts=discounts,
             count=len(discounts),
@@ -227,6 +413,8 @@ async def get_discounts(
         )
     except Exception as exc:
         logger.error("get_discounts failed", exc_info=True)
+        if fields or compact:
+            return encode_table([], fields or discount_dao.COLUMNS, error=str(exc))
         return DiscountResponse(
             discounts=[],
             count=0,
@@ -235,10 +423,83 @@ async def get_discounts(
         )
 
 
+@mcp.tool(
+    description=(
+        "Return the discounts a customer is eligible for, ranked from most to least valuable. "
+        "A discount is eligible when the customer's CLV meets its minimum CLV and the customer "
+        "has an active subscription on the discounted product"
+    )
+)
+async def get_eligible_discounts(
+    customer_id: Annotated[int, "Customer ID"],
+    mcp_api_key: Annotated[str, "MCP API Key for authentication"],
+    product_id: Annotated[
+        Optional[int], "Optional product id filter, e.g. the product the customer called about"
+    ] = None,
+    on_date: Annotated[
+        Optional[date],
+        "Optional date the subscription must be active on, e.g. the date of the call. "
+        "Defaults to today",
+    ] = None,
+    ctx: Context = None,
+) -> EligibleDiscountResponse:
+    """Evaluate the discount eligibility of a customer in the database."""
+    check_api_key(mcp_api_key)
+    start = time.time()
+    pool = ctx.request_context.lifespan_context.pool
+    try:
+        cust, discounts = await asyncio.gather(
+            customer_dao.get_by_id(pool, customer_id, ["clv"]),
+            eligible_discount_dao.find(pool, customer_id, product_id, on_date),
+        )
+        return EligibleDiscountResponse(
+            customer_id=customer_id,
+            clv=cust.clv if cust else None,
+            discounts=discounts,
+            count=len(discounts),
+            query_time_ms=round((time.time() - start) * 1000, 2),
+            error=None if cust else f"No customer {customer_id}",
+        )
+    except Exception as exc:
+        logger.error("get_eligible_discounts failed", exc_info=True)
+        return EligibleDiscountResponse(
+            customer_id=customer_id,
+            discounts=[],
+            count=0,
+            query_time_ms=round((time.time() - start) * 1000, 2),
+            error=str(exc),
+        )
+
+
+@mcp.tool(description="Admin: return connection pool health statistics of this server")
+async def get_pool_stats(
+    mcp_api_key: Annotated[str, "MCP API Key for authentication"],
+    ctx: Context = None,
+) -> PoolStatsResponse:
+    """Return a snapshot of the database connection pool statistics."""
+    check_api_key(mcp_api_key)
+    start = time.time()
+    pool = ctx.request_context.lifespan_context.pool
+    try:
+        return PoolStatsResponse(
+            stats=PoolStats(**pool_stats(pool)),
+            query_time_ms=round((time.time() - start) * 1000, 2),
+        )
+    except Exception as exc:
+        logger.error("get_pool_stats failed", exc_info=True)
+        return PoolStatsResponse(
+            stats=None,
+            query_time_ms=round((time.time() - start) * 1000, 2),
+            error=str(exc),
+        )
+
+
 # ────────────────────────────── CLI entrypoint ──────────────────────
 if __name__ == "__main__":
     import argparse
 
+    import uvicorn
+
     parser = argparse.ArgumentParser("Repeated Calls Customer MCP Server")
     parser.add_argument("--host", default="0.0.0.0")
     parser.add_argument("--port", type=int, default=3000)
@@ -246,4 +507,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     logger.info("Starting Customer MCP server")
-    mcp.run(transport=args.transport)
+    if args.transport == "sse":
+        uvicorn.run(app, host=args.host, port=args.port)
+    else:
+        mcp.run(transport=args.transport)
@@ -0,0 +1,34 @@
+from typing import List, Optional, Sequence
+from repeated_calls.mcp_server.common.db import fetch_dicts
+from repeated_calls.mcp_server.common.projection import select_columns, to_models
+from repeated_calls.mcp_server.customer.models import Advice
+
+COLUMNS = (
+    "id",
+    "call_event_id",
+    "customer_id",
+    "product_id",
+    "call_timestamp",
+    "is_repeated_call",
+    "repeated_call_conclusion",
+    "is_relevant",
+    "cause_conclusion",
+    "advice",
+    "approved",
+    "created_at",
+)
+
+
+async def latest_by_customer(
+    pool, customer_id: int, limit: int = 1, fields: Optional[Sequence[str]] = None
+) -> List[Advice]:
+    """Return the latest advice for a customer, newest first (ix_advice_customer_id_created_at)."""
+    sql = f"""
+        SELECT {", ".join(select_columns(fields, COLUMNS))}
+        FROM public.advice
+        WHERE customer_id = %s
+        ORDER BY created_at DESC
+        LIMIT %s
+    """
+    rows = await fetch_dicts(pool, sql, (customer_id, limit))
+    return to_models(Advice, rows, fields)
@@ -1,16 +1,21 @@
-from typing import List
+from typing import List, Optional, Sequence
 from repeated_calls.mcp_server.common.db import fetch_dicts
+from repeated_calls.mcp_server.common.projection import select_columns, to_models
 from repeated_calls.mcp_server.customer.models import CallEvent
 
+COLUMNS = ("id", "customer_id", "sdc", "timestamp")
 
-async def latest_by_customer(pool, customer_id: int) -> List[CallEvent]:
+
+async def latest_by_customer(
+    pool, customer_id: int, fields: Optional[Sequence[str]] = None
+) -> List[CallEvent]:
     """Return max-1 latest call event for a customer."""
-    sql = """
-        SELECT id, customer_id, sdc, timestamp
+    sql = f"""
+        SELECT {", ".join(select_columns(fields, COLUMNS))}
         FROM public.call_event
         WHERE customer_id = %s
         ORDER BY timestamp DESC
         LIMIT 1
     """
     rows = await fetch_dicts(pool, sql, (customer_id,))
-    return [CallEvent(**r) for r in rows]
\ No newline at end of file
+    return to_models(CallEvent, rows, fields)
\ No newline at end of file
@@ -1,13 +1,18 @@
-from typing import Optional
+from typing import Optional, Sequence
 from repeated_calls.mcp_server.common.db import fetch_dicts
+from repeated_calls.mcp_server.common.projection import select_columns, to_models
 from repeated_calls.mcp_server.customer.models import Customer
 
+COLUMNS = ("id", "name", "clv", "relation_start_date")
 
-async def get_by_id(pool, customer_id: int) -> Optional[Customer]:
-    sql = """
-        SELECT id, name, clv, relation_start_date
+
+async def get_by_id(
+    pool, customer_id: int, fields: Optional[Sequence[str]] = None
+) -> Optional[Customer]:
+    sql = f"""
+        SELECT {", ".join(select_columns(fields, COLUMNS))}
         FROM public.customer
         WHERE id = %s
     """
     rows = await fetch_dicts(pool, sql, (customer_id,))
-    return Customer(**rows[0]) if rows else None
\ No newline at end of file
+    return to_models(Customer, rows, fields)[0] if rows else None
\ No newline at end of file
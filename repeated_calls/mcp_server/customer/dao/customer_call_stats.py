@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from repeated_calls.mcp_server.common.db import fetch_dicts
+from repeated_calls.mcp_server.customer.models import CustomerCallStats
+
+
+async def get_by_customer(pool, customer_id: int, at: datetime) -> Optional[CustomerCallStats]:
+    """Return the call statistics of a customer as seen at `at`, e.g. the time of an incoming call.
+
+    Only calls that started before `at` are counted. When `at` is after the last recorded call, as
+    for an incoming call, the statistics are derived from the summary row, so this is a single
+    primary key lookup. The summary row only keeps the call times of the 30 days up to the last
+    call, so for an earlier `at` the statistics are counted from the call history instead.
+    """
+    rows = await fetch_dicts(
+        pool,
+        """
+        SELECT customer_id, total_calls, first_call_at, last_call_at, last_call_id,
+               recent_call_times
+        FROM public.customer_call_stats
+        WHERE customer_id = %s
+        """,
+        (customer_id,),
+    )
+    if not rows:
+        return None
+
+    row = rows[0]
+    if row["last_call_at"] >= at:
+        return await _count_history(pool, customer_id, at)
+
+    # Every recorded call is before `at`, the recent call times cover all windows
+    recent = row["recent_call_times"]
+    return CustomerCallStats(
+        customer_id=row["customer_id"],
+        total_calls=row["total_calls"],
+        first_call_at=row["first_call_at"],
+        last_call_at=row["last_call_at"],
+        last_call_id=row["last_call_id"],
+        calls_last_24h=sum(t >= at - timedelta(hours=24) for t in recent),
+        calls_last_7d=sum(t >= at - timedelta(days=7) for t in recent),
+        calls_last_30d=sum(t >= at - timedelta(days=30) for t in recent),
+        hours_since_last_call=round((at - row["last_call_at"]).total_seconds() / 3600, 1),
+    )
+
+
+async def _count_history(pool, customer_id: int, at: datetime) -> Optional[CustomerCallStats]:
+    """Count the call statistics of a customer as seen at `at` from the call history.
+
+    Served by ix_historic_call_event_customer_id_start_time. Unlike the lifetime count of the
+    summary row, `total_calls` only counts the calls in the retained partitions.
+    """
+    rows = await fetch_dicts(
+        pool,
+        """
+        SELECT customer_id,
+               count(*) AS total_calls,
+               min(start_time) AS first_call_at,
+               max(start_time) AS last_call_at,
+               (array_agg(id ORDER BY start_time DESC))[1] AS last_call_id,
+               count(*) FILTER (WHERE start_time >= %s) AS calls_last_24h,
+               count(*) FILTER (WHERE start_time >= %s) AS calls_last_7d,
+               count(*) FILTER (WHERE start_time >= %s) AS calls_last_30d
+        FROM public.historic_call_event
+        WHERE customer_id = %s AND start_time < %s
+        GROUP BY customer_id
+        """,
+        (
+            at - timedelta(hours=24),
+            at - timedelta(days=7),
+            at - timedelta(days=30),
+            customer_id,
+            at,
+        ),
+    )
+    if not rows:
+        return None
+
+    row = rows[0]
+    return CustomerCallStats(
+        **row,
+        hours_since_last_call=round((at - row["last_call_at"]).total_seconds() / 3600, 1),
+    )
@@ -1,18 +1,23 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from repeated_calls.mcp_server.common.db import fetch_dicts
+from repeated_calls.mcp_server.common.projection import select_columns, to_models
 from repeated_calls.mcp_server.customer.models import Discount
 
+COLUMNS = ("id", "product_id", "minimum_clv", "percentage", "duration_months")
 
-async def find(pool, product_id: Optional[int] = None) -> List[Discount]:
-    where = "WHERE product_id = %s" if product_id else ""
-    params = (product_id,) if product_id else ()
-    rows = await fetch_dicts(
-        pool,
-        f"""
-        SELECT id, product_id, minimum_clv, percentage, duration_months
+
+async def find(
+    pool, product_id: Optional[int] = None, fields: Optional[Sequence[str]] = None
+) -> List[Discount]:
+    # The select list only contains whitelisted columns and the WHERE clause is fixed per branch,
+    # so the SQL text maps onto one prepared statement per connection
+    sql = f"""
+        SELECT {", ".join(select_columns(fields, COLUMNS))}
         FROM public.discount
-        {where}
-        """,
-        params,
-    )
-    return [Discount(**r) for r in rows]
\ No newline at end of file
+    """
+    params = ()
+    if product_id:
+        sql += " WHERE product_id = %s"
+        params = (product_id,)
+    rows = await fetch_dicts(pool, sql, params)
+    return to_models(Discount, rows, fields)
\ No newline at end of file
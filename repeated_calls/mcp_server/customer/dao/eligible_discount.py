@@ -0,0 +1,50 @@
+from datetime import date
+from typing import List, Optional
+from repeated_calls.mcp_server.common.db import fetch_dicts
+from repeated_calls.mcp_server.customer.models import EligibleDiscount
+
+# CLV levels from lowest to highest, a discount applies from its minimum_clv level upwards
+CLV_LEVELS = ("Low", "Med", "High")
+
+
+async def find(
+    pool, customer_id: int, product_id: Optional[int] = None, on: Optional[date] = None
+) -> List[EligibleDiscount]:
+    """Return the discounts a customer is eligible for, most valuable first.
+
+    A discount is eligible when the customer's CLV meets its `minimum_clv` and the customer has a
+    subscription on the discounted product that is active on `on`.
+
+    Args:
+        pool: The connection pool.
+        customer_id: The customer to evaluate.
+        product_id: Only evaluate discounts on this product. Defaults to all products.
+        on: Date the subscription must be active on. Defaults to today.
+    """
+    sql = """
+        SELECT rank() OVER (ORDER BY d.percentage DESC, d.duration_months DESC) AS rank,
+               d.id, d.product_id, p.name AS product_name,
+               d.minimum_clv, d.percentage, d.duration_months,
+               s.id AS subscription_id, s.end_date AS subscription_end_date
+        FROM public.customer c
+        JOIN public.discount d
+          ON array_position(%s::text[], c.clv) >= array_position(%s::text[], d.minimum_clv)
+        JOIN public.product p ON p.id = d.product_id
+        JOIN LATERAL (
+            SELECT id, end_date
+            FROM public.subscription
+            WHERE customer_id = c.id
+              AND product_id = d.product_id
+              AND %s::date BETWEEN start_date AND end_date
+            ORDER BY end_date DESC
+            LIMIT 1
+        ) s ON true
+        WHERE c.id = %s
+    """
+    params: list = [list(CLV_LEVELS), list(CLV_LEVELS), on or date.today(), customer_id]
+    if product_id:
+        sql += " AND d.product_id = %s"
+        params.append(product_id)
+    sql += " ORDER BY rank, d.id"
+    rows = await fetch_dicts(pool, sql, params)
+    return [EligibleDiscount(**r) for r in rows]
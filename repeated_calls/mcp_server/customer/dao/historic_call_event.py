@@ -1,14 +1,132 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
 from repeated_calls.mcp_server.common.db import fetch_dicts
-from repeated_calls.mcp_server.customer.models import HistoricCallEvent
+from repeated_calls.mcp_server.common.projection import select_columns, to_models
+from repeated_calls.mcp_server.customer.models import HistoricCallEvent, SimilarHistoricCallEvent
 
+COLUMNS = ("id", "customer_id", "sdc", "call_summary", "start_time", "end_time")
 
-async def all_by_customer(pool, customer_id: int) -> List[HistoricCallEvent]:
-    sql = """
-        SELECT id, customer_id, sdc, call_summary, start_time, end_time
+
+def encode_cursor(event: HistoricCallEvent) -> str:
+    """Return the keyset cursor pointing just past `event` (in newest-first order)."""
+    return f"{event.start_time.isoformat()}|{event.id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Parse a cursor created by `encode_cursor` into its `(start_time, id)` key."""
+    try:
+        start_time, event_id = cursor.rsplit("|", 1)
+        return datetime.fromisoformat(start_time), int(event_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor '{cursor}'") from None
+
+
+async def all_by_customer(
+    pool,
+    customer_id: int,
+    limit: Optional[int] = None,
+    since: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    before: Optional[datetime] = None,
+) -> Tuple[List[HistoricCallEvent], Optional[str]]:
+    """Return a page of historic call events for a customer, newest first.
+
+    Args:
+        pool: The connection pool.
+        customer_id: The customer to return the history of.
+        limit: Maximum number of events to return. Defaults to `None` (no limit).
+        since: Only return events that started at or after this moment.
+        cursor: Keyset cursor returned with the previous page.
+        fields: Columns to select, defaults to all. `id` and `start_time` are always selected since
+            they make up the cursor.
+        before: Only return events that started before this moment. Together with `since` this
+            limits the lookup to the partitions of the requested months.
+
+    Returns:
+        The events and the cursor of the next page, which is `None` on the last page.
+
+    Raises:
+        ValueError: If `limit` is smaller than 1 or `cursor` is invalid.
+    """
+    if limit is not None and limit < 1:
+        raise ValueError(f"Invalid limit {limit}, it must be at least 1")
+
+    # The filters are appended as fixed fragments, so every combination is still a static
+    # statement (prepared once per connection) served by
+    # ix_historic_call_event_customer_id_start_time.
+    sql = f"""
+        SELECT {", ".join(select_columns(fields, COLUMNS, required=("id", "start_time")))}
         FROM public.historic_call_event
         WHERE customer_id = %s
-        ORDER BY start_time DESC
     """
-    rows = await fetch_dicts(pool, sql, (customer_id,))
-    return [HistoricCallEvent(**r) for r in rows]
\ No newline at end of file
+    params: list = [customer_id]
+    if since is not None:
+        sql += " AND start_time >= %s"
+        params.append(since)
+    if before is not None:
+        sql += " AND start_time < %s"
+        params.append(before)
+    if cursor:
+        sql += " AND (start_time, id) < (%s, %s)"
+        params.extend(decode_cursor(cursor))
+    sql += " ORDER BY start_time DESC, id DESC LIMIT %s"
+    # Fetch one extra row to find out whether there is a next page
+    params.append(limit + 1 if limit is not None else None)
+
+    rows = await fetch_dicts(pool, sql, params)
+    events = to_models(HistoricCallEvent, rows, fields)
+    if limit is not None and len(events) > limit:
+        events = events[:limit]
+        return events, encode_cursor(events[-1])
+    return events, None
+
+
+async def similar_to(
+    pool,
+    text: str,
+    customer_id: Optional[int] = None,
+    limit: int = 5,
+    before: Optional[datetime] = None,
+    since: Optional[datetime] = None,
+) -> List[SimilarHistoricCallEvent]:
+    """Return the historic call events most similar to `text`, best match first.
+
+    Similarity is the full-text rank of the call reason (weighted highest) and summary against the
+    words of `text`. Any shared word is a match, so a call about "mower stops" also finds "my
+    mower stopped working".
+
+    Args:
+        pool: The connection pool.
+        text: Free text to compare with, e.g. the reason of the incoming call.
+        customer_id: Only search the history of this customer. Defaults to all customers.
+        limit: Maximum number of events to return.
+        before: Only return events that started before this moment, e.g. the incoming call.
+        since: Only return events that started at or after this moment. Together with `before`
+            this limits the search to the partitions of the requested months.
+    """
+    # plainto_tsquery ANDs the words; OR them so partially overlapping calls still match
+    sql = """
+        WITH q AS (
+            SELECT replace(plainto_tsquery('english', %s)::text, '&', '|')::tsquery AS query
+        )
+        SELECT h.id, h.customer_id, h.sdc, h.call_summary, h.start_time, h.end_time,
+               ts_rank_cd(h.search_vector, q.query, 32) AS score
+        FROM public.historic_call_event h, q
+        WHERE h.search_vector @@ q.query
+    """
+    params: list = [text]
+    if customer_id is not None:
+        sql += " AND h.customer_id = %s"
+        params.append(customer_id)
+    if before is not None:
+        sql += " AND h.start_time < %s"
+        params.append(before)
+    if since is not None:
+        sql += " AND h.start_time >= %s"
+        params.append(since)
+    sql += " ORDER BY score DESC, h.start_time DESC LIMIT %s"
+    params.append(limit)
+
+    rows = await fetch_dicts(pool, sql, params)
+    return [SimilarHistoricCallEvent(**r) for r in rows]
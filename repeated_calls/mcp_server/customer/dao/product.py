@@ -1,25 +1,45 @@
-from functools import lru_cache
-from typing import List, Optional
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
 from repeated_calls.mcp_server.common.db import fetch_dicts
+from repeated_calls.mcp_server.common.projection import select_columns, to_models
 from repeated_calls.mcp_server.customer.models import Product
 
+COLUMNS = ("id", "name", "type", "listing_price")
 
-@lru_cache(maxsize=1)           # catalogue rarely changes
-async def get_all(pool) -> List[Product]:
-    rows = await fetch_dicts(
-        pool,
-        "SELECT id, name, type, listing_price FROM public.product",
-    )
-    return [Product(**r) for r in rows]
+# The catalogue rarely changes, so it is cached per process (keyed on the selected columns) for
+# CATALOGUE_TTL_S seconds. Note that functools.lru_cache cannot be used here: it would cache the
+# coroutine, which can only be awaited once.
+CATALOGUE_TTL_S = 300.0
+_catalogue: Dict[Tuple[str, ...], Tuple[float, List[Product]]] = {}  # (expires, products)
+
+
+def clear_catalogue() -> None:
+    """Drop the cached catalogue, e.g. after changing the products, so it is read again."""
+    _catalogue.clear()
+
+
+async def get_all(pool, fields: Optional[Sequence[str]] = None) -> List[Product]:
+    columns = tuple(select_columns(fields, COLUMNS))
+    now = time.monotonic()
+    cached = _catalogue.get(columns)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    rows = await fetch_dicts(pool, f"SELECT {', '.join(columns)} FROM public.product")
+    products = to_models(Product, rows, fields)
+    _catalogue[columns] = (now + CATALOGUE_TTL_S, products)
+    return products
 
 
-async def get_by_id(pool, product_id: int) -> Optional[Product]:
+async def get_by_id(
+    pool, product_id: int, fields: Optional[Sequence[str]] = None
+) -> Optional[Product]:
     rows = await fetch_dicts(
         pool,
-        """
-        SELECT id, name, type, listing_price
+        f"""
+        SELECT {", ".join(select_columns(fields, COLUMNS))}
         FROM public.product WHERE id = %s
         """,
         (product_id,),
     )
-    return Product(**rows[0]) if rows else None
\ No newline at end of file
+    return to_models(Product, rows, fields)[0] if rows else None
\ No newline at end of file
@@ -1,15 +1,26 @@
-from typing import List
+from typing import List, Optional, Sequence
 from repeated_calls.mcp_server.common.db import fetch_dicts
+from repeated_calls.mcp_server.common.projection import select_columns, to_models
 from repeated_calls.mcp_server.customer.models import Subscription
 
+COLUMNS = (
+    "id",
+    "customer_id",
+    "product_id",
+    "contract_duration_months",
+    "price_per_month",
+    "start_date",
+    "end_date",
+)
 
-async def by_customer(pool, customer_id: int) -> List[Subscription]:
-    sql = """
-        SELECT id, customer_id, product_id,
-               contract_duration_months, price_per_month,
-               start_date, end_date
+
+async def by_customer(
+    pool, customer_id: int, fields: Optional[Sequence[str]] = None
+) -> List[Subscription]:
+    sql = f"""
+        SELECT {", ".join(select_columns(fields, COLUMNS))}
         FROM public.subscription
         WHERE customer_id = %s
     """
     rows = await fetch_dicts(pool, sql, (customer_id,))
-    return [Subscription(**r) for r in rows]
\ No newline at end of file
+    return to_models(Subscription, rows, fields)
\ No newline at end of file
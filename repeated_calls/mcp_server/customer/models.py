@@ -1,6 +1,6 @@
 """Pydantic models for customer-related data and responses."""
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import List, Optional
 
 from pydantic import BaseModel, Field
@@ -22,6 +22,48 @@ class HistoricCallEventResponse(BaseModel):
 
     events: List[HistoricCallEvent]
     count: int
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor of the next page, None on the last page"
+    )
+    query_time_ms: float
+    error: Optional[str] = None
+
+
+class SimilarHistoricCallEvent(HistoricCallEvent):
+    """Represents a historic call event with its similarity to a text."""
+
+    score: float = Field(description="Similarity between 0 and 1, higher is more similar")
+
+
+class SimilarHistoricCallEventResponse(BaseModel):
+    """Response model for historic call events similar to a text."""
+
+    events: List[SimilarHistoricCallEvent]
+    count: int
+    query_time_ms: float
+    error: Optional[str] = None
+
+
+class CustomerCallStats(BaseModel):
+    """Represents the call statistics of a customer at a moment in time."""
+
+    customer_id: int
+    total_calls: int = Field(description="Calls of the customer before the requested moment")
+    first_call_at: datetime
+    last_call_at: datetime = Field(description="Start of the last call before the requested moment")
+    last_call_id: int
+    calls_last_24h: int = Field(description="Calls in the 24 hours before the requested moment")
+    calls_last_7d: int = Field(description="Calls in the 7 days before the requested moment")
+    calls_last_30d: int = Field(description="Calls in the 30 days before the requested moment")
+    hours_since_last_call: Optional[float] = Field(
+        None, description="Hours between the last call before the requested moment and that moment"
+    )
+
+
+class CustomerCallStatsResponse(BaseModel):
+    """Response model for customer call statistics."""
+
+    stats: Optional[CustomerCallStats] = None
     query_time_ms: float
     error: Optional[str] = None
 
@@ -135,3 +177,56 @@ class DiscountResponse(BaseModel):
     count: int
     query_time_ms: float
     error: Optional[str] = None
+
+
+class EligibleDiscount(BaseModel):
+    """Represents a discount a customer is eligible for, with the subscription it applies to."""
+
+    rank: int = Field(description="Rank of the offer, 1 is the most valuable")
+    id: int
+    product_id: int
+    product_name: str
+    minimum_clv: str
+    percentage: float
+    duration_months: int
+    subscription_id: int = Field(description="Active subscription of the customer on the product")
+    subscription_end_date: date
+
+
+class EligibleDiscountResponse(BaseModel):
+    """Response model for the discounts a customer is eligible for."""
+
+    customer_id: int
+    clv: Optional[str] = Field(None, description="Customer lifetime value used for the evaluation")
+    discounts: List[EligibleDiscount]
+    count: int
+    query_time_ms: float
+    error: Optional[str] = None
+
+
+class Advice(BaseModel):
+    """Represents the results of the process for a call event."""
+
+    id: int
+    call_event_id: int
+    customer_id: int
+    product_id: Optional[int] = None
+    call_timestamp: datetime
+    is_repeated_call: Optional[bool] = Field(None, description="Whether it was a repeated call")
+    repeated_call_conclusion: Optional[str] = None
+    is_relevant: Optional[bool] = Field(
+        None, description="Whether one of our systems caused the issue"
+    )
+    cause_conclusion: Optional[str] = None
+    advice: Optional[str] = Field(None, description="The advice for the customer service employee")
+    approved: Optional[bool] = Field(None, description="Whether the reviewer approved the advice")
+    created_at: datetime = Field(description="Time the call event was processed")
+
+
+class AdviceResponse(BaseModel):
+    """Response model for advice."""
+
+    advices: List[Advice]
+    count: int
+    query_time_ms: float
+    error: Optional[str] = None
@@ -75,13 +75,25 @@ async def main(host: str, customer_id: int, product_id: int):
             # One list with (tool_name, params) we want to run
             test_plan = [
                 ("get_historic_call_events", {"customer_id": customer_id}),
+                ("get_historic_call_events", {"customer_id": customer_id, "limit": 1}),
+                (
+                    "find_similar_historic_calls",
+                    {"customer_id": customer_id, "text": "My mower stopped working"},
+                ),
+                ("get_customer_call_stats", {"customer_id": customer_id}),
+                ("get_latest_advice", {"customer_id": customer_id}),
                 ("get_customer_by_id", {"customer_id": customer_id}),
                 ("get_call_event", {"customer_id": customer_id}),
                 ("get_subscriptions", {"customer_id": customer_id}),
+                ("get_subscriptions", {"customer_id": customer_id, "compact": True}),
                 ("get_products", {}),  # catalogue (cached)
+                ("get_products", {}),  # served from the cache
+                ("get_products", {"fields": ["id", "name"]}),  # compact projection
                 ("get_products", {"product_id": product_id}),
                 ("get_discounts", {}),  # all discounts
                 ("get_discounts", {"product_id": product_id}),
+                ("get_eligible_discounts", {"customer_id": customer_id, "product_id": product_id}),
+                ("get_pool_stats", {}),
             ]
 
             for name, params in test_plan:
@@ -0,0 +1,19 @@
+"""Module for handling database operations related to known bugs."""
+
+from datetime import datetime
+from typing import List
+
+from repeated_calls.mcp_server.common.db import fetch_dicts
+from repeated_calls.mcp_server.operations.models import KnownBug
+
+
+async def open_at(pool, product_id: int, at: datetime) -> List[KnownBug]:
+    """Find the bugs of a product that were known and open at `at`, served by the GiST index."""
+    sql = """
+        SELECT id, product_id, description, reported_at, resolved_at
+        FROM public.known_bug
+        WHERE tsrange(reported_at, resolved_at) @> %s::timestamp AND product_id = %s
+        ORDER BY reported_at DESC
+    """
+    rows = await fetch_dicts(pool, sql, (at, product_id))
+    return [KnownBug(**r) for r in rows]
@@ -0,0 +1,19 @@
+"""Module for handling database operations related to outages."""
+
+from datetime import datetime
+from typing import List
+
+from repeated_calls.mcp_server.common.db import fetch_dicts
+from repeated_calls.mcp_server.operations.models import Outage
+
+
+async def active_at(pool, product_id: int, at: datetime) -> List[Outage]:
+    """Find the outages of a product that were active at `at`, served by the GiST index."""
+    sql = """
+        SELECT id, product_id, description, start_time, end_time
+        FROM public.outage
+        WHERE tsrange(start_time, end_time) @> %s::timestamp AND product_id = %s
+        ORDER BY start_time DESC
+    """
+    rows = await fetch_dicts(pool, sql, (at, product_id))
+    return [Outage(**r) for r in rows]
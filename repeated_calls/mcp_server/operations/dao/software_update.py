@@ -1,22 +1,74 @@
 """Module for handling database operations related to software updates."""
 
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
 
 from repeated_calls.mcp_server.common.db import fetch_dicts
-from repeated_calls.mcp_server.operations.models import SoftwareUpdate
+from repeated_calls.mcp_server.common.projection import select_columns, to_models
+from repeated_calls.mcp_server.operations.models import NearbySoftwareUpdate, SoftwareUpdate
 
+COLUMNS = ("id", "product_id", "rollout_date", "type")
 
-async def find(pool, product_id: Optional[int] = None) -> List[SoftwareUpdate]:
+
+async def find(
+    pool, product_id: Optional[int] = None, fields: Optional[Sequence[str]] = None
+) -> List[SoftwareUpdate]:
     """Find software updates by product ID."""
-    where = "WHERE product_id = %s" if product_id else ""
-    params = (product_id,) if product_id else ()
-    rows = await fetch_dicts(
-        pool,
-        f"""
-        SELECT id, product_id, rollout_date, type
+    sql = f"""
+        SELECT {", ".join(select_columns(fields, COLUMNS))}
         FROM public.software_update
-        {where}
-        """,
-        params,
-    )
-    return [SoftwareUpdate(**r) for r in rows]
+    """
+    params = ()
+    if product_id:
+        sql += " WHERE product_id = %s"
+        params = (product_id,)
+    rows = await fetch_dicts(pool, sql, params)
+    return to_models(SoftwareUpdate, rows, fields)
+
+
+async def near(
+    pool,
+    at: datetime,
+    window_days: int,
+    customer_id: Optional[int] = None,
+    product_ids: Optional[Sequence[int]] = None,
+) -> List[NearbySoftwareUpdate]:
+    """Find software updates rolled out in the `window_days` up to `at`, most recent first.
+
+    Args:
+        pool: The connection pool.
+        at: The moment of interest, e.g. the timestamp of a call.
+        window_days: Number of days before `at` to look back.
+        customer_id: Only return updates on products the customer had an active subscription on
+            at `at`.
+        product_ids: Only return updates on these products.
+
+    Raises:
+        ValueError: If neither `customer_id` nor `product_ids` is given.
+    """
+    if customer_id is None and not product_ids:
+        raise ValueError("Either customer_id or product_ids is required")
+
+    on = at.date()
+    sql = """
+        SELECT su.id, su.product_id, su.rollout_date, su.type,
+               %s::date - su.rollout_date AS days_before
+        FROM public.software_update su
+        WHERE su.rollout_date BETWEEN %s AND %s
+    """
+    params: list = [on, on - timedelta(days=window_days), on]
+    if customer_id is not None:
+        sql += """
+          AND su.product_id IN (
+              SELECT product_id
+              FROM public.subscription
+              WHERE customer_id = %s AND %s BETWEEN start_date AND end_date
+          )
+        """
+        params.extend((customer_id, on))
+    if product_ids:
+        sql += " AND su.product_id = ANY(%s)"
+        params.append(list(product_ids))
+    sql += " ORDER BY su.rollout_date DESC, su.id"
+    rows = await fetch_dicts(pool, sql, params)
+    return [NearbySoftwareUpdate(**r) for r in rows]
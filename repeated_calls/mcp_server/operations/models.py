@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class SoftwareUpdate(BaseModel):
@@ -22,3 +22,56 @@ class SoftwareUpdateResponse(BaseModel):
     count: int
     query_time_ms: float
     error: Optional[str] = None
+
+
+class NearbySoftwareUpdate(SoftwareUpdate):
+    """Represents a software update rolled out shortly before a moment of interest."""
+
+    days_before: int = Field(description="Days between the rollout and the requested timestamp")
+
+
+class NearbySoftwareUpdateResponse(BaseModel):
+    """Response model for software updates rolled out near a timestamp."""
+
+    updates: List[NearbySoftwareUpdate]
+    count: int
+    query_time_ms: float
+    error: Optional[str] = None
+
+
+class Outage(BaseModel):
+    """Represents an outage record, `end_time` is empty while the outage is ongoing."""
+
+    id: int
+    product_id: int
+    description: str
+    start_time: datetime
+    end_time: Optional[datetime] = None
+
+
+class OutageResponse(BaseModel):
+    """Response model for outages."""
+
+    outages: List[Outage]
+    count: int
+    query_time_ms: float
+    error: Optional[str] = None
+
+
+class KnownBug(BaseModel):
+    """Represents a known bug record, `resolved_at` is empty while the bug is open."""
+
+    id: int
+    product_id: int
+    description: str
+    reported_at: datetime
+    resolved_at: Optional[datetime] = None
+
+
+class KnownBugResponse(BaseModel):
+    """Response model for known bugs."""
+
+    bugs: List[KnownBug]
+    count: int
+    query_time_ms: float
+    error: Optional[str] = None
@@ -4,11 +4,13 @@
 import asyncio
 
 # ────────────────────────────── std-lib ──────────────────────────────
+import os
 import sys
 import time
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import Annotated, AsyncIterator, Optional
+from datetime import datetime
+from typing import Annotated, AsyncIterator, List, Optional
 
 # ────────────────────────────── 3rd-party ───────────────────────────
 import psycopg_pool
@@ -18,10 +20,24 @@ from mcp.server.fastmcp import Context, FastMCP
 from repeated_calls.mcp_server.common.auth import check_api_key
 
 # ────────────────────────────── project ─────────────────────────────
-from repeated_calls.mcp_server.common.db import create_pool
+from repeated_calls.mcp_server.common.db import (
+    close_pool_on_shutdown,
+    get_shared_pool,
+    pool_stats,
+)
+from repeated_calls.mcp_server.common.models import PoolStats, PoolStatsResponse
+from repeated_calls.mcp_server.common.projection import CompactParam, FieldsParam, encode_table
+from repeated_calls.mcp_server.operations.dao import known_bug as known_bug_dao
+from repeated_calls.mcp_server.operations.dao import outage as outage_dao
 from repeated_calls.mcp_server.operations.dao import software_update as su_dao
-from repeated_calls.mcp_server.operations.models import SoftwareUpdateResponse
+from repeated_calls.mcp_server.operations.models import (
+    KnownBugResponse,
+    NearbySoftwareUpdateResponse,
+    OutageResponse,
+    SoftwareUpdateResponse,
+)
 from repeated_calls.utils.loggers import Logger
+from repeated_calls.utils.otel import configure_telemetry
 
 # ────────────────────────────── runtime set-up ──────────────────────
 if sys.platform == "win32":
@@ -29,6 +45,9 @@ if sys.platform == "win32":
 
 load_dotenv()
 
+if os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING"):
+    configure_telemetry(service_name="repeated-calls-operations-mcp-server")
+
 logger = Logger()
 logger.info("Starting Repeated Calls MCP server")
 
@@ -44,16 +63,13 @@ class AppContext:
 @asynccontextmanager
 async def lifespan(app) -> AsyncIterator[AppContext]:
     """Handle the lifespan of the application context."""
-    pool = await create_pool()
-    try:
-        yield AppContext(pool=pool)
-    finally:
-        await pool.close()
+    # Runs once per client session; all sessions borrow from the same process-wide pool
+    yield AppContext(pool=await get_shared_pool("operations"))
 
 
 # ────────────────────────────── FastMCP init ────────────────────────
 mcp = FastMCP("Repeated Calls Operations Data Service", lifespan=lifespan)
-app = mcp.sse_app
+app = close_pool_on_shutdown(mcp.sse_app())
 
 
 # ────────────────────────────── Tools  ──────────────────────────────
@@ -61,14 +77,18 @@ app = mcp.sse_app
 async def get_software_updates(
     mcp_api_key: Annotated[str, "MCP API Key for authentication"],
     product_id: Annotated[Optional[int], "Optional product id filter"] = None,
+    fields: FieldsParam = None,
+    compact: CompactParam = False,
     ctx: Context = None,
-) -> SoftwareUpdateResponse:
+) -> SoftwareUpdateResponse | str:
     """Retrieve software updates, optionally filtered by product ID."""
     check_api_key(mcp_api_key)
     start = time.time()
     pool = ctx.request_context.lifespan_context.pool
     try:
-        updates = await su_dao.find(pool, product_id)
+        updates = await su_dao.find(pool, product_id, fields)
+        if fields or compact:
+            return encode_table(updates, fields or su_dao.COLUMNS)
         return SoftwareUpdateResponse(
             updates=updates,
             count=len(updates),
@@ -76,6 +96,8 @@ async def get_software_updates(
         )
     except Exception as exc:
         logger.error("get_software_updates failed", exc_info=True)
+        if fields or compact:
+            return encode_table([], fields or su_dao.COLUMNS, error=str(exc))
         return SoftwareUpdateResponse(
             updates=[],
             count=0,
@@ -84,10 +106,130 @@ async def get_software_updates(
         )
 
 
+@mcp.tool(
+    description=(
+        "List software updates rolled out in the days before a timestamp (e.g. of a call) on the "
+        "products a customer subscribes to, or on the given products. Most recent first"
+    )
+)
+async def get_updates_near(
+    mcp_api_key: Annotated[str, "MCP API Key for authentication"],
+    at_timestamp: Annotated[datetime, "ISO timestamp to look back from, e.g. of the call"],
+    customer_id: Annotated[
+        Optional[int], "Customer ID, restricts to products with an active subscription"
+    ] = None,
+    product_ids: Annotated[
+        Optional[List[int]], "Product IDs, required when no customer_id is given"
+    ] = None,
+    window_days: Annotated[int, "Number of days before the timestamp to look back"] = 14,
+    ctx: Context = None,
+) -> NearbySoftwareUpdateResponse:
+    """Retrieve the software updates that are candidate causes of an issue at a timestamp."""
+    check_api_key(mcp_api_key)
+    start = time.time()
+    pool = ctx.request_context.lifespan_context.pool
+    try:
+        updates = await su_dao.near(pool, at_timestamp, window_days, customer_id, product_ids)
+        return NearbySoftwareUpdateResponse(
+            updates=updates,
+            count=len(updates),
+            query_time_ms=round((time.time() - start) * 1000, 2),
+        )
+    except Exception as exc:
+        logger.error("get_updates_near failed", exc_info=True)
+        return NearbySoftwareUpdateResponse(
+            updates=[],
+            count=0,
+            query_time_ms=round((time.time() - start) * 1000, 2),
+            error=str(exc),
+        )
+
+
+@mcp.tool(description="List the outages of a product that were active at a timestamp (default now)")
+async def check_outages(
+    product_id: Annotated[int, "Product ID"],
+    mcp_api_key: Annotated[str, "MCP API Key for authentication"],
+    at_timestamp: Annotated[Optional[datetime], "Optional ISO timestamp, e.g. of the call"] = None,
+    ctx: Context = None,
+) -> OutageResponse:
+    """Retrieve the outages of a product that were active at a timestamp."""
+    check_api_key(mcp_api_key)
+    start = time.time()
+    pool = ctx.request_context.lifespan_context.pool
+    try:
+        outages = await outage_dao.active_at(pool, product_id, at_timestamp or datetime.now())
+        return OutageResponse(
+            outages=outages,
+            count=len(outages),
+            query_time_ms=round((time.time() - start) * 1000, 2),
+        )
+    except Exception as exc:
+        logger.error("check_outages failed", exc_info=True)
+        return OutageResponse(
+            outages=[],
+            count=0,
+            query_time_ms=round((time.time() - start) * 1000, 2),
+            error=str(exc),
+        )
+
+
+@mcp.tool(description="List the known bugs of a product open at a timestamp (default now)")
+async def check_bugs(
+    product_id: Annotated[int, "Product ID"],
+    mcp_api_key: Annotated[str, "MCP API Key for authentication"],
+    at_timestamp: Annotated[Optional[datetime], "Optional ISO timestamp, e.g. of the call"] = None,
+    ctx: Context = None,
+) -> KnownBugResponse:
+    """Retrieve the known bugs of a product that were unresolved at a timestamp."""
+    check_api_key(mcp_api_key)
+    start = time.time()
+    pool = ctx.request_context.lifespan_context.pool
+    try:
+        bugs = await known_bug_dao.open_at(pool, product_id, at_timestamp or datetime.now())
+        return KnownBugResponse(
+            bugs=bugs,
+            count=len(bugs),
+            query_time_ms=round((time.time() - start) * 1000, 2),
+        )
+    except Exception as exc:
+        logger.error("check_bugs failed", exc_info=True)
+        return KnownBugResponse(
+            bugs=[],
+            count=0,
+            query_time_ms=round((time.time() - start) * 1000, 2),
+            error=str(exc),
+        )
+
+
+@mcp.tool(description="Admin: return connection pool health statistics of this server")
+async def get_pool_stats(
+    mcp_api_key: Annotated[str, "MCP API Key for authentication"],
+    ctx: Context = None,
+) -> PoolStatsResponse:
+    """Return a snapshot of the database connection pool statistics."""
+    check_api_key(mcp_api_key)
+    start = time.time()
+    pool = ctx.request_context.lifespan_context.pool
+    try:
+        return PoolStatsResponse(
+            stats=PoolStats(**pool_stats(pool)),
+            query_time_ms=round((time.time() - start) * 1000, 2),
+        )
+    except Exception as exc:
+        logger.error("get_pool_stats failed", exc_info=True)
+        return PoolStatsResponse(
+            stats=None,
+            query_time_ms=round((time.time() - start) * 1000, 2),
+            error=str(exc),
+        )
+
+
 # ────────────────────────────── CLI entrypoint ──────────────────────
 if __name__ == "__main__":
     import argparse
 
+    import uvicorn
+
     parser = argparse.ArgumentParser("Repeated Calls Operations MCP Server")
     parser.add_argument("--host", default="0.0.0.0")
     parser.add_argument("--port", type=int, default=3000)
@@ -95,4 +237,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     logger.info("Starting Operations MCP server")
-    mcp.run(transport=args.transport)
+    if args.transport == "sse":
+        uvicorn.run(app, host=args.host, port=args.port)
+    else:
+        mcp.run(transport=args.transport)
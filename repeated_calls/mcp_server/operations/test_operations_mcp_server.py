@@ -76,6 +76,17 @@ async def main(host: str, product_id: int):
             test_plan = [
                 ("get_software_updates", {}),  # all updates
                 ("get_software_updates", {"product_id": product_id}),
+                (
+                    "get_software_updates",
+                    {"product_id": product_id, "fields": ["id", "rollout_date"]},
+                ),
+                (
+                    "get_updates_near",
+                    {"product_ids": [product_id], "at_timestamp": "2024-01-10T10:00:00"},
+                ),
+                ("check_outages", {"product_id": product_id}),
+                ("check_bugs", {"product_id": product_id, "at_timestamp": "2024-01-10T10:00:00"}),
+                ("get_pool_stats", {}),
             ]
 
             for name, params in test_plan:
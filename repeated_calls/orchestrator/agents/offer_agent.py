@@ -1,5 +1,7 @@
 """Pre-built Semantic Kernel agent creating an offer recommendation."""
 
+import re
+
 from semantic_kernel import Kernel
 from semantic_kernel.agents import AgentGroupChat, ChatCompletionAgent
 from semantic_kernel.agents.strategies import TerminationStrategy
@@ -11,12 +13,21 @@ from semantic_kernel.functions import KernelArguments
 # in draft_review_agent.py
 
 
+# The reviewer starts its reply with the keyword to approve, so e.g. "Not approved" does not count
+_APPROVAL = re.compile(r"^[\W_]*approved\b", re.IGNORECASE)
+
+
+def is_approval(message) -> bool:
+    """Return whether a message of the reviewer approves the draft."""
+    return bool(_APPROVAL.match(message.content or ""))
+
+
 class ApprovalTerminationStrategy(TerminationStrategy):
     """Termination strategy for the agent group chat."""
 
     async def should_agent_terminate(self, agent, history):
         """Check if the agent should terminate based on the last message in the chat history."""
-        return "approved" in history[-1].content.lower()
+        return is_approval(history[-1])
 
 
 def get_agent(kernel: Kernel, draft_instructions: str, reviewer_instructions: str) -> AgentGroupChat:
@@ -0,0 +1,118 @@
+"""Checkpoints of the state of a run, to resume it after a crash.
+
+The repeated-call and cause steps save the state to the `checkpoint` table, keyed by call event ID,
+before they hand it to the next step. When a message is redelivered after the process died
+halfway, `run_sequence` loads the checkpoint and resumes after the last completed step, instead
+of repeating the agent calls of the completed steps. As the checkpoints are kept in Postgres, they
+survive a restart of the container and are found by whichever replica gets the redelivered
+message. The checkpoint is deleted once the run completes.
+"""
+
+from datetime import datetime, timedelta
+
+from psycopg.types.json import Jsonb
+
+from repeated_calls.orchestrator.entities.state import State
+from repeated_calls.orchestrator.settings import CheckpointSettings
+from repeated_calls.utils.loggers import get_application_logger
+
+logger = get_application_logger(__name__)
+
+UPSERT_CHECKPOINT = """
+    INSERT INTO public.checkpoint (call_event_id, step, state, saved_at) VALUES (%s, %s, %s, %s)
+    ON CONFLICT (call_event_id) DO UPDATE
+        SET step = EXCLUDED.step, state = EXCLUDED.state, saved_at = EXCLUDED.saved_at
+"""
+
+SELECT_CHECKPOINT = """
+    SELECT step, state FROM public.checkpoint WHERE call_event_id = %s AND saved_at >= %s
+"""
+
+DELETE_CHECKPOINT = "DELETE FROM public.checkpoint WHERE call_event_id = %s OR saved_at < %s"
+
+
+class CheckpointStore:
+    """Store of the last completed step and state of each run, in the database.
+
+    The checkpoints are written through the process-wide connection pool. Failing to save or load
+    a checkpoint is logged and otherwise ignored, at worst a run then starts from scratch.
+    """
+
+    def __init__(self, settings: CheckpointSettings | None = None) -> None:
+        """Initialise the store.
+
+        Args:
+            settings (CheckpointSettings | None): The checkpoint settings. Defaults to the settings
+                from the environment.
+        """
+        self.settings = settings or CheckpointSettings()
+
+    async def _execute(self, sql: str, params: tuple) -> list[tuple]:
+        # Imported here, as the module reads the database settings when it is imported
+        from repeated_calls.mcp_server.common.db import get_shared_pool
+
+        pool = await get_shared_pool("orchestrator")
+        async with pool.connection() as conn, conn.cursor() as cur:
+            await cur.execute(sql, params)
+            return await cur.fetchall() if cur.description else []
+
+    async def save(self, state: State, step: str) -> None:
+        """Save `state` as completed up to and including `step`."""
+        params = (
+            state.call_event.id,
+            step,
+            Jsonb(state.model_dump(mode="json")),
+            datetime.now(),
+        )
+        try:
+            await self._execute(UPSERT_CHECKPOINT, params)
+        except Exception:
+            logger.warning(
+                f"Could not save checkpoint of call event {state.call_event.id}", exc_info=True
+            )
+
+    async def load(self, call_event_id: int) -> tuple[str, State] | None:
+        """Return the last completed step and the state of a call event, if checkpointed."""
+        params = (call_event_id, datetime.now() - timedelta(seconds=self.settings.ttl_s))
+        try:
+            rows = await self._execute(SELECT_CHECKPOINT, params)
+        except Exception:
+            logger.warning(
+                f"Could not load checkpoint of call event {call_event_id}", exc_info=True
+            )
+            return None
+        if not rows:
+            return None
+        step, state = rows[0]
+        return step, State.model_validate(state)
+
+    async def delete(self, call_event_id: int) -> None:
+        """Delete the checkpoint of a completed run, and the checkpoints that have expired."""
+        params = (call_event_id, datetime.now() - timedelta(seconds=self.settings.ttl_s))
+        try:
+            await self._execute(DELETE_CHECKPOINT, params)
+        except Exception:
+            logger.warning(
+                f"Could not delete checkpoint of call event {call_event_id}", exc_info=True
+            )
+
+
+_store: CheckpointStore | None = None
+
+
+def get_checkpoint_store() -> CheckpointStore | None:
+    """Return the checkpoint store shared by the process, or `None` if checkpointing is disabled."""
+    global _store
+    if _store is None:
+        settings = CheckpointSettings()
+        if not settings.enabled:
+            return None
+        _store = CheckpointStore(settings)
+    return _store
+
+
+async def save_checkpoint(state: State, step: str) -> None:
+    """Save `state` as completed up to and including `step`, if checkpointing is enabled."""
+    store = get_checkpoint_store()
+    if store:
+        await store.save(state, step)
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 from repeated_calls.database.schemas import CallEvent, Customer, HistoricCallEvent
 from repeated_calls.orchestrator.entities.structured_output import CauseResult, OfferResult, RepeatedCallResult
@@ -20,8 +20,12 @@ class State(BaseModel):
     repeated_call_result: RepeatedCallResult | None = Field(default=None)
     cause_result: CauseResult | None = Field(default=None)
     offer_result: OfferResult | None = Field(default=None)
+    timed_out_steps: list[str] = Field(default_factory=list)
+    failed_steps: list[str] = Field(default_factory=list)
     run_timestamp: str | None = Field(default=None)
     row_id: str | None = Field(default=None)
+    # The error that left the run incomplete, not stored with the state
+    _error: BaseException | None = PrivateAttr(default=None)
 
     model_config = ConfigDict(extra="ignore", json_encoders={datetime: lambda v: v.strftime("%Y-%m-%d %H:%M:%S")})
 
@@ -32,6 +36,25 @@ class State(BaseModel):
             call_event=call_event,
         )
 
+    @property
+    def error(self) -> BaseException | None:
+        """The error a step timed out or failed with during this run, if any."""
+        return self._error
+
+    @property
+    def complete(self) -> bool:
+        """Whether no step timed out or failed during the run."""
+        return not self.timed_out_steps and not self.failed_steps
+
+    def record_incomplete(self, step: str, error: BaseException) -> None:
+        """Record that `step` timed out or failed with `error`, leaving the run incomplete.
+
+        The process runtime only logs the error of a step, so the listener reports it from here.
+        """
+        steps = self.timed_out_steps if isinstance(error, TimeoutError) else self.failed_steps
+        steps.append(step)
+        self._error = error
+
     def update(self, *args) -> None:
         """Update the state with customer data or call history."""
         for arg in args:
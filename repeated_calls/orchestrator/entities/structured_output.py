@@ -37,3 +37,4 @@ class OfferResult(BaseModel):
     advice: str = Field(
         description="The recommendation you give to the customer service employee on what offer to make to the customer."
     )
+    approved: bool = Field(default=False, description="Whether the reviewer approved the advice.")
@@ -0,0 +1,375 @@
+"""Batched ingestion of processed call events into the database.
+
+The listener hands the state of every processed call event to a `StateWriter`, which buffers them
+and writes them in batches: as soon as `batch_size` states are pending, and otherwise every
+`flush_interval_ms`. Each call event is written to `call_event` and, together with the outcome of
+the process, to `historic_call_event`, so the next call of the same customer sees it in its
+history. The results of the process are written to `advice`, to be read back without re-running it.
+
+The call event inserts are idempotent (`ON CONFLICT DO NOTHING` on the call event ID), so a
+redelivered message does not duplicate the history. A state the database rejects, e.g. of a
+customer that does not exist, is dropped so it does not hold up the states after it; other failed
+writes are retried with exponential backoff. Moreover, the writer doubles as idempotency
+store: `processed_state` returns the stored state of a call event processed within
+`idempotency_ttl_s`, so a redelivered message is not run through the process again. To not process
+a call event twice at the same time, e.g. when its message is redelivered after the lock was lost,
+a worker `claim`s it in `call_event_claim` first. The claim is released in the transaction that
+writes the state of the call event, or after `claim_ttl_s` if the worker died.
+"""
+
+import asyncio
+from collections import deque
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import psycopg
+import psycopg_pool
+from psycopg.types.json import Jsonb
+
+from repeated_calls.orchestrator.entities.state import State
+from repeated_calls.orchestrator.settings import IngestionSettings
+from repeated_calls.utils.loggers import get_application_logger
+
+logger = get_application_logger(__name__)
+
+INSERT_CALL_EVENT = """
+    INSERT INTO public.call_event (id, customer_id, sdc, timestamp)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (id) DO NOTHING
+"""
+
+INSERT_HISTORIC_CALL_EVENT = """
+    INSERT INTO public.historic_call_event
+        (call_event_id, customer_id, sdc, call_summary, start_time, end_time)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON CONFLICT (call_event_id, start_time) DO NOTHING
+"""
+
+# A product ID the cause agent made up is stored as NULL, it would violate the foreign key
+INSERT_ADVICE = """
+    INSERT INTO public.advice (
+        call_event_id, customer_id, product_id, call_timestamp, is_repeated_call,
+        repeated_call_conclusion, is_relevant, cause_conclusion, advice, approved, created_at,
+        message_id, state
+    )
+    SELECT %s, %s, (SELECT id FROM public.product WHERE id = %s), %s, %s, %s, %s, %s, %s, %s, %s,
+           %s, %s
+"""
+
+# Only complete runs, a run of which a step timed out or failed is processed again
+SELECT_PROCESSED_STATE = """
+    SELECT state
+    FROM public.advice
+    WHERE call_event_id = %s AND created_at >= %s AND state IS NOT NULL
+        AND COALESCE(state -> 'timed_out_steps', '[]') = '[]'
+        AND COALESCE(state -> 'failed_steps', '[]') = '[]'
+    ORDER BY created_at DESC
+    LIMIT 1
+"""
+
+CLAIM_CALL_EVENT = """
+    INSERT INTO public.call_event_claim AS c (call_event_id, message_id, token, claimed_until)
+    VALUES (%s, %s, %s, LOCALTIMESTAMP + make_interval(secs => %s))
+    ON CONFLICT (call_event_id) DO UPDATE
+        SET message_id = EXCLUDED.message_id,
+            token = EXCLUDED.token,
+            claimed_until = EXCLUDED.claimed_until
+        WHERE c.claimed_until < LOCALTIMESTAMP
+    RETURNING token
+"""
+
+RELEASE_CALL_EVENT = """
+    DELETE FROM public.call_event_claim
+    WHERE call_event_id = %s AND token = %s
+"""
+
+RELEASE_WRITTEN_CALL_EVENT = """
+    DELETE FROM public.call_event_claim
+    WHERE call_event_id = %s
+"""
+
+# Errors of a state the database will never accept, unlike e.g. a lost connection
+REJECTED_ERRORS = (psycopg.IntegrityError, psycopg.DataError)
+
+
+def summarize(state: State) -> str:
+    """Return the outcome of the process for `state`, stored as the call summary."""
+    parts = []
+    if state.repeated_call_result:
+        parts.append(state.repeated_call_result.conclusion)
+    if state.cause_result:
+        parts.append(state.cause_result.conclusion)
+    if state.offer_result:
+        approval = "Advice" if state.offer_result.approved else "Advice (not approved)"
+        parts.append(f"{approval}: {state.offer_result.advice}")
+    if state.timed_out_steps:
+        steps = ", ".join(step.replace("_", "-") for step in state.timed_out_steps)
+        parts.append(f"Processing was incomplete, the {steps} step timed out.")
+    if state.failed_steps:
+        steps = ", ".join(step.replace("_", "-") for step in state.failed_steps)
+        parts.append(f"Processing was incomplete, the {steps} step failed.")
+    return " ".join(parts) or "Processed automatically, no outcome was determined."
+
+
+def advice_row(state: State, created_at: datetime, message_id: str | None = None) -> tuple:
+    """Return the `advice` row holding the results of the process for `state`."""
+    event = state.call_event
+    repeated, cause, offer = state.repeated_call_result, state.cause_result, state.offer_result
+    return (
+        event.id,
+        event.customer_id,
+        cause.product_id if cause else None,
+        event.timestamp,
+        repeated.is_repeated_call if repeated else None,
+        repeated.conclusion if repeated else None,
+        cause.is_relevant if cause else None,
+        cause.conclusion if cause else None,
+        offer.advice if offer else None,
+        offer.approved if offer else None,
+        created_at,
+        message_id,
+        Jsonb(state.model_dump(mode="json")),
+    )
+
+
+class StateWriter:
+    """Buffer the states of processed call events and write them to the database in batches.
+
+    Use as an async context manager; leaving the context flushes the pending states. The states are
+    written through the process-wide connection pool, which the owner of the process closes.
+    """
+
+    def __init__(self, settings: IngestionSettings | None = None) -> None:
+        """Initialise the writer.
+
+        Args:
+            settings (IngestionSettings | None): The ingestion settings. Defaults to the settings
+                from the environment.
+        """
+        self.settings = settings or IngestionSettings()
+        self._pending: deque[tuple[tuple, tuple, tuple, State]] = deque()
+        self._writing: list[tuple[tuple, tuple, tuple, State]] = []  # the batch being written
+        self._full = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._failures = 0  # consecutive failed flushes
+        self._claims: dict[int, str] = {}  # tokens of the call events claimed by this writer
+        self._lock = asyncio.Lock()
+        self._pool: psycopg_pool.AsyncConnectionPool | None = None
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> "StateWriter":
+        """Open the connection pool and start writing in the background."""
+        # Imported here, as the module reads the database settings when it is imported
+        from repeated_calls.mcp_server.common.db import get_shared_pool
+
+        self._pool = await get_shared_pool("orchestrator")
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        """Stop writing in the background and write the pending states."""
+        # Let a batch being written finish, cancelling the write would roll it back
+        self._closing.set()
+        self._full.set()
+        await self._task
+        await self.flush()
+
+    async def add(self, state: State, message_id: str | None = None) -> None:
+        """Buffer a processed `state`: its call event, call history entry and advice.
+
+        Args:
+            state (State): The state after processing the call event.
+            message_id (str | None): ID of the message the call event was received in.
+        """
+        event = state.call_event
+        # The claim is released when the state is written
+        self._claims.pop(event.id, None)
+        self._pending.append(
+            (
+                (event.id, event.customer_id, event.sdc, event.timestamp),
+                # The duration of the call is unknown, so it starts and ends at the call time
+                (
+                    event.id,
+                    event.customer_id,
+                    event.sdc,
+                    summarize(state),
+                    event.timestamp,
+                    event.timestamp,
+                ),
+                advice_row(state, datetime.now(), message_id),
+                state,
+            )
+        )
+        if len(self._pending) > self.settings.max_pending:
+            self._pending.popleft()
+            logger.warning("Ingestion buffer full, dropped the oldest state")
+        if len(self._pending) >= self.settings.batch_size:
+            self._full.set()
+
+    async def processed_state(self, call_event_id: int) -> State | None:
+        """Return the state of a call event processed within the idempotency TTL, if any.
+
+        Only a complete run is returned, a call event of which a step timed out or failed is
+        processed again. Failing to look it up is logged and treated as not processed, so at worst
+        the call event is processed twice.
+        """
+        ttl = self.settings.idempotency_ttl_s
+        if ttl <= 0:
+            return None
+
+        # The state may not have been written yet
+        for *_, state in [*self._writing, *self._pending]:
+            if state.call_event.id == call_event_id and state.complete:
+                return state
+
+        try:
+            async with self._pool.connection() as conn, conn.cursor() as cur:
+                since = datetime.now() - timedelta(seconds=ttl)
+                await cur.execute(SELECT_PROCESSED_STATE, (call_event_id, since))
+                row = await cur.fetchone()
+        except Exception:
+            logger.warning(f"Could not check whether {call_event_id} was processed", exc_info=True)
+            return None
+        return State.model_validate(row[0]) if row else None
+
+    async def claim(self, call_event_id: int, message_id: str | None = None) -> State | None:
+        """Claim a call event for processing, waiting while another worker processes it.
+
+        Failing to claim it is logged and treated as claimed, so at worst the call event is
+        processed twice.
+
+        Args:
+            call_event_id (int): ID of the call event.
+            message_id (str | None): ID of the message the call event was received in.
+
+        Returns:
+            State | None: The state of the call event if another worker processed it while waiting,
+                the call event is then not claimed. `None` once it is claimed.
+        """
+        if self.settings.idempotency_ttl_s <= 0:
+            return None
+
+        token = uuid4().hex
+        waiting = False
+        while True:
+            try:
+                async with self._pool.connection() as conn, conn.cursor() as cur:
+                    await cur.execute(
+                        CLAIM_CALL_EVENT,
+                        (call_event_id, message_id, token, self.settings.claim_ttl_s),
+                    )
+                    claimed = await cur.fetchone()
+            except Exception:
+                logger.warning(f"Could not claim {call_event_id}", exc_info=True)
+                return None
+            if claimed:
+                self._claims[call_event_id] = token
+                return None
+
+            if not waiting:
+                logger.info(f"CallEvent ID {call_event_id} is processed by another worker, waiting")
+                waiting = True
+            await asyncio.sleep(self.settings.claim_poll_interval_s)
+            if state := await self.processed_state(call_event_id):
+                return state
+
+    async def release(self, call_event_id: int) -> None:
+        """Release the claim of a call event that was not processed, e.g. because it failed."""
+        token = self._claims.pop(call_event_id, None)
+        if token is None:
+            return
+        try:
+            async with self._pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(RELEASE_CALL_EVENT, (call_event_id, token))
+        except Exception:
+            logger.warning(f"Could not release the claim of {call_event_id}", exc_info=True)
+
+    async def flush(self) -> None:
+        """Write all pending states; the states of a batch that failed are kept for the next flush.
+
+        The states the database rejects are dropped, see `_write_batch`.
+        """
+        async with self._lock:
+            while self._pending:
+                size = min(len(self._pending), self.settings.batch_size)
+                batch = self._writing = [self._pending.popleft() for _ in range(size)]
+                try:
+                    await self._write_batch(batch)
+                except Exception:
+                    logger.error(f"Writing {len(batch)} state(s) failed", exc_info=True)
+                    self._pending.extendleft(reversed(batch))
+                    self._failures += 1
+                    return
+                except asyncio.CancelledError:
+                    # The transaction is rolled back, keep the batch for the final flush
+                    self._pending.extendleft(reversed(batch))
+                    raise
+                finally:
+                    self._writing = []
+                self._failures = 0
+
+    async def _write_batch(self, batch: list[tuple[tuple, tuple, tuple, State]]) -> None:
+        """Write a batch of states, removing the states from `batch` once written or dropped.
+
+        When the database rejects the batch, its states are written one at a time, and a state the
+        database rejects on its own is logged and dropped.
+        """
+        try:
+            await self._write(batch)
+            logger.debug(f"Wrote {len(batch)} state(s)")
+            batch.clear()
+            return
+        except REJECTED_ERRORS as e:
+            logger.warning(f"Writing {len(batch)} state(s) failed, writing them one by one: {e}")
+
+        while batch:
+            try:
+                await self._write(batch[:1])
+            except REJECTED_ERRORS:
+                call_event_id = batch[0][3].call_event.id
+                logger.error(
+                    f"Dropped the state of CallEvent ID {call_event_id}, the database rejected it",
+                    exc_info=True,
+                )
+                await self._release_written(call_event_id)
+            batch.pop(0)
+
+    async def _write(self, batch: list[tuple[tuple, tuple, tuple, State]]) -> None:
+        """Write the states of `batch` in a single transaction, releasing their claims."""
+        async with self._pool.connection() as conn, conn.cursor() as cur:
+            await cur.executemany(INSERT_CALL_EVENT, [b[0] for b in batch])
+            await cur.executemany(INSERT_HISTORIC_CALL_EVENT, [b[1] for b in batch])
+            await cur.executemany(INSERT_ADVICE, [b[2] for b in batch])
+            await cur.executemany(
+                RELEASE_WRITTEN_CALL_EVENT, [(b[3].call_event.id,) for b in batch]
+            )
+
+    async def _release_written(self, call_event_id: int) -> None:
+        """Release the claim of a call event whose state was not written."""
+        try:
+            async with self._pool.connection() as conn, conn.cursor() as cur:
+                await cur.execute(RELEASE_WRITTEN_CALL_EVENT, (call_event_id,))
+        except Exception:
+            logger.warning(f"Could not release the claim of {call_event_id}", exc_info=True)
+
+    async def _run(self) -> None:
+        """Flush whenever a batch is full or the flush interval has passed, until closing.
+
+        After a failed flush the next one waits with exponential backoff, only closing cuts it
+        short.
+        """
+        interval = self.settings.flush_interval_ms / 1000
+        while not self._closing.is_set():
+            event, timeout = self._full, interval
+            if self._failures:
+                event = self._closing
+                timeout = min(
+                    self.settings.retry_backoff_s * 2 ** (self._failures - 1),
+                    self.settings.max_retry_backoff_s,
+                )
+            try:
+                await asyncio.wait_for(event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
@@ -9,19 +9,23 @@ from importlib.resources import files
 
 from opentelemetry import trace
 from semantic_kernel import Kernel
-from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
-from semantic_kernel.processes import ProcessBuilder
-from semantic_kernel.processes.local_runtime.local_event import KernelProcessEvent
-from semantic_kernel.processes.local_runtime.local_kernel_process import start
+from semantic_kernel.connectors.mcp import MCPSsePlugin
+from semantic_kernel.filters import FilterTypes
 
 from repeated_calls.database.schemas import CallEvent
+from repeated_calls.orchestrator.checkpoints import get_checkpoint_store
 from repeated_calls.orchestrator.entities.state import State
+from repeated_calls.orchestrator.offline import MockChatCompletion
+from repeated_calls.orchestrator.pipeline import ENGINES
 from repeated_calls.orchestrator.plugins import McpApiKeyPlugin, customer_plugin, operations_plugin
-from repeated_calls.orchestrator.settings import AppInsightsSettings, AzureOpenAISettings
-from repeated_calls.orchestrator.steps.determine_cause import DetermineCauseStep
-from repeated_calls.orchestrator.steps.determine_recommendation import DetermineRecommendationStep
-from repeated_calls.orchestrator.steps.determine_repeated_call import DetermineRepeatedCallStep
-from repeated_calls.orchestrator.steps.exit_step import ExitStep
+from repeated_calls.orchestrator.plugins.circuit_breaker import CircuitBreakerFilter
+from repeated_calls.orchestrator.rate_limiting import RateLimitedAzureChatCompletion
+from repeated_calls.orchestrator.settings import (
+    AppInsightsSettings,
+    AzureOpenAISettings,
+    MockModelSettings,
+    PipelineSettings,
+)
 from repeated_calls.utils.loggers import get_application_logger
 from repeated_calls.utils.otel import configure_telemetry
 
@@ -34,6 +38,9 @@ configure_telemetry(appinsights_settings.connection_string, "repeated-calls-serv
 logger = get_application_logger(__name__)
 logger.info("Telemetry configured for Azure Monitor")
 
+# Input event resuming the process after the last completed step of a checkpoint
+RESUME_EVENTS = {"repeated_call": "ResumeCause", "cause": "ResumeRecommendation"}
+
 
 def get_event() -> CallEvent:
     """Create a sample CallEvent object."""
@@ -65,17 +72,31 @@ async def run_sequence(call_event: CallEvent) -> State:
         span.set_attribute("call_event.id", str(call_event.id))
         span.set_attribute("call_event.customer_id", str(call_event.customer_id))
 
-        try:
-            settings = AzureOpenAISettings()
+        # Resume after the last completed step of an interrupted run of this call event
+        initial_event = "Start"
+        checkpoints = get_checkpoint_store()
+        checkpoint = await checkpoints.load(call_event.id) if checkpoints else None
+        if checkpoint:
+            step, state = checkpoint
+            initial_event = RESUME_EVENTS[step]
+            logger.info(f"Resuming CallEvent ID {call_event.id} after the {step} step")
+            span.set_attribute("resumed_after", step)
 
+        try:
             kernel = Kernel()
-            kernel.add_service(
-                AzureChatCompletion(
-                    endpoint=settings.endpoint,
-                    api_key=settings.api_key.get_secret_value() if settings.api_key else None,
-                    deployment_name=settings.deployment,
+            mock_settings = MockModelSettings()
+            if mock_settings.enabled:
+                # Scripted responses instead of the model, for benchmarks without network
+                kernel.add_service(MockChatCompletion(mock_settings))
+            else:
+                settings = AzureOpenAISettings()
+                kernel.add_service(
+                    RateLimitedAzureChatCompletion(
+                        endpoint=settings.endpoint,
+                        api_key=settings.api_key.get_secret_value() if settings.api_key else None,
+                        deployment_name=settings.deployment,
+                    )
                 )
-            )
 
             # Keep MCP plugins alive for the whole run
             async with customer_plugin() as cust, operations_plugin() as ops:
@@ -83,41 +104,23 @@ async def run_sequence(call_event: CallEvent) -> State:
                 kernel.add_plugin(ops, ops.name)  # → "OperationsDataPlugin"
                 kernel.add_plugin(McpApiKeyPlugin(), "McpApiKeyPlugin")
 
-                process_builder = ProcessBuilder("RepeatedCalls")
-
-                # Add steps
-                determine_repeated_call = process_builder.add_step(DetermineRepeatedCallStep)
-                determine_cause = process_builder.add_step(DetermineCauseStep)
-                determine_recommendation = process_builder.add_step(DetermineRecommendationStep)
-                exit_step = process_builder.add_step(ExitStep)
-
-                # Orchestrate steps
-                process_builder.on_input_event("Start").send_event_to(
-                    determine_repeated_call, function_name="repeated_call", parameter_name="state"
-                )
-
-                determine_repeated_call.on_event("IsRepeatedCall").send_event_to(
-                    determine_cause, function_name="cause", parameter_name="state"
-                )
-                determine_repeated_call.on_event("IsNotRepeatedCall").send_event_to(exit_step)
-
-                determine_cause.on_event("IsRelevant").send_event_to(
-                    determine_recommendation, function_name="recommend", parameter_name="state"
-                )
-                determine_cause.on_event("IsNotRelevant").send_event_to(exit_step)
-
-                determine_recommendation.on_event("Exit").send_event_to(exit_step)
-
-                # Compile/build
-                process = process_builder.build()
-
-                logger.info("Starting process execution...")
-                await start(
-                    process=process,
-                    kernel=kernel,
-                    initial_event=KernelProcessEvent(id="Start", data=state),
+                # Answer tool calls from the fallback while an MCP server is failing
+                mcp_plugins = [p.name for p in (cust, ops) if isinstance(p, MCPSsePlugin)]
+                kernel.add_filter(
+                    FilterTypes.FUNCTION_INVOCATION, CircuitBreakerFilter(mcp_plugins)
                 )
 
+                engine = PipelineSettings().engine
+                span.set_attribute("engine", engine)
+                logger.info(f"Starting process execution ({engine} engine)...")
+                await ENGINES[engine](kernel, state, initial_event)
+                if checkpoints:
+                    await checkpoints.delete(call_event.id)
+
+                if state.timed_out_steps:
+                    span.set_attribute("timed_out_steps", state.timed_out_steps)
+                if state.failed_steps:
+                    span.set_attribute("failed_steps", state.failed_steps)
                 logger.info("Process execution completed successfully.")
                 return state
 
@@ -161,7 +164,14 @@ async def main() -> None:
         call_event = get_event()
         logger.info("Using sample call event from CSV.")
 
-        _ = await run_sequence(call_event)
+        # Imported here, as the module reads the database settings when it is imported
+        from repeated_calls.mcp_server.common.db import close_shared_pool
+
+        try:
+            _ = await run_sequence(call_event)
+        finally:
+            # Opened by the checkpoints of the run
+            await close_shared_pool()
 
     logger.info("Application finished.")
 
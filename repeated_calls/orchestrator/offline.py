@@ -0,0 +1,232 @@
+"""Offline stand-ins for the model and the MCP servers, to benchmark the orchestrator locally.
+
+`MockChatCompletion` replaces the Azure OpenAI chat completion service of `run_sequence` when
+`MOCK_MODEL_ENABLED` is set. It answers the agents with scripted results after a random latency.
+The stand-in MCP servers serve the tools of the CSV-backed plugins, which mirror the tools of the
+real servers except for the advice, over SSE. Together they run the whole process without network,
+Azure or Postgres.
+
+Example (stand-in MCP servers on the ports of the real ones):
+    python -m repeated_calls.orchestrator.offline --customer-port 8000 --operations-port 8001
+"""
+
+import argparse
+import asyncio
+import inspect
+import math
+import os
+import random
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from importlib.resources import files
+from typing import Any, AsyncIterator
+
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.connectors.ai.open_ai import AzureChatPromptExecutionSettings
+from semantic_kernel.contents import AuthorRole, ChatHistory, ChatMessageContent
+from starlette.applications import Starlette
+
+from repeated_calls.orchestrator.entities.structured_output import CauseResult, RepeatedCallResult
+from repeated_calls.orchestrator.plugins.csv.customer import CustomerDataPlugin
+from repeated_calls.orchestrator.plugins.csv.operations import OperationsDataPlugin
+from repeated_calls.orchestrator.settings import MockModelSettings
+from repeated_calls.utils.loggers import get_application_logger
+
+logger = get_application_logger(__name__)
+
+
+@dataclass
+class MockModelStats:
+    """Requests answered by the mock model and the latency it simulated, over the process."""
+
+    requests: int = 0
+    latency_s: float = 0.0
+
+
+stats = MockModelStats()
+
+_rng: random.Random | None = None
+
+
+def _get_rng(seed: int | None) -> random.Random:
+    """Return the random generator shared by the process, so seeded runs differ from each other."""
+    global _rng
+    if _rng is None:
+        _rng = random.Random(seed)
+    return _rng
+
+
+def sample_latency_s(settings: MockModelSettings, rng: random.Random) -> float:
+    """Return a latency in seconds drawn from the distribution of `settings`."""
+    mean, sd = settings.latency_mean_ms / 1000, settings.latency_sd_ms / 1000
+    if mean <= 0:
+        return 0.0
+    if settings.latency == "uniform":
+        half_width = math.sqrt(3) * sd
+        return max(0.0, rng.uniform(mean - half_width, mean + half_width))
+    if settings.latency == "normal":
+        return max(0.0, rng.gauss(mean, sd))
+    if settings.latency == "lognormal":
+        # Parameters of the underlying normal distribution giving this mean and deviation
+        sigma = math.sqrt(math.log(1 + (sd / mean) ** 2))
+        return rng.lognormvariate(math.log(mean) - sigma**2 / 2, sigma)
+    if settings.latency == "exponential":
+        return rng.expovariate(1 / mean)
+    return mean
+
+
+class MockChatCompletion(ChatCompletionClientBase):
+    """Chat completion service answering the agents with scripted responses.
+
+    A request with the structured output format of the repeated-call or cause agent gets a result
+    of that format, in which the call is repeated and the cause relevant at the configured rates.
+    Otherwise the request is from the recommendation chat: the drafter gets a draft, the reviewer
+    rejects the first `reviewer_rejections` drafts and approves the next. The customer and product
+    IDs of the results are 0, the state keeps those of the call event.
+    """
+
+    mock_settings: MockModelSettings
+
+    def __init__(self, settings: MockModelSettings | None = None) -> None:
+        """Initialise the service.
+
+        Args:
+            settings (MockModelSettings | None): The mock model settings. Defaults to the settings
+                from the environment.
+        """
+        super().__init__(ai_model_id="mock", mock_settings=settings or MockModelSettings())
+
+    def get_prompt_execution_settings_class(self) -> type[AzureChatPromptExecutionSettings]:
+        """Keep the structured output format of the agents."""
+        return AzureChatPromptExecutionSettings
+
+    async def _inner_get_chat_message_contents(
+        self, chat_history: ChatHistory, settings: Any
+    ) -> list[ChatMessageContent]:
+        rng = _get_rng(self.mock_settings.seed)
+        latency = sample_latency_s(self.mock_settings, rng)
+        stats.requests += 1
+        stats.latency_s += latency
+        await asyncio.sleep(latency)
+        content = self._respond(chat_history, getattr(settings, "response_format", None), rng)
+        return [ChatMessageContent(role=AuthorRole.ASSISTANT, content=content)]
+
+    def _respond(self, chat_history: ChatHistory, response_format: Any, rng: random.Random) -> str:
+        if response_format is RepeatedCallResult:
+            repeated = rng.random() < self.mock_settings.repeated_call_rate
+            return RepeatedCallResult(
+                customer_id=0,
+                analysis="The issue of the call matches that of a previous call.",
+                conclusion="Repeated call." if repeated else "Not a repeated call.",
+                is_repeated_call=repeated,
+            ).model_dump_json()
+        if response_format is CauseResult:
+            relevant = rng.random() < self.mock_settings.relevant_rate
+            return CauseResult(
+                customer_id=0,
+                product_id=0,
+                analysis="A software update was rolled out shortly before the call.",
+                conclusion="The update caused the issue." if relevant else "No known cause.",
+                is_relevant=relevant,
+            ).model_dump_json()
+
+        # The recommendation chat alternates between the drafter and the reviewer, the instructions
+        # of the agent answering are the system message named after it
+        messages = chat_history.messages
+        agent = next((m.name for m in messages if m.role == AuthorRole.SYSTEM), None)
+        # The group chat may repeat a message in the history of an agent, so count the turns
+        names = [m.name if m.role == AuthorRole.ASSISTANT else None for m in messages]
+        reviews = sum(n == "Reviewer" != p for p, n in zip([None, *names], names))
+        if agent == "Reviewer":
+            if reviews >= self.mock_settings.reviewer_rejections:
+                return "Approved"
+            return "Revise the draft, the offer is too vague."
+        return f"Offer the customer a 10% discount for 3 months (draft {reviews + 1})."
+
+
+def mcp_app(name: str, plugin: object) -> Starlette:
+    """Return an ASGI app serving the kernel functions of `plugin` as the tools of an MCP server."""
+    mcp = FastMCP(name)
+    for _, method in inspect.getmembers(plugin, inspect.ismethod):
+        if getattr(method, "__kernel_function__", False):
+            mcp.add_tool(
+                method,
+                name=method.__kernel_function_name__,
+                description=method.__kernel_function_description__,
+            )
+    return mcp.sse_app()
+
+
+@asynccontextmanager
+async def stand_in_mcp_servers(
+    customer_port: int,
+    operations_port: int,
+    host: str = "127.0.0.1",
+    data_path: str | None = None,
+) -> AsyncIterator[tuple[str, str]]:
+    """Serve the stand-in customer and operations MCP servers while in the context.
+
+    Args:
+        customer_port (int): Port of the customer MCP server.
+        operations_port (int): Port of the operations MCP server.
+        host (str): Host the servers listen on. Defaults to `127.0.0.1`.
+        data_path (str | None): Directory with the CSV files. Defaults to the `data` directory of
+            the repository.
+
+    Yields:
+        The SSE URLs of the customer and operations MCP servers.
+    """
+    data_path = data_path or os.path.join(os.path.dirname(files("repeated_calls")), "data")
+    apps = {
+        customer_port: mcp_app(
+            "Repeated Calls Customer Data Service", CustomerDataPlugin(data_path)
+        ),
+        operations_port: mcp_app(
+            "Repeated Calls Operations Data Service", OperationsDataPlugin(data_path)
+        ),
+    }
+    servers = [
+        uvicorn.Server(
+            uvicorn.Config(
+                app, host=host, port=port, log_level="warning", timeout_graceful_shutdown=1
+            )
+        )
+        for port, app in apps.items()
+    ]
+    tasks = [asyncio.create_task(server.serve()) for server in servers]
+    try:
+        while not all(server.started for server in servers):
+            for task in tasks:
+                if task.done():
+                    # A server failed to start, e.g. because its port is in use
+                    task.result()
+                    raise RuntimeError("A stand-in MCP server stopped while starting")
+            await asyncio.sleep(0.05)
+        logger.info(f"Stand-in MCP servers listening on {host}:{customer_port},{operations_port}")
+        yield f"http://{host}:{customer_port}/sse", f"http://{host}:{operations_port}/sse"
+    finally:
+        for server in servers:
+            server.should_exit = True
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def serve(customer_port: int, operations_port: int, host: str) -> None:
+    """Serve the stand-in MCP servers until interrupted."""
+    async with stand_in_mcp_servers(customer_port, operations_port, host) as urls:
+        print(f"CUSTOMER_MCP_URL={urls[0]}\nOPERATIONS_MCP_URL={urls[1]}")
+        await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Repeated Calls stand-in MCP servers")
+    parser.add_argument("--customer-port", type=int, default=8000, help="Customer server port")
+    parser.add_argument("--operations-port", type=int, default=8001, help="Operations server port")
+    parser.add_argument("--host", default="127.0.0.1", help="Host the servers listen on")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.customer_port, args.operations_port, args.host))
+    except KeyboardInterrupt:
+        pass
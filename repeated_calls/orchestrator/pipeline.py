@@ -0,0 +1,134 @@
+"""Engines running the steps of the Repeated Calls process.
+
+The `process` engine wires the steps into a Semantic Kernel process and runs it with the local
+runtime. The `native` engine runs the same steps with direct calls: each step emits its event on a
+context that records it, and the next step is looked up in `TRANSITIONS`. It skips the graph
+construction and event routing of the process framework, and creates the same span per step.
+"""
+
+from opentelemetry import trace
+from opentelemetry.trace import StatusCode
+from semantic_kernel import Kernel
+from semantic_kernel.processes import ProcessBuilder
+from semantic_kernel.processes.kernel_process import KernelProcessStepContext
+from semantic_kernel.processes.kernel_process.kernel_process_message_channel import (
+    KernelProcessMessageChannel,
+)
+from semantic_kernel.processes.local_runtime.local_event import KernelProcessEvent
+from semantic_kernel.processes.local_runtime.local_kernel_process import start
+
+from repeated_calls.orchestrator.entities.state import State
+from repeated_calls.orchestrator.steps.determine_cause import DetermineCauseStep
+from repeated_calls.orchestrator.steps.determine_recommendation import DetermineRecommendationStep
+from repeated_calls.orchestrator.steps.determine_repeated_call import DetermineRepeatedCallStep
+from repeated_calls.orchestrator.steps.exit_step import ExitStep
+from repeated_calls.utils.loggers import get_application_logger
+
+logger = get_application_logger(__name__)
+
+# Step and function handling each event, the same routing as the process of `run_process`
+TRANSITIONS: dict[str, tuple[type, str]] = {
+    "Start": (DetermineRepeatedCallStep, "repeated_call"),
+    "ResumeCause": (DetermineCauseStep, "cause"),
+    "ResumeRecommendation": (DetermineRecommendationStep, "recommend"),
+    "IsRepeatedCall": (DetermineCauseStep, "cause"),
+    "IsNotRepeatedCall": (ExitStep, "exit"),
+    "IsRelevant": (DetermineRecommendationStep, "recommend"),
+    "IsNotRelevant": (ExitStep, "exit"),
+    "TimedOut": (ExitStep, "exit"),
+    "Exit": (ExitStep, "exit"),
+}
+
+
+def build_process():
+    """Build the Semantic Kernel process of the steps."""
+    process_builder = ProcessBuilder("RepeatedCalls")
+
+    # Add steps
+    determine_repeated_call = process_builder.add_step(DetermineRepeatedCallStep)
+    determine_cause = process_builder.add_step(DetermineCauseStep)
+    determine_recommendation = process_builder.add_step(DetermineRecommendationStep)
+    exit_step = process_builder.add_step(ExitStep)
+
+    # Orchestrate steps
+    process_builder.on_input_event("Start").send_event_to(
+        determine_repeated_call, function_name="repeated_call", parameter_name="state"
+    )
+    process_builder.on_input_event("ResumeCause").send_event_to(
+        determine_cause, function_name="cause", parameter_name="state"
+    )
+    process_builder.on_input_event("ResumeRecommendation").send_event_to(
+        determine_recommendation, function_name="recommend", parameter_name="state"
+    )
+
+    determine_repeated_call.on_event("IsRepeatedCall").send_event_to(
+        determine_cause, function_name="cause", parameter_name="state"
+    )
+    determine_repeated_call.on_event("IsNotRepeatedCall").send_event_to(exit_step)
+    determine_repeated_call.on_event("TimedOut").send_event_to(exit_step)
+
+    determine_cause.on_event("IsRelevant").send_event_to(
+        determine_recommendation, function_name="recommend", parameter_name="state"
+    )
+    determine_cause.on_event("IsNotRelevant").send_event_to(exit_step)
+    determine_cause.on_event("TimedOut").send_event_to(exit_step)
+
+    determine_recommendation.on_event("Exit").send_event_to(exit_step)
+
+    # Compile/build
+    return process_builder.build()
+
+
+async def run_process(kernel: Kernel, state: State, initial_event: str) -> None:
+    """Run the steps on `state` as a Semantic Kernel process, starting at `initial_event`."""
+    await start(
+        process=build_process(),
+        kernel=kernel,
+        initial_event=KernelProcessEvent(id=initial_event, data=state),
+    )
+
+
+class _EventRecorder(KernelProcessMessageChannel):
+    """Message channel recording the events emitted by a step."""
+
+    def __init__(self) -> None:
+        self.events: list[KernelProcessEvent] = []
+
+    async def emit_event(self, process_event: KernelProcessEvent) -> None:
+        self.events.append(process_event)
+
+
+async def run_native(kernel: Kernel, state: State, initial_event: str) -> None:
+    """Run the steps on `state` with direct calls, starting at `initial_event`.
+
+    Like the process runtime, an error in a step is logged and ends the run with the state
+    determined so far.
+    """
+    tracer = trace.get_tracer("repeated_calls.orchestrator")
+    event = initial_event
+    while event in TRANSITIONS:
+        step_type, function_name = TRANSITIONS[event]
+        step = step_type()
+        channel = _EventRecorder()
+
+        # Named like the span of the kernel function the process runtime invokes
+        with tracer.start_as_current_span(f"{step_type.__name__}-{function_name}") as span:
+            try:
+                if step_type is ExitStep:
+                    step.exit()
+                    return
+                await getattr(step, function_name)(
+                    state=state, context=KernelProcessStepContext(channel), kernel=kernel
+                )
+            except Exception as exc:
+                span.record_exception(exc)
+                span.set_status(StatusCode.ERROR, str(exc))
+                logger.error(f"Error in Step {step_type.__name__}: {exc!s}")
+                return
+
+        if not channel.events:
+            return
+        event = channel.events[-1].id
+
+
+ENGINES = {"process": run_process, "native": run_native}
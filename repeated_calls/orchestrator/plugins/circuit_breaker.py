@@ -0,0 +1,191 @@
+"""Circuit breakers around the MCP plugins, with a read-only CSV fallback.
+
+Each MCP server has a process-wide `CircuitBreaker`. After `failure_threshold` consecutive failed
+connections or tool calls (errors or timeouts) the circuit opens: runs no longer wait for the
+server but use the CSV-backed plugin of the same name, which mirrors the tools of the server on a
+snapshot of the data; a tool it lacks, like the advice the snapshot does not hold, answers with an
+error. After `reset_timeout_s` the circuit is half-open and a single run probes the server again;
+the circuit closes when the probe succeeds and opens again when it fails or is cancelled.
+"""
+
+import asyncio
+import inspect
+import json
+import os
+import time
+from functools import cache
+from importlib.resources import files
+from typing import Awaitable, Callable
+
+from opentelemetry import metrics
+from semantic_kernel.filters import FunctionInvocationContext
+from semantic_kernel.functions import FunctionResult
+
+from repeated_calls.orchestrator.plugins.csv.customer import CustomerDataPlugin
+from repeated_calls.orchestrator.plugins.csv.operations import OperationsDataPlugin
+from repeated_calls.orchestrator.settings import CircuitBreakerSettings
+from repeated_calls.utils.loggers import get_application_logger
+
+logger = get_application_logger(__name__)
+
+FALLBACK_PLUGINS = {
+    "CustomerDataPlugin": CustomerDataPlugin,
+    "OperationsDataPlugin": OperationsDataPlugin,
+}
+
+# Number of connections and tool calls the fallback stood in for
+fallback_count = 0
+fallback_counter = metrics.get_meter("repeated_calls.orchestrator").create_counter(
+    "mcp.fallback",
+    unit="{call}",
+    description="Number of MCP connections and tool calls the CSV fallback stood in for",
+)
+
+
+class CircuitBreaker:
+    """Circuit breaker of a single MCP server: closed, open or half-open."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout_s: float) -> None:
+        """Initialise a closed circuit breaker."""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """State of the circuit: `closed`, `open` or `half-open`."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout_s:
+            return "open"
+        return "half-open"
+
+    def allow(self) -> bool:
+        """Whether the server may be used; in the half-open state only by a single probe."""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probing:
+            self._probing = True
+            logger.info(f"Circuit of {self.name} half-open, probing the server")
+            return True
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful use of the server, closing the circuit."""
+        if self.opened_at is not None:
+            logger.info(f"Circuit of {self.name} closed")
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Record a failed use of the server, opening the circuit at the threshold."""
+        self.failures += 1
+        # Calls started before the circuit opened may still fail, they do not extend it
+        if self._probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+            logger.warning(
+                f"Circuit of {self.name} opened after {self.failures} failure(s), using the "
+                f"fallback for {self.reset_timeout_s}s"
+            )
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+    def record_cancelled(self) -> None:
+        """Record a use of the server that was cancelled; a cancelled probe counts as failed.
+
+        Otherwise the circuit would stay half-open with the probe in progress, and never be probed
+        again.
+        """
+        if self._probing:
+            self.record_failure()
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Return the circuit breaker shared by the process for the MCP plugin `name`."""
+    if name not in _breakers:
+        settings = CircuitBreakerSettings()
+        _breakers[name] = CircuitBreaker(name, settings.failure_threshold, settings.reset_timeout_s)
+    return _breakers[name]
+
+
+def count_fallback(name: str) -> None:
+    """Count a connection or tool call of the MCP plugin `name` that the fallback stood in for."""
+    global fallback_count
+    fallback_count += 1
+    fallback_counter.add(1, {"plugin": name})
+
+
+@cache
+def fallback_plugin(name: str) -> object | None:
+    """Return the CSV-backed plugin standing in for the MCP plugin `name`, loaded once."""
+    settings = CircuitBreakerSettings()
+    if not settings.fallback_enabled or name not in FALLBACK_PLUGINS:
+        return None
+    data_path = settings.fallback_data_path or os.path.join(
+        os.path.dirname(files("repeated_calls")), "data"
+    )
+    return FALLBACK_PLUGINS[name](data_path)
+
+
+async def invoke_fallback(context: FunctionInvocationContext) -> None:
+    """Set the result of the invoked function to that of the same function of the fallback."""
+    count_fallback(context.function.plugin_name)
+    plugin = fallback_plugin(context.function.plugin_name)
+    method = getattr(plugin, context.function.name, None) if plugin else None
+    if method is None:
+        value = json.dumps(
+            {"error": f"{context.function.name} is unavailable, the server cannot be reached"}
+        )
+    else:
+        parameters = inspect.signature(method).parameters
+        value = method(**{k: v for k, v in context.arguments.items() if k in parameters})
+        if inspect.isawaitable(value):
+            value = await value
+    context.result = FunctionResult(function=context.function.metadata, value=value)
+
+
+class CircuitBreakerFilter:
+    """Function invocation filter guarding the tool calls to MCP plugins with circuit breakers.
+
+    A tool call is sent to the server while its circuit allows it, within `call_timeout_s`. When
+    the circuit is open, or the call fails, the fallback plugin answers it instead.
+    """
+
+    def __init__(self, plugin_names: list[str], settings: CircuitBreakerSettings | None = None):
+        """Initialise the filter for the MCP plugins `plugin_names` of a kernel."""
+        self.plugin_names = set(plugin_names)
+        self.settings = settings or CircuitBreakerSettings()
+
+    async def __call__(
+        self,
+        context: FunctionInvocationContext,
+        next: Callable[[FunctionInvocationContext], Awaitable[None]],
+    ) -> None:
+        """Invoke the function through the circuit breaker of its plugin."""
+        if context.function.plugin_name not in self.plugin_names:
+            await next(context)
+            return
+
+        breaker = get_circuit_breaker(context.function.plugin_name)
+        if breaker.allow():
+            try:
+                async with asyncio.timeout(self.settings.call_timeout_s):
+                    await next(context)
+                breaker.record_success()
+                return
+            except asyncio.CancelledError:
+                breaker.record_cancelled()
+                raise
+            except Exception as e:
+                breaker.record_failure()
+                logger.warning(
+                    f"{context.function.fully_qualified_name} failed, using the fallback: {e!r}"
+                )
+        await invoke_fallback(context)
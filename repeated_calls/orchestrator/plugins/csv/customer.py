@@ -1,6 +1,8 @@
 """Plugins for the customer domain based on CSV files."""
 
 import json
+import re
+from datetime import date, datetime, timedelta, timezone
 from typing import Annotated
 
 from semantic_kernel.functions import kernel_function
@@ -10,9 +12,37 @@ from repeated_calls.utils.loggers import Logger
 
 logger = Logger()
 
+# CLV levels from lowest to highest, a discount applies from its minimum_clv level upwards
+CLV_LEVELS = ("Low", "Med", "High")
+
+
+def _response(**payload) -> str:
+    """Return a JSON response shaped like the responses of the customer MCP server."""
+    return json.dumps({**payload, "query_time_ms": 0.0}, default=str)
+
+
+def _timestamp(value: str | datetime | None) -> datetime | None:
+    value = datetime.fromisoformat(value) if isinstance(value, str) else value
+    if value is not None and value.tzinfo is not None:
+        # The CSV datetimes are naive UTC, as the database compares them with its columns
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _words(text: str | None) -> set[str]:
+    return set(re.findall(r"\w+", (text or "").lower()))
+
 
 class CustomerDataPlugin:
-    """Plugin with tools for retrieving customer data."""
+    """Plugin with tools for retrieving customer data from a read-only snapshot in CSV files.
+
+    The tools mirror those of the customer MCP server (names, parameters and JSON responses), so
+    the plugin can stand in for the server while it is unavailable. The `mcp_api_key` is accepted
+    for compatibility and ignored. The `fields` and `compact` projections of the server are not
+    supported, the full responses are returned. `get_latest_advice` is missing, as the snapshot
+    holds no advice, and `find_similar_historic_calls` approximates the full-text rank of the
+    server by the share of the words of the text found in a call.
+    """
 
     def __init__(self, data_path: str):
         """Initialize the plugin with the path to the CSV files."""
@@ -23,77 +53,231 @@ class CustomerDataPlugin:
         self.products = Product.from_csv(f"{data_path}/product.csv")
         self.discounts = Discount.from_csv(f"{data_path}/discount.csv")
 
-    @kernel_function
-    def get_customer_details(self, customer_id: int) -> Annotated[str, "Details of the customer."]:
-        """Retrieve a JSON string with customer details."""
-        # Find customer using the enhanced class method
-        for customer in self.customers:
-            if customer.id == customer_id:
-                return json.dumps(customer.model_dump(mode="json"))
-
-        logger.warning(f"Warning: No customer found with ID {customer_id}")
-        return f"No customer found with ID {customer_id}"
-
-    @kernel_function
-    def get_customer_call_event(self, customer_id: int) -> Annotated[str, "Call event of the customer."]:
-        """Retrieve a JSON string of the call event of the customer."""
-        # Find customer's call event using the enhanced class method
-        for call_event in self.call_events:
-            if call_event.customer_id == customer_id:
-                return json.dumps(call_event.model_dump(mode="json"))
-
-        logger.warning(f"Warning: No call event found for customer ID {customer_id}")
-        return f"No call event found for customer ID {customer_id}"
-
-    @kernel_function
-    def get_customer_historic_call_events(self, customer_id: int) -> Annotated[str, "Call events of the customer."]:
-        """Retrieve a JSON string of the historic call events of the customer."""
-        # Find customer's historic call events using the enhanced class method
-        historic_call_events = [
-            event.model_dump(mode="json") for event in self.historic_call_events if event.customer_id == customer_id
+    def _customer(self, customer_id: int) -> Customer | None:
+        return next((c for c in self.customers if c.id == customer_id), None)
+
+    @kernel_function(description="Return the latest call event for a customer")
+    def get_call_event(
+        self,
+        customer_id: Annotated[int, "Customer ID, e.g. 42"],
+        mcp_api_key: Annotated[str, "MCP API Key for authentication"] = "",
+    ) -> Annotated[str, "The latest call event of the customer."]:
+        """Retrieve a JSON string of the latest call event of the customer."""
+        events = [e for e in self.call_events if e.customer_id == customer_id]
+        events = sorted(events, key=lambda e: e.timestamp, reverse=True)[:1]
+        return _response(
+            events=[e.model_dump(mode="json") for e in events],
+            count=len(events),
+            error=None if events else f"No call event for customer {customer_id}",
+        )
+
+    @kernel_function(description="List historic call events for a customer, newest first")
+    def get_historic_call_events(
+        self,
+        customer_id: Annotated[int, "Customer ID"],
+        mcp_api_key: Annotated[str, "MCP API Key for authentication"] = "",
+        limit: Annotated[int | None, "Optional maximum number of events to return"] = None,
+        since: Annotated[str | None, "Optional ISO timestamp, only calls at or after it"] = None,
+        before: Annotated[str | None, "Optional ISO timestamp, only calls before it"] = None,
+    ) -> Annotated[str, "Historic call events of the customer."]:
+        """Retrieve a JSON string of the historic call events of the customer, newest first."""
+        since, before = _timestamp(since), _timestamp(before)
+        events = [
+            event
+            for event in self.historic_call_events
+            if event.customer_id == customer_id
+            and (since is None or event.start_time >= since)
+            and (before is None or event.start_time < before)
         ]
+        events = sorted(events, key=lambda e: e.start_time, reverse=True)[:limit]
+        return _response(
+            events=[e.model_dump(mode="json") for e in events], count=len(events), next_cursor=None
+        )
+
+    @kernel_function(
+        description=(
+            "Find the historic call events whose reason and summary are most similar to a text, "
+            "e.g. the reason of an incoming call. Returns the best matches first with a similarity "
+            "score"
+        )
+    )
+    def find_similar_historic_calls(
+        self,
+        text: Annotated[str, "Text to compare with, e.g. the reason of the incoming call"],
+        mcp_api_key: Annotated[str, "MCP API Key for authentication"] = "",
+        customer_id: Annotated[
+            int | None, "Optional customer ID, defaults to all customers"
+        ] = None,
+        limit: Annotated[int, "Maximum number of events to return"] = 5,
+        before: Annotated[str | None, "Optional ISO timestamp, only calls before it"] = None,
+        since: Annotated[str | None, "Optional ISO timestamp, only calls at or after it"] = None,
+    ) -> Annotated[str, "Historic call events similar to the text, best match first."]:
+        """Retrieve a JSON string of the historic call events most similar to the text."""
+        since, before = _timestamp(since), _timestamp(before)
+        words = _words(text)
+        matches = []
+        for event in self.historic_call_events:
+            if customer_id is not None and event.customer_id != customer_id:
+                continue
+            if (since and event.start_time < since) or (before and event.start_time >= before):
+                continue
+            shared = words & (_words(event.sdc) | _words(event.call_summary))
+            if shared:
+                matches.append((round(len(shared) / len(words), 4), event))
+        matches.sort(key=lambda m: (m[0], m[1].start_time), reverse=True)
+        events = [{**e.model_dump(mode="json"), "score": score} for score, e in matches[:limit]]
+        return _response(events=events, count=len(events))
+
+    @kernel_function(description="Return call statistics of a customer at a moment (default now)")
+    def get_customer_call_stats(
+        self,
+        customer_id: Annotated[int, "Customer ID"],
+        mcp_api_key: Annotated[str, "MCP API Key for authentication"] = "",
+        at_timestamp: Annotated[str | None, "Optional ISO timestamp, e.g. of the call"] = None,
+    ) -> Annotated[str, "Call statistics of the customer."]:
+        """Retrieve a JSON string of the call statistics of the customer."""
+        at = _timestamp(at_timestamp) or datetime.now()
+        calls = sorted(
+            (e for e in self.historic_call_events if e.customer_id == customer_id),
+            key=lambda e: e.start_time,
+        )
+        if not calls:
+            return _response(stats=None, error=f"No calls recorded for customer {customer_id}")
 
-        if not historic_call_events:
-            logger.warning(f"Warning: No historic call events found for customer ID {customer_id}")
-            return f"No historic call events found for customer ID {customer_id}"
-        else:
-            return json.dumps(historic_call_events)
+        prior = [e.start_time for e in calls if e.start_time < at]
+        last_call_at = prior[-1] if prior else None
+        stats = {
+            "customer_id": customer_id,
+            "total_calls": len(calls),
+            "first_call_at": calls[0].start_time,
+            "last_call_at": calls[-1].start_time,
+            "last_call_id": calls[-1].id,
+            "calls_last_24h": sum(t >= at - timedelta(hours=24) for t in prior),
+            "calls_last_7d": sum(t >= at - timedelta(days=7) for t in prior),
+            "calls_last_30d": sum(t >= at - timedelta(days=30) for t in prior),
+            "hours_since_last_call": (
+                round((at - last_call_at).total_seconds() / 3600, 1) if last_call_at else None
+            ),
+        }
+        return _response(stats=stats, error=None)
+
+    @kernel_function(description="Return a single customer record by id")
+    def get_customer_by_id(
+        self,
+        customer_id: Annotated[int, "Customer ID"],
+        mcp_api_key: Annotated[str, "MCP API Key for authentication"] = "",
+    ) -> Annotated[str, "Details of the customer."]:
+        """Retrieve a JSON string with customer details."""
+        customer = self._customer(customer_id)
+        if not customer:
+            logger.warning(f"Warning: No customer found with ID {customer_id}")
+        return _response(
+            customer=customer.model_dump(mode="json") if customer else None,
+            error=None if customer else f"No customer {customer_id}",
+        )
 
-    @kernel_function
-    def get_customer_subscriptions(self, customer_id: int) -> Annotated[str, "Subscriptions of the customer."]:
+    @kernel_function(description="List every subscription a customer currently owns")
+    def get_subscriptions(
+        self,
+        customer_id: Annotated[int, "Customer ID"],
+        mcp_api_key: Annotated[str, "MCP API Key for authentication"] = "",
+    ) -> Annotated[str, "Subscriptions of the customer."]:
         """Retrieve a JSON string of the subscriptions of the customer."""
-        # Find subscriptions for the given customer ID
-        customer_subscriptions = [
+        subscriptions = [
             subscription.model_dump(mode="json")
             for subscription in self.subscriptions
             if subscription.customer_id == customer_id
         ]
+        return _response(subscriptions=subscriptions, count=len(subscriptions))
 
-        if not customer_subscriptions:
-            logger.warning(f"Warning: No subscriptions found for customer ID {customer_id}")
-            return f"No subscriptions found for customer ID {customer_id}"
-        else:
-            return json.dumps(customer_subscriptions)
-
-    @kernel_function
-    def get_product_details(self, product_id: int) -> Annotated[str, "Details of the product."]:
-        """Retrieve a JSON string with product details."""
-        # Find product using the enhanced class method
-        for product in self.products:
-            if product.id == product_id:
-                return json.dumps(product.model_dump(mode="json"))
-        logger.warning(f"Warning: No product found with ID {product_id}")
-        return f"No product found with ID {product_id}"
-
-    @kernel_function
-    def get_available_discounts(self, product_id: int) -> Annotated[str, "Available discounts for a product."]:
-        """Retrieve a JSON string of the available discounts for a product."""
+    @kernel_function(description="Return product catalogue or a single product")
+    def get_products(
+        self,
+        mcp_api_key: Annotated[str, "MCP API Key for authentication"] = "",
+        product_id: Annotated[int | None, "Optional product id filter"] = None,
+    ) -> Annotated[str, "Details of the products."]:
+        """Retrieve a JSON string with the product catalogue or the details of a product."""
+        products = [
+            product.model_dump(mode="json")
+            for product in self.products
+            if product_id is None or product.id == product_id
+        ]
+        error = f"No product {product_id}" if product_id and not products else None
+        return _response(products=products, count=len(products), error=error)
+
+    @kernel_function(description="Return active discount rules, optionally filtered by product")
+    def get_discounts(
+        self,
+        mcp_api_key: Annotated[str, "MCP API Key for authentication"] = "",
+        product_id: Annotated[int | None, "Optional product id filter"] = None,
+    ) -> Annotated[str, "Discounts, optionally of a product."]:
+        """Retrieve a JSON string of the discounts, optionally of a product."""
         discounts = [
-            discount.model_dump(mode="json") for discount in self.discounts if discount.product_id == product_id
+            discount.model_dump(mode="json")
+            for discount in self.discounts
+            if product_id is None or discount.product_id == product_id
         ]
+        return _response(discounts=discounts, count=len(discounts))
+
+    @kernel_function(
+        description=(
+            "Return the discounts a customer is eligible for, ranked from most to least valuable"
+        )
+    )
+    def get_eligible_discounts(
+        self,
+        customer_id: Annotated[int, "Customer ID"],
+        mcp_api_key: Annotated[str, "MCP API Key for authentication"] = "",
+        product_id: Annotated[int | None, "Optional product id filter"] = None,
+        on_date: Annotated[str | None, "Optional date the subscription must be active on"] = None,
+    ) -> Annotated[str, "Discounts the customer is eligible for."]:
+        """Retrieve a JSON string of the discounts the customer is eligible for, best first."""
+        customer = self._customer(customer_id)
+        if not customer:
+            return _response(
+                customer_id=customer_id, discounts=[], count=0, error=f"No customer {customer_id}"
+            )
+
+        on = date.fromisoformat(on_date) if on_date else date.today()
+        level = CLV_LEVELS.index(customer.clv) if customer.clv in CLV_LEVELS else -1
+        products = {product.id: product for product in self.products}
+        eligible = []
+        for discount in self.discounts:
+            if product_id and discount.product_id != product_id:
+                continue
+            if discount.minimum_clv not in CLV_LEVELS:
+                continue
+            if level < CLV_LEVELS.index(discount.minimum_clv):
+                continue
+            active = [
+                s
+                for s in self.subscriptions
+                if s.customer_id == customer_id
+                and s.product_id == discount.product_id
+                and s.start_date <= on <= s.end_date
+            ]
+            if not active:
+                continue
+            subscription = max(active, key=lambda s: s.end_date)
+            product = products.get(discount.product_id)
+            eligible.append(
+                {
+                    **discount.model_dump(mode="json"),
+                    "product_name": product.name if product else None,
+                    "subscription_id": subscription.id,
+                    "subscription_end_date": subscription.end_date.isoformat(),
+                }
+            )
 
-        if not discounts:
-            logger.warning(f"Warning: No discounts found for product ID {product_id}")
-            return f"No discounts found for product ID {product_id}"
-        else:
-            return json.dumps(discounts)
+        eligible.sort(key=lambda d: (-d["percentage"], -d["duration_months"], d["id"]))
+        value = lambda d: (d["percentage"], d["duration_months"])  # noqa: E731
+        for item in eligible:
+            # Equal offers share a rank, like the rank() of the database query
+            item["rank"] = 1 + sum(value(d) > value(item) for d in eligible)
+        return _response(
+            customer_id=customer_id,
+            clv=customer.clv,
+            discounts=eligible,
+            count=len(eligible),
+            error=None,
+        )
@@ -1,49 +1,131 @@
 """Plugins for the customer domain based on CSV files."""
 
 import json
+from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
 from semantic_kernel.functions import kernel_function
 
-from repeated_calls.database.schemas import SoftwareUpdate
+from repeated_calls.database.schemas import KnownBug, Outage, SoftwareUpdate, Subscription
 from repeated_calls.utils.loggers import Logger
 
 logger = Logger()
 
 
+def _response(**payload) -> str:
+    """Return a JSON response shaped like the responses of the operations MCP server."""
+    return json.dumps({**payload, "query_time_ms": 0.0}, default=str)
+
+
+def _timestamp(value: str | datetime | None) -> datetime | None:
+    value = datetime.fromisoformat(value) if isinstance(value, str) else value
+    if value is not None and value.tzinfo is not None:
+        # The CSV datetimes are naive UTC, as the database compares them with its columns
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 class OperationsDataPlugin:
-    """Plugin with tools for retrieving customer data."""
+    """Plugin with tools for retrieving operations data from a read-only snapshot in CSV files.
+
+    The tools mirror those of the operations MCP server (names, parameters and JSON responses), so
+    the plugin can stand in for the server while it is unavailable. The `mcp_api_key` is accepted
+    for compatibility and ignored. The `fields` and `compact` projections of the server are not
+    supported, the full responses are returned.
+    """
 
     def __init__(self, data_path: str):
         """Initialize the plugin with the path to the CSV files."""
         self.software_updates = SoftwareUpdate.from_csv(f"{data_path}/software_update.csv")
+        self.outages = Outage.from_csv(f"{data_path}/outage.csv")
+        self.known_bugs = KnownBug.from_csv(f"{data_path}/known_bug.csv")
+        self.subscriptions = Subscription.from_csv(f"{data_path}/subscription.csv")
 
-    @kernel_function
-    def get_software_updates(self, product_id: int) -> Annotated[str, "Software updates of the product."]:
-        """Retrieve a JSON string of all software updates of the product."""
-        # Find all software updates for the given product ID
+    @kernel_function(description="List software updates, optionally filtered by product")
+    def get_software_updates(
+        self,
+        mcp_api_key: Annotated[str, "MCP API Key for authentication"] = "",
+        product_id: Annotated[int | None, "Optional product id filter"] = None,
+    ) -> Annotated[str, "Software updates, optionally of a product."]:
+        """Retrieve a JSON string of the software updates, optionally of a product."""
         updates = [
             software_update.model_dump(mode="json")
             for software_update in self.software_updates
-            if software_update.product_id == product_id
+            if product_id is None or software_update.product_id == product_id
         ]
+        return _response(updates=updates, count=len(updates))
 
-        if updates:
-            return json.dumps(updates)
+    @kernel_function(
+        description=(
+            "List software updates rolled out in the days before a timestamp (e.g. of a call) on "
+            "the products a customer subscribes to, or on the given products. Most recent first"
+        )
+    )
+    def get_updates_near(
+        self,
+        at_timestamp: Annotated[str, "ISO timestamp to look back from, e.g. of the call"],
+        mcp_api_key: Annotated[str, "MCP API Key for authentication"] = "",
+        customer_id: Annotated[int | None, "Customer ID, restricts to subscribed products"] = None,
+        product_ids: Annotated[list[int] | None, "Product IDs, needed without customer_id"] = None,
+        window_days: Annotated[int, "Number of days before the timestamp to look back"] = 14,
+    ) -> Annotated[str, "Software updates rolled out shortly before the timestamp."]:
+        """Retrieve a JSON string of the software updates that are candidate causes of an issue."""
+        if customer_id is None and not product_ids:
+            return _response(
+                updates=[], count=0, error="Either customer_id or product_ids is required"
+            )
 
-        logger.warning(f"Warning: No software updates found for product {product_id}")
-        return f"No software updates found for product ID {product_id}"
+        on = _timestamp(at_timestamp).date()
+        products = set(product_ids or [])
+        if customer_id is not None:
+            subscribed = {
+                s.product_id
+                for s in self.subscriptions
+                if s.customer_id == customer_id and s.start_date <= on <= s.end_date
+            }
+            products = products & subscribed if product_ids else subscribed
 
-    # Extra dummy function, always returns "No outages found"
-    @kernel_function
+        updates = [
+            {**update.model_dump(mode="json"), "days_before": (on - update.rollout_date).days}
+            for update in self.software_updates
+            if update.product_id in products
+            and on - timedelta(days=window_days) <= update.rollout_date <= on
+        ]
+        updates.sort(key=lambda u: (u["days_before"], u["id"]))
+        return _response(updates=updates, count=len(updates))
+
+    @kernel_function(
+        description="List the outages of a product that were active at a timestamp (default now)"
+    )
     def check_outages(
-        self, product_id: int
-    ) -> Annotated[str, "Check if there is a current outage known for the product"]:
-        """Retrieve a string whether a current outage is known for the product."""
-        return f"No outages found for product ID {product_id}"
-
-    # Extra dummy function, always returns "No bugs are found for this product"
-    @kernel_function
-    def check_bugs(self, product_id: int) -> Annotated[str, "Check if there are any bugs known for the product"]:
-        """Retrieve a string whether there are any bugs known for the product."""
-        return f"There no known bugs for product ID {product_id}"
+        self,
+        product_id: Annotated[int, "Product ID"],
+        mcp_api_key: Annotated[str, "MCP API Key for authentication"] = "",
+        at_timestamp: Annotated[str | None, "Optional ISO timestamp, e.g. of the call"] = None,
+    ) -> Annotated[str, "Outages of the product that were active at the timestamp (default: now)"]:
+        """Retrieve a JSON string of the outages of the product active at the timestamp."""
+        at = _timestamp(at_timestamp) or datetime.now()
+        outages = [
+            outage.model_dump(mode="json")
+            for outage in self.outages
+            if outage.product_id == product_id and outage.is_active(at)
+        ]
+        return _response(outages=outages, count=len(outages))
+
+    @kernel_function(
+        description="List the known bugs of a product open at a timestamp (default now)"
+    )
+    def check_bugs(
+        self,
+        product_id: Annotated[int, "Product ID"],
+        mcp_api_key: Annotated[str, "MCP API Key for authentication"] = "",
+        at_timestamp: Annotated[str | None, "Optional ISO timestamp, e.g. of the call"] = None,
+    ) -> Annotated[str, "Known bugs of the product that were open at the timestamp (default: now)"]:
+        """Retrieve a JSON string of the known bugs of the product open at the timestamp."""
+        at = _timestamp(at_timestamp) or datetime.now()
+        bugs = [
+            bug.model_dump(mode="json")
+            for bug in self.known_bugs
+            if bug.product_id == product_id and bug.is_active(at)
+        ]
+        return _response(bugs=bugs, count=len(bugs))
@@ -1,41 +1,92 @@
 from dotenv import load_dotenv       
+import asyncio
 import os
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 from semantic_kernel.connectors.mcp import MCPSsePlugin
-from semantic_kernel.functions import kernel_function
+from semantic_kernel.functions import KernelPlugin, kernel_function
 from typing import Annotated
-from repeated_calls.orchestrator.settings import McpApiKeySettings
+from repeated_calls.orchestrator.plugins.circuit_breaker import (
+    count_fallback,
+    fallback_plugin,
+    get_circuit_breaker,
+)
+from repeated_calls.orchestrator.settings import CircuitBreakerSettings, McpApiKeySettings
+from repeated_calls.utils.loggers import get_application_logger
+
+logger = get_application_logger(__name__)
 
 
 load_dotenv()                             
 
-# URLs must be supplied via environment variables / .env
-CUSTOMER_MCP_URL   = os.getenv("CUSTOMER_MCP_URL")
-OPERATIONS_MCP_URL = os.getenv("OPERATIONS_MCP_URL")
 
-if not CUSTOMER_MCP_URL or not OPERATIONS_MCP_URL:
-    raise RuntimeError(
-        "CUSTOMER_MCP_URL and OPERATIONS_MCP_URL must be set in the environment "
-        "or in an .env file"
-    )
+def mcp_url(name: str) -> str:
+    """Return the URL of an MCP server from the environment variable (or .env entry) `name`.
+
+    The URL is read on every connection rather than on import, so a process can set it after
+    importing the orchestrator, e.g. to the stand-in servers of the offline benchmark.
+    """
+    url = os.getenv(name)
+    if not url:
+        raise RuntimeError(f"{name} must be set in the environment or in an .env file")
+    return url
+
+
+@asynccontextmanager
+async def resilient_plugin(plugin: MCPSsePlugin):
+    """Connect an MCP plugin, or yield its CSV fallback while the server is unavailable.
+
+    The connection is skipped while the circuit of the server is open, and a failed connection
+    counts towards opening it. The fallback is a `KernelPlugin` with the name of the MCP plugin.
+    """
+    breaker = get_circuit_breaker(plugin.name)
+    settings = CircuitBreakerSettings()
+    async with AsyncExitStack() as stack:
+        connected = None
+        if breaker.allow():
+            try:
+                # In this task, the plugin must be closed in the task it was connected in
+                async with asyncio.timeout(settings.connect_timeout_s):
+                    connected = await stack.enter_async_context(plugin)
+                breaker.record_success()
+            except asyncio.CancelledError:
+                breaker.record_cancelled()
+                raise
+            except Exception as e:
+                breaker.record_failure()
+                logger.warning(f"Could not connect to {plugin.name}: {e!r}")
+
+        if connected is None:
+            fallback = fallback_plugin(plugin.name)
+            if fallback is None:
+                raise RuntimeError(f"{plugin.name} is unavailable and has no fallback")
+            logger.warning(f"Using the read-only fallback of {plugin.name}")
+            count_fallback(plugin.name)
+            connected = KernelPlugin.from_object(
+                plugin.name, fallback, description=plugin.description
+            )
+        yield connected
 
 
 @asynccontextmanager
 async def customer_plugin():
-    async with MCPSsePlugin(
-        name="CustomerDataPlugin",
-        description="Customer domain data and product related data",
-        url=CUSTOMER_MCP_URL,
+    async with resilient_plugin(
+        MCPSsePlugin(
+            name="CustomerDataPlugin",
+            description="Customer domain data and product related data",
+            url=mcp_url("CUSTOMER_MCP_URL"),
+        )
     ) as plug:
         yield plug
 
 
 @asynccontextmanager
 async def operations_plugin():
-    async with MCPSsePlugin(
-        name="OperationsDataPlugin",
-        description="Operations data",
-        url=OPERATIONS_MCP_URL,
+    async with resilient_plugin(
+        MCPSsePlugin(
+            name="OperationsDataPlugin",
+            description="Operations data",
+            url=mcp_url("OPERATIONS_MCP_URL"),
+        )
     ) as plug:
         yield plug
 
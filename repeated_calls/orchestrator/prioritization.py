@@ -0,0 +1,86 @@
+"""Priority of received call events, so calls of valuable customers get advice first.
+
+The priority of a message is read from its `priority` application property when the sender set
+it, and otherwise derived from the customer lifetime value (CLV) of the customer of the call
+event. The CLV is looked up with the customer DAO on the process-wide connection pool and cached,
+so a burst of calls of the same customers costs a single query per customer.
+"""
+
+import time
+from collections import OrderedDict
+
+from azure.servicebus import ServiceBusReceivedMessage
+
+from repeated_calls.database.schemas import CallEvent
+from repeated_calls.orchestrator.settings import CallPrioritySettings
+from repeated_calls.streaming.decoding import MessageDecodeError
+from repeated_calls.utils.loggers import get_application_logger
+
+logger = get_application_logger(__name__)
+
+
+class CallPriority:
+    """Return the priority of a received call event message, higher is processed first."""
+
+    def __init__(self, settings: CallPrioritySettings | None = None) -> None:
+        """Initialise the priority.
+
+        Args:
+            settings (CallPrioritySettings | None): The priority settings. Defaults to the settings
+                from the environment.
+        """
+        self.settings = settings or CallPrioritySettings()
+        self._cache: OrderedDict[int, tuple[float, float]] = OrderedDict()  # (expires, priority)
+
+    async def __call__(
+        self, message: ServiceBusReceivedMessage, call_event: CallEvent | MessageDecodeError
+    ) -> float:
+        """Return the priority of `message`; failing to determine it gives the default priority.
+
+        Args:
+            message (ServiceBusReceivedMessage): The received message.
+            call_event (CallEvent | MessageDecodeError): The call event decoded from the message,
+                or the error decoding it.
+        """
+        properties = message.application_properties or {}
+        name = self.settings.property_name
+        value = properties.get(name.encode(), properties.get(name))
+        if value is not None:
+            try:
+                return float(value.decode() if isinstance(value, bytes) else value)
+            except ValueError:
+                logger.warning(f"Invalid priority {value!r} of message {message.message_id}")
+
+        if isinstance(call_event, MessageDecodeError):
+            # Dead-lettered when it is handled, the sooner the better
+            return self.settings.default_priority
+        return await self.customer_priority(call_event.customer_id)
+
+    async def customer_priority(self, customer_id: int) -> float:
+        """Return the priority of the CLV of a customer, from the cache if present."""
+        now = time.monotonic()
+        cached = self._cache.get(customer_id)
+        if cached and cached[0] > now:
+            self._cache.move_to_end(customer_id)
+            return cached[1]
+
+        # Imported here, as the modules read the database settings when they are imported
+        from repeated_calls.mcp_server.common.db import get_shared_pool
+        from repeated_calls.mcp_server.customer.dao import customer as customer_dao
+
+        try:
+            pool = await get_shared_pool("orchestrator")
+            customer = await customer_dao.get_by_id(pool, customer_id, fields=["clv"])
+        except Exception:
+            logger.warning(f"Could not look up the CLV of customer {customer_id}", exc_info=True)
+            return self.settings.default_priority
+
+        priority = self.settings.default_priority
+        if customer and customer.clv in self.settings.clv_priorities:
+            priority = self.settings.clv_priorities[customer.clv]
+
+        self._cache[customer_id] = (now + self.settings.cache_ttl_s, priority)
+        self._cache.move_to_end(customer_id)
+        if len(self._cache) > self.settings.cache_size:
+            self._cache.popitem(last=False)
+        return priority
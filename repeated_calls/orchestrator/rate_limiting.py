@@ -0,0 +1,207 @@
+"""Client-side rate limiting of the requests to an Azure OpenAI deployment.
+
+Every model request of the agents goes through `RateLimitedAzureChatCompletion`, which takes the
+request and its estimated tokens from the token buckets of the deployment before sending it. The
+buckets are shared by all kernels in the process (one per deployment), so concurrent runs together
+stay within the requests/min and tokens/min quota instead of running into 429s and the retries of
+the SDK. The token estimate is corrected with the usage reported in the response.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncGenerator
+
+from opentelemetry import metrics
+from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
+from semantic_kernel.connectors.ai.prompt_execution_settings import PromptExecutionSettings
+from semantic_kernel.contents import ChatHistory, ChatMessageContent, StreamingChatMessageContent
+
+from repeated_calls.orchestrator.settings import RateLimitSettings
+from repeated_calls.utils.loggers import get_application_logger
+
+logger = get_application_logger(__name__)
+
+wait_histogram = metrics.get_meter("repeated_calls.orchestrator").create_histogram(
+    "openai.rate_limit.wait",
+    unit="s",
+    description="Time model requests waited for the client-side rate limiter",
+)
+
+# Average number of characters per token for the estimate of a prompt
+CHARS_PER_TOKEN = 4
+
+
+class TokenBucket:
+    """Token bucket refilled at a fixed rate per minute, waited on in FIFO order."""
+
+    def __init__(self, per_minute: float, burst_s: float) -> None:
+        """Initialise a full bucket holding `burst_s` seconds worth of tokens."""
+        self.rate = per_minute / 60
+        self.capacity = self.rate * burst_s
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.tokens + (now - self._updated) * self.rate, self.capacity)
+        self._updated = now
+
+    async def take(self, amount: float) -> float:
+        """Wait until `amount` tokens are available, take them and return the amount taken."""
+        # A request larger than the bucket can hold would wait forever, it takes the whole bucket
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+        return amount
+
+    def give(self, amount: float) -> None:
+        """Return `amount` tokens, or take them when negative (the bucket may go into debt)."""
+        self._refill()
+        self.tokens = min(self.tokens + amount, self.capacity)
+
+    def empty(self) -> None:
+        """Take all available tokens, e.g. after the service reported a rate limit."""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class RateLimiter:
+    """Requests/min and tokens/min limits of a single deployment."""
+
+    def __init__(
+        self,
+        requests_per_minute: int | None,
+        tokens_per_minute: int | None,
+        burst_s: float = 10.0,
+    ) -> None:
+        """Initialise the limiter, a limit of `None` is not enforced."""
+        self.requests = TokenBucket(requests_per_minute, burst_s) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, burst_s) if tokens_per_minute else None
+
+    async def acquire(self, tokens: int) -> float:
+        """Wait until a request of an estimated `tokens` tokens may be sent.
+
+        Returns:
+            The number of tokens taken for the request, to be corrected with `correct`.
+        """
+        start = time.monotonic()
+        if self.requests:
+            await self.requests.take(1)
+        if self.tokens:
+            tokens = await self.tokens.take(tokens)
+        waited = time.monotonic() - start
+        wait_histogram.record(waited)
+        if waited > 1:
+            logger.debug(f"Model request waited {waited:.1f}s for the rate limiter")
+        return tokens
+
+    def correct(self, taken: float, actual: int) -> None:
+        """Correct the tokens taken for a request with its actual usage."""
+        if self.tokens:
+            self.tokens.give(taken - actual)
+
+    def throttled(self) -> None:
+        """Stop sending requests until the buckets refill, as the service is rate limiting."""
+        for bucket in (self.requests, self.tokens):
+            if bucket:
+                bucket.empty()
+
+
+_limiters: dict[tuple[str, str], RateLimiter] = {}
+
+
+def get_rate_limiter(endpoint: str, deployment: str) -> RateLimiter:
+    """Return the rate limiter shared by the process for a deployment."""
+    key = (endpoint, deployment)
+    if key not in _limiters:
+        settings = RateLimitSettings()
+        _limiters[key] = RateLimiter(
+            settings.requests_per_minute, settings.tokens_per_minute, settings.burst_s
+        )
+    return _limiters[key]
+
+
+def max_completion_tokens(settings: PromptExecutionSettings) -> int | None:
+    """Return the maximum number of completion tokens of a request, if set."""
+    return getattr(settings, "max_completion_tokens", None) or getattr(settings, "max_tokens", None)
+
+
+def estimate_tokens(chat_history: ChatHistory, settings: PromptExecutionSettings) -> int:
+    """Estimate the tokens a request counts against the quota, from its rendered prompt.
+
+    Azure OpenAI counts the `max_tokens` of a request against the quota when it admits the
+    request, so the completion is estimated at `max_tokens` when it is set.
+    """
+    # The prompt as rendered by the kernel, including function calls and results
+    chars = len(chat_history.to_prompt())
+    tools = getattr(settings, "tools", None)
+    if tools:
+        chars += len(json.dumps(tools, default=str))
+    return chars // CHARS_PER_TOKEN + (max_completion_tokens(settings) or 0)
+
+
+def is_rate_limited(exc: BaseException | None) -> bool:
+    """Whether `exc`, or an exception it was raised from, is a rate limit (HTTP 429) response."""
+    while exc is not None:
+        if getattr(exc, "status_code", None) == 429:
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def actual_tokens(usage: Any, settings: PromptExecutionSettings) -> int | None:
+    """Return the tokens a request counted against the quota, from the usage in its response."""
+    if usage is None:
+        return None
+    completion = max_completion_tokens(settings) or usage.completion_tokens or 0
+    return (usage.prompt_tokens or 0) + completion
+
+
+class RateLimitedAzureChatCompletion(AzureChatCompletion):
+    """`AzureChatCompletion` sending its requests through the rate limiter of its deployment."""
+
+    async def _inner_get_chat_message_contents(
+        self, chat_history: ChatHistory, settings: PromptExecutionSettings
+    ) -> list[ChatMessageContent]:
+        limiter = get_rate_limiter(str(self.client.base_url), self.ai_model_id)
+        taken = await limiter.acquire(estimate_tokens(chat_history, settings))
+        try:
+            contents = await super()._inner_get_chat_message_contents(chat_history, settings)
+        except Exception as e:
+            if is_rate_limited(e):
+                limiter.throttled()
+            raise
+        usage = contents[0].metadata.get("usage") if contents else None
+        actual = actual_tokens(usage, settings)
+        if actual is not None:
+            limiter.correct(taken, actual)
+        return contents
+
+    async def _inner_get_streaming_chat_message_contents(
+        self,
+        chat_history: ChatHistory,
+        settings: PromptExecutionSettings,
+        function_invoke_attempt: int = 0,
+    ) -> AsyncGenerator[list[StreamingChatMessageContent], Any]:
+        limiter = get_rate_limiter(str(self.client.base_url), self.ai_model_id)
+        taken = await limiter.acquire(estimate_tokens(chat_history, settings))
+        try:
+            async for chunks in super()._inner_get_streaming_chat_message_contents(
+                chat_history, settings, function_invoke_attempt
+            ):
+                # The usage is in the last chunk
+                usage = chunks[0].metadata.get("usage") if chunks else None
+                actual = actual_tokens(usage, settings)
+                if actual is not None:
+                    limiter.correct(taken, actual)
+                yield chunks
+        except Exception as e:
+            if is_rate_limited(e):
+                limiter.throttled()
+            raise
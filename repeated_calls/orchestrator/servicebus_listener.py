@@ -3,13 +3,28 @@
 import asyncio
 import json
 import signal
+from contextlib import AsyncExitStack
 from typing import Optional
 
-from azure.servicebus.aio import ServiceBusClient, ServiceBusReceiver
+from azure.servicebus import ServiceBusReceivedMessage
+from azure.servicebus.aio import AutoLockRenewer, ServiceBusClient, ServiceBusReceiver
+from azure.servicebus.exceptions import MessageLockLostError
+from opentelemetry import metrics
 
 from repeated_calls.database.schemas import CallEvent
+from repeated_calls.orchestrator.ingestion import StateWriter
 from repeated_calls.orchestrator.main import run_sequence
-from repeated_calls.streaming.settings import StreamingSettings
+from repeated_calls.orchestrator.prioritization import CallPriority
+from repeated_calls.orchestrator.settings import (
+    CallPrioritySettings,
+    IngestionSettings,
+    ListenerSettings,
+)
+from repeated_calls.streaming.backpressure import Backpressure
+from repeated_calls.streaming.decoding import MessageDecodeError, decode_call_event
+from repeated_calls.streaming.publisher import AdvicePublisher
+from repeated_calls.streaming.receiving import receive_loop
+from repeated_calls.streaming.settings import AdvicePublishingSettings, StreamingSettings
 from repeated_calls.utils.loggers import get_application_logger
 
 # Create a logger
@@ -18,125 +33,113 @@ logger = get_application_logger(__name__)
 # Global flag to indicate if shutdown was requested
 shutdown_requested = False
 
+# Number of messages whose lock was lost while they were processed, these are redelivered
+lock_lost_count = 0
+lock_lost_counter = metrics.get_meter("repeated_calls.orchestrator").create_counter(
+    "servicebus.message.lock_lost",
+    unit="{message}",
+    description="Number of messages whose lock was lost while they were processed",
+)
 
-async def process_message(receiver: ServiceBusReceiver) -> None:
-    """Process a single message from the Service Bus queue.
+
+async def on_lock_lost(message, error: Optional[Exception]) -> None:
+    """Count and log a message whose lock could not be renewed.
 
     Args:
-        receiver: The Service Bus receiver to get messages from.
+        message: The message that lost its lock.
+        error: The error that stopped the renewal, e.g. the maximum processing time elapsed.
     """
-    try:
-        # Get messages from the queue with a 5-second timeout
-        messages = await receiver.receive_messages(max_message_count=1, max_wait_time=5)
+    global lock_lost_count
+    lock_lost_count += 1
+    lock_lost_counter.add(1)
+    logger.warning(
+        f"Lock lost for message {message.message_id} ({lock_lost_count} in total), it will be "
+        f"redelivered: {error}"
+    )
 
-        if not messages:
-            return  # No messages to process
 
-        for message in messages:
-            try:
-                # Get the message content - it could be in the message itself
-                try:
-                    # First attempt: check if the message itself is a string that contains our JSON
-                    message_body_str = str(message)
-                    # Test if it's valid JSON
-                    event_data = json.loads(message_body_str)
-                    logger.info(f"Received message (direct JSON): {message_body_str}")
-                except json.JSONDecodeError:
-                    # Second attempt: message might be an object with a body attribute
-                    try:
-                        # In some SDK versions this works
-                        if hasattr(message, "message") and message.message:
-                            inner_message = message.message
-                            if hasattr(inner_message, "body"):
-                                inner_body = inner_message.body
-                                if isinstance(inner_body, bytes):
-                                    message_body_str = inner_body.decode("utf-8")
-                                else:
-                                    message_body_str = str(inner_body)
-                            else:
-                                message_body_str = str(inner_message)
-                        # Direct body access
-                        elif hasattr(message, "body"):
-                            if isinstance(message.body, bytes):
-                                message_body_str = message.body.decode("utf-8")
-                            else:
-                                message_body_str = str(message.body)
-                        else:
-                            # Last resort - try to get message content from application properties
-                            if hasattr(message, "application_properties") and message.application_properties:
-                                message_body_str = str(message.application_properties)
-                            else:
-                                # If all else fails, get repr of the message object
-                                message_body_str = repr(message)
-
-                        # Try to parse as JSON
-                        event_data = json.loads(message_body_str)
-                        logger.info(f"Received message (from body): {message_body_str}")
-
-                    except (AttributeError, json.JSONDecodeError) as e:
-                        logger.error(f"Failed to parse message: {str(e)}")
-                        logger.info(f"Message type: {type(message)}")
-                        logger.info(f"Message dir: {dir(message)}")
-
-                        # Try one more approach with newer Azure SDK versions
-                        try:
-                            # Some versions of the SDK have a get_body method
-                            if hasattr(message, "get_body"):
-                                body = message.get_body()
-                                if isinstance(body, bytes):
-                                    message_body_str = body.decode("utf-8")
-                                else:
-                                    message_body_str = str(body)
-                                event_data = json.loads(message_body_str)
-                                logger.info(f"Received message (from get_body): {message_body_str}")
-                            else:
-                                raise AttributeError("Message does not have get_body method")
-                        except Exception as final_err:
-                            logger.error(f"All attempts to parse message failed: {str(final_err)}")
-                            await receiver.dead_letter_message(
-                                message,
-                                reason="Could not parse message format",
-                                error_description=f"Failed to extract JSON from message: {str(final_err)}",
-                            )
-                            continue
-
-                try:
-                    # Create CallEvent from the message data
-                    call_event = CallEvent(
-                        id=int(event_data.get("id", -1)),
-                        customer_id=int(event_data.get("customer_id", -1)),
-                        sdc=event_data.get("sdc", "No description available"),
-                        timestamp=event_data.get("timestamp"),
-                    )
-
-                    # Process the call event
-                    logger.info(f"Processing CallEvent with ID: {call_event.id}")
-
-                    # Run the sequence with this call event - no tracing here
-                    await run_sequence(call_event)
-                    logger.info(f"Call processing completed for CallEvent ID: {call_event.id}")
-
-                    # Complete the message (remove from queue)
-                    await receiver.complete_message(message)
-
-                except (ValueError, KeyError, TypeError) as e:
-                    # Invalid message format
-                    logger.error(f"Invalid message format: {str(e)}", exc_info=True)
-
-                    # Dead-letter the message since it has invalid format
-                    await receiver.dead_letter_message(
-                        message, reason="Invalid message format", error_description=str(e)
-                    )
+def decode_message(message: ServiceBusReceivedMessage) -> CallEvent | MessageDecodeError:
+    """Decode the call event of a message, returning the error if it has no valid one."""
+    try:
+        return decode_call_event(message)
+    except MessageDecodeError as e:
+        return e
 
-            except Exception as e:
-                # General error handling
-                logger.error(f"Error processing message: {str(e)}", exc_info=True)
 
-                # In case of processing error, abandon the message so it can be retried
-                await receiver.abandon_message(message)
+async def handle_message(
+    receiver: ServiceBusReceiver,
+    message: ServiceBusReceivedMessage,
+    call_event: CallEvent | MessageDecodeError,
+    writer: Optional[StateWriter] = None,
+    publisher: Optional[AdvicePublisher] = None,
+) -> Optional[BaseException]:
+    """Process a single message from the Service Bus queue and settle it.
 
-    except Exception as e:
-        logger.error(f"Error receiving messages: {str(e)}", exc_info=True)
+    Args:
+        receiver: The Service Bus receiver the message was received with.
+        message: The message to process.
+        call_event: The call event decoded from the message with `decode_message`.
+        writer: Optional writer that stores the processed call event and its results.
+        publisher: Optional publisher that sends the results to the advice queue.
+
+    Returns:
+        The error a step of the run timed out or failed with, if any. The message is completed
+        with the partial results, the error is returned for the backpressure of the receive loop.
+    """
+    try:
+        # A message without a valid call event will never be processed
+        if isinstance(call_event, MessageDecodeError):
+            logger.error(f"Invalid message {message.message_id}: {str(call_event)}")
+            await receiver.dead_letter_message(
+                message, reason="Invalid message format", error_description=str(call_event)[:1024]
+            )
+            return
+
+        # Skip call events that were already processed, e.g. redelivered after a crash, and wait
+        # for those another worker is processing, e.g. redelivered after the lock was lost
+        state, error = None, None
+        if writer:
+            state = await writer.processed_state(call_event.id)
+            state = state or await writer.claim(call_event.id, message.message_id)
+        if state:
+            logger.info(f"CallEvent ID {call_event.id} already processed, skipping")
+        else:
+            # Process the call event
+            logger.info(f"Processing CallEvent with ID: {call_event.id}")
+
+            # Run the sequence with this call event - no tracing here
+            try:
+                state = await run_sequence(call_event)
+            except BaseException:
+                if writer:
+                    await writer.release(call_event.id)
+                raise
+            logger.info(f"Call processing completed for CallEvent ID: {call_event.id}")
+            error = state.error
+
+            # Buffer the results for the batched write to the call history and advice
+            if writer:
+                await writer.add(state, message.message_id)
+
+        # Queue the results for the next batch published to the advice queue
+        if publisher:
+            await publisher.publish(
+                json.dumps(state.model_dump(mode="json")), message_id=str(call_event.id)
+            )
+
+        # Complete the message (remove from queue)
+        await receiver.complete_message(message)
+        return error
+
+    except MessageLockLostError as e:
+        # The message is redelivered, settling it is no longer possible
+        logger.warning(f"Could not settle message, its lock was lost: {str(e)}")
+
+    except Exception:
+        # In case of processing error, abandon the message so it can be retried. The error is
+        # logged by the receive loop, which also counts overload errors for the backpressure
+        await receiver.abandon_message(message)
+        raise
 
 
 async def service_bus_listener() -> None:
@@ -145,27 +148,83 @@ async def service_bus_listener() -> None:
     settings = StreamingSettings()
     logger.info(f"Starting Service Bus listener for queue: {settings.calls_queue}")
 
-    # Create a ServiceBusClient
-    async with ServiceBusClient.from_connection_string(
-        conn_str=settings.connection_string, logging_enable=True
-    ) as client:
+    ingestion_settings = IngestionSettings()
+    publishing_settings = AdvicePublishingSettings()
+    listener_settings = ListenerSettings()
+    priority_settings = CallPrioritySettings()
+
+    # Imported here, as the module reads the database settings when it is imported
+    from repeated_calls.mcp_server.common.db import close_shared_pool
+
+    async with AsyncExitStack() as stack:
+        # The writer and the priority share a single connection pool, closed when leaving
+        stack.push_async_callback(close_shared_pool)
+
+        # Buffer processed call events and write them to the database in batches
+        writer = None
+        if ingestion_settings.enabled:
+            writer = await stack.enter_async_context(StateWriter(ingestion_settings))
+
+        # Create a ServiceBusClient
+        client = await stack.enter_async_context(
+            ServiceBusClient.from_connection_string(
+                conn_str=settings.connection_string, logging_enable=True
+            )
+        )
+
+        # Publish the results to the advice queue through a single long-lived sender
+        publisher = None
+        if publishing_settings.enabled:
+            publisher = await stack.enter_async_context(
+                AdvicePublisher(client, settings.advice_queue, publishing_settings)
+            )
+
+        # Process the call events of valuable customers first
+        priority = None
+        if priority_settings.enabled:
+            priority = CallPriority(priority_settings)
+        buffer_size = priority_settings.buffer_size if priority else 0
+
+        # Renew the locks of received messages, at most for the maximum processing time
+        renewer = await stack.enter_async_context(
+            AutoLockRenewer(
+                max_lock_renewal_duration=listener_settings.max_processing_s,
+                on_lock_renew_failure=on_lock_lost,
+            )
+        )
+
         # Create a receiver for the calls queue
-        async with client.get_queue_receiver(queue_name=settings.calls_queue) as receiver:
+        async with client.get_queue_receiver(
+            queue_name=settings.calls_queue, prefetch_count=listener_settings.prefetch_count
+        ) as receiver:
             logger.info(f"Connected to queue: {settings.calls_queue}")
 
-            # Process messages until shutdown is requested
-            while not shutdown_requested:
-                try:
-                    await process_message(receiver)
-                    # Small delay to prevent CPU overuse when queue is empty
-                    await asyncio.sleep(0.1)
-                except asyncio.CancelledError:
-                    logger.info("Listener task was cancelled")
-                    break
-                except Exception as e:
-                    logger.error(f"Unexpected error in listener loop: {str(e)}", exc_info=True)
-                    # Add a small delay to prevent rapid error loops
-                    await asyncio.sleep(1)
+            # Process messages concurrently until shutdown is requested
+            try:
+                await receive_loop(
+                    receiver,
+                    lambda message, call_event: handle_message(
+                        receiver, message, call_event, writer, publisher
+                    ),
+                    should_stop=lambda: shutdown_requested,
+                    concurrency=listener_settings.concurrency,
+                    max_batch_size=listener_settings.max_batch_size,
+                    max_wait_s=listener_settings.max_wait_s,
+                    # The call events waiting in the buffer come on top of those being processed
+                    backpressure=Backpressure(
+                        high_water=listener_settings.high_water + buffer_size,
+                        low_water=listener_settings.low_water + buffer_size,
+                        overload_window_s=listener_settings.overload_window_s,
+                        max_overload_rate=listener_settings.max_overload_rate,
+                    ),
+                    priority=priority,
+                    buffer_size=buffer_size,
+                    aging_per_s=priority_settings.aging_per_s,
+                    renewer=renewer,
+                    decode=decode_message,
+                )
+            except asyncio.CancelledError:
+                logger.info("Listener task was cancelled")
 
     logger.info("Service Bus listener stopped")
 
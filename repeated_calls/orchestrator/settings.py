@@ -1,4 +1,6 @@
 """Configuration settings for the orchestrator module."""
+from typing import Literal
+
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -29,6 +31,76 @@ class AzureOpenAISettings(BaseSettings):
     )
 
 
+class RateLimitSettings(BaseSettings):
+    """Settings for the client-side rate limiting of the Azure OpenAI deployment.
+
+    Pydantic will determine the values of all fields in the following order of precedence
+    (descending order of priority):
+    1. Arguments passed to the class constructor
+    2. Environment variables (prefixed with `AZURE_OPENAI_RATE_LIMIT_`)
+    3. Variables in a .env file if present (prefixed with `AZURE_OPENAI_RATE_LIMIT_`)
+
+    Attributes:
+        requests_per_minute (int | None): Requests per minute quota of the deployment. `None`
+            disables the limit. Defaults to `None`.
+        tokens_per_minute (int | None): Tokens per minute quota of the deployment. `None` disables
+            the limit. Defaults to `None`.
+        burst_s (float): Seconds worth of quota that may be used at once. Azure OpenAI enforces
+            the quota over short windows, so a burst of a full minute would be rate limited.
+            Defaults to 10.
+    """
+
+    requests_per_minute: int | None = None
+    tokens_per_minute: int | None = None
+    burst_s: float = 10.0
+
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__",
+        env_file=".env",
+        env_prefix="AZURE_OPENAI_RATE_LIMIT_",
+        extra="ignore",
+    )
+
+
+class MockModelSettings(BaseSettings):
+    """Settings for the offline stand-in of the Azure OpenAI model, for benchmarks.
+
+    Pydantic will determine the values of all fields in the following order of precedence
+    (descending order of priority):
+    1. Arguments passed to the class constructor
+    2. Environment variables (prefixed with `MOCK_MODEL_`)
+    3. Variables in a .env file if present (prefixed with `MOCK_MODEL_`)
+
+    Attributes:
+        enabled (bool): Whether the agents get scripted responses instead of calling Azure OpenAI.
+            Defaults to `False`.
+        latency (Literal["constant", "uniform", "normal", "lognormal", "exponential"]):
+            Distribution of the latency of a response. Defaults to `lognormal`.
+        latency_mean_ms (float): Mean latency of a response. Defaults to 800.
+        latency_sd_ms (float): Standard deviation of the latency, not used by the `constant` and
+            `exponential` distributions. Defaults to 400.
+        repeated_call_rate (float): Fraction of the calls found to be repeated. Defaults to 1.
+        relevant_rate (float): Fraction of the repeated calls with a relevant cause. Defaults to 1.
+        reviewer_rejections (int): Number of drafts the reviewer rejects before approving one. The
+            chat ends after 4 turns, so more than 1 rejection leaves the last draft unapproved.
+            Defaults to 0.
+        seed (int | None): Seed of the random latencies and results. Defaults to `None`.
+    """
+
+    enabled: bool = False
+    latency: Literal["constant", "uniform", "normal", "lognormal", "exponential"] = "lognormal"
+    latency_mean_ms: float = 800.0
+    latency_sd_ms: float = 400.0
+    repeated_call_rate: float = 1.0
+    relevant_rate: float = 1.0
+    reviewer_rejections: int = 0
+    seed: int | None = None
+
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__", env_file=".env", env_prefix="MOCK_MODEL_", extra="ignore"
+    )
+
+
 class AzureAIFoundrySettings(BaseSettings):
     """Settings for Azure AI Foundry.
 
@@ -87,3 +159,290 @@ class McpApiKeySettings(BaseSettings):
     mcpapikey: SecretStr = SecretStr("")
 
     model_config = SettingsConfigDict(env_nested_delimiter="__", env_file=".env", extra="ignore")
+
+
+class CallHistorySettings(BaseSettings):
+    """Settings for the call history used to detect repeated calls.
+
+    Pydantic will determine the value of all fields in the following order of precedence
+    (descending order of priority):
+    1. Arguments passed to the class constructor
+    2. Environment variables (prefixed with `CALL_HISTORY_`)
+    3. Variables in a .env file if present (prefixed with `CALL_HISTORY_`)
+
+    Attributes:
+        window_days (int): Only calls that started at most this many days before the incoming call
+            are retrieved. Defaults to 30, matching the "last month" definition of a repeated call.
+        limit (int): Maximum number of historic calls retrieved, newest first. Defaults to 20.
+    """
+
+    window_days: int = 30
+    limit: int = 20
+
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__", env_file=".env", env_prefix="CALL_HISTORY_", extra="ignore"
+    )
+
+
+class UpdateCorrelationSettings(BaseSettings):
+    """Settings for the software updates considered as cause of a product issue.
+
+    Pydantic will determine the value of all fields in the following order of precedence
+    (descending order of priority):
+    1. Arguments passed to the class constructor
+    2. Environment variables (prefixed with `UPDATE_CORRELATION_`)
+    3. Variables in a .env file if present (prefixed with `UPDATE_CORRELATION_`)
+
+    Attributes:
+        window_days (int): Software updates rolled out at most this many days before the call are
+            given to the cause agent as candidate causes. Defaults to 14.
+    """
+
+    window_days: int = 14
+
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__", env_file=".env", env_prefix="UPDATE_CORRELATION_", extra="ignore"
+    )
+
+
+class StepTimeoutSettings(BaseSettings):
+    """Settings for the deadlines of the steps of the process.
+
+    Pydantic will determine the value of all fields in the following order of precedence
+    (descending order of priority):
+    1. Arguments passed to the class constructor
+    2. Environment variables (prefixed with `STEP_TIMEOUT_`)
+    3. Variables in a .env file if present (prefixed with `STEP_TIMEOUT_`)
+
+    A step that exceeds its deadline is cancelled. The timeout is recorded in the state, and the
+    process exits with the results determined so far. `None` disables the deadline of a step.
+
+    Attributes:
+        repeated_call_s (float | None): Deadline of the repeated-call step. Defaults to 120.
+        cause_s (float | None): Deadline of the cause step. Defaults to 180.
+        recommendation_s (float | None): Deadline of the recommendation step. Defaults to 240.
+    """
+
+    repeated_call_s: float | None = 120.0
+    cause_s: float | None = 180.0
+    recommendation_s: float | None = 240.0
+
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__", env_file=".env", env_prefix="STEP_TIMEOUT_", extra="ignore"
+    )
+
+
+class PipelineSettings(BaseSettings):
+    """Settings for the engine running the steps of the process.
+
+    Pydantic will determine the value of all fields in the following order of precedence
+    (descending order of priority):
+    1. Arguments passed to the class constructor
+    2. Environment variables (prefixed with `PIPELINE_`)
+    3. Variables in a .env file if present (prefixed with `PIPELINE_`)
+
+    Attributes:
+        engine (Literal["process", "native"]): `process` runs the steps as a Semantic Kernel
+            process, `native` runs the same steps with direct calls. Defaults to `process`.
+    """
+
+    engine: Literal["process", "native"] = "process"
+
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__", env_file=".env", env_prefix="PIPELINE_", extra="ignore"
+    )
+
+
+class CircuitBreakerSettings(BaseSettings):
+    """Settings for the circuit breakers around the MCP servers.
+
+    Pydantic will determine the value of all fields in the following order of precedence
+    (descending order of priority):
+    1. Arguments passed to the class constructor
+    2. Environment variables (prefixed with `MCP_CIRCUIT_BREAKER_`)
+    3. Variables in a .env file if present (prefixed with `MCP_CIRCUIT_BREAKER_`)
+
+    Attributes:
+        failure_threshold (int): Number of consecutive failed connections or tool calls to an MCP
+            server that opens its circuit. Defaults to 5.
+        reset_timeout_s (float): Time the circuit stays open before a single run probes the server
+            again. Defaults to 30.
+        connect_timeout_s (float): Maximum time to connect to an MCP server. Defaults to 10.
+        call_timeout_s (float): Maximum time of a tool call to an MCP server. Defaults to 30.
+        fallback_enabled (bool): Whether the CSV-backed plugins answer the tool calls while the
+            circuit is open. Defaults to `True`.
+        fallback_data_path (str | None): Directory with the CSV files of the fallback. Defaults to
+            the `data` directory of the repository.
+    """
+
+    failure_threshold: int = 5
+    reset_timeout_s: float = 30.0
+    connect_timeout_s: float = 10.0
+    call_timeout_s: float = 30.0
+    fallback_enabled: bool = True
+    fallback_data_path: str | None = None
+
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__",
+        env_file=".env",
+        env_prefix="MCP_CIRCUIT_BREAKER_",
+        extra="ignore",
+    )
+
+
+class CheckpointSettings(BaseSettings):
+    """Settings for the checkpoints of the state of a run.
+
+    Pydantic will determine the value of all fields in the following order of precedence
+    (descending order of priority):
+    1. Arguments passed to the class constructor
+    2. Environment variables (prefixed with `CHECKPOINT_`)
+    3. Variables in a .env file if present (prefixed with `CHECKPOINT_`)
+
+    Attributes:
+        enabled (bool): Whether the state is checkpointed after every step in the `checkpoint`
+            table, so a run interrupted by a crash resumes after the last completed step, also on
+            another replica. Requires the `POSTGRES_` settings. Defaults to `True`.
+        ttl_s (float): Time after which a checkpoint is no longer resumed from. Defaults to 86400
+            (one day).
+    """
+
+    enabled: bool = True
+    ttl_s: float = 86400.0
+
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__", env_file=".env", env_prefix="CHECKPOINT_", extra="ignore"
+    )
+
+
+class IngestionSettings(BaseSettings):
+    """Settings for writing processed call events to the database.
+
+    Pydantic will determine the value of all fields in the following order of precedence
+    (descending order of priority):
+    1. Arguments passed to the class constructor
+    2. Environment variables (prefixed with `CALL_INGESTION_`)
+    3. Variables in a .env file if present (prefixed with `CALL_INGESTION_`)
+
+    Attributes:
+        enabled (bool): Whether the listener writes every processed call event and its outcome to
+            the `call_event`, `historic_call_event` and `advice` tables. Defaults to `True`.
+        batch_size (int): Number of buffered call events that triggers a flush. Defaults to 50.
+        flush_interval_ms (int): Maximum time a call event stays buffered before it is written.
+            Defaults to 500.
+        max_pending (int): Maximum number of call events kept buffered while the database is
+            unavailable; the oldest are dropped beyond it. Defaults to 1000.
+        idempotency_ttl_s (int): A call event delivered again within this many seconds after it
+            was processed is not processed again, its stored results are used instead. `0`
+            disables the check. Defaults to 86400 (one day).
+        claim_ttl_s (float): Time in seconds a worker claims a call event it processes, another
+            worker receiving the same call event waits for its results meanwhile. Defaults to 900,
+            the default maximum processing time of the listener.
+        claim_poll_interval_s (float): Interval in seconds at which a waiting worker checks whether
+            the call event was processed. Defaults to 2.
+        retry_backoff_s (float): Delay before writing again after a failed write, doubled for
+            every next failure. Defaults to 1.
+        max_retry_backoff_s (float): Maximum delay before writing again. Defaults to 60.
+    """
+
+    enabled: bool = True
+    batch_size: int = 50
+    flush_interval_ms: int = 500
+    max_pending: int = 1000
+    idempotency_ttl_s: int = 86400
+    claim_ttl_s: float = 900.0
+    claim_poll_interval_s: float = 2.0
+    retry_backoff_s: float = 1.0
+    max_retry_backoff_s: float = 60.0
+
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__", env_file=".env", env_prefix="CALL_INGESTION_", extra="ignore"
+    )
+
+
+class ListenerSettings(BaseSettings):
+    """Settings for the Service Bus listener.
+
+    Pydantic will determine the value of all fields in the following order of precedence
+    (descending order of priority):
+    1. Arguments passed to the class constructor
+    2. Environment variables (prefixed with `LISTENER_`)
+    3. Variables in a .env file if present (prefixed with `LISTENER_`)
+
+    Attributes:
+        max_processing_s (float): Maximum time in seconds the lock of a message is renewed while
+            it is being processed. A run taking longer loses the lock, after which the message is
+            redelivered. Defaults to 900.
+        concurrency (int): Maximum number of call events processed at the same time. Defaults to 8.
+        max_batch_size (int): Maximum number of messages requested in a single receive; the batch
+            size adapts to the messages available and the idle workers. Defaults to 32.
+        max_wait_s (float): Maximum time a receive waits for a message on an empty queue, which is
+            also the longest a shutdown waits for the receive to return. Defaults to 5.
+        prefetch_count (int): Number of messages the receiver fetches ahead. Prefetched messages
+            are locked while they wait to be processed, so keep it at or below `concurrency`.
+            Defaults to 0.
+        high_water (int): Number of call events in flight at which the listener stops receiving.
+            The call events waiting in the priority buffer come on top. Defaults to 8.
+        low_water (int): Number of call events in flight at or below which the listener resumes
+            receiving. The call events waiting in the priority buffer come on top. Defaults to 4.
+        overload_window_s (float): Period over which the share of runs that failed with a rate
+            limit (HTTP 429) or timeout error is computed. Defaults to 60.
+        max_overload_rate (float): Share of failed runs in the window at which the listener stops
+            receiving until it drops again. Defaults to 0.2.
+    """
+
+    max_processing_s: float = 900.0
+    concurrency: int = 8
+    max_batch_size: int = 32
+    max_wait_s: float = 5.0
+    prefetch_count: int = 0
+    high_water: int = 8
+    low_water: int = 4
+    overload_window_s: float = 60.0
+    max_overload_rate: float = 0.2
+
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__", env_file=".env", env_prefix="LISTENER_", extra="ignore"
+    )
+
+
+class CallPrioritySettings(BaseSettings):
+    """Settings for the priority in which the listener processes received call events.
+
+    Pydantic will determine the value of all fields in the following order of precedence
+    (descending order of priority):
+    1. Arguments passed to the class constructor
+    2. Environment variables (prefixed with `CALL_PRIORITY_`)
+    3. Variables in a .env file if present (prefixed with `CALL_PRIORITY_`)
+
+    Attributes:
+        enabled (bool): Whether call events are processed by priority instead of in the order they
+            were received. Requires the `POSTGRES_` settings. Defaults to `True`.
+        property_name (str): Application property of a message holding its priority. Messages
+            without it get the priority of the customer lifetime value (CLV). Defaults to
+            `priority`.
+        clv_priorities (dict[str, float]): Priority per CLV of the customer. Defaults to 2 for
+            `High`, 1 for `Med` and 0 for `Low`.
+        default_priority (float): Priority of a call event whose customer or CLV is unknown.
+            Defaults to 0.
+        cache_ttl_s (float): Time the CLV of a customer is cached. Defaults to 3600.
+        cache_size (int): Maximum number of customers whose CLV is cached. Defaults to 10000.
+        buffer_size (int): Maximum number of received call events waiting for a worker, among
+            which the one with the highest priority is processed next. Defaults to 16.
+        aging_per_s (float): Increase of the priority of a waiting call event per second, so call
+            events of a low priority are still processed during a burst. Defaults to 0.05, i.e.
+            a call event overtakes one with a priority one higher after 20 seconds.
+    """
+
+    enabled: bool = True
+    property_name: str = "priority"
+    clv_priorities: dict[str, float] = {"High": 2.0, "Med": 1.0, "Low": 0.0}
+    default_priority: float = 0.0
+    cache_ttl_s: float = 3600.0
+    cache_size: int = 10000
+    buffer_size: int = 16
+    aging_per_s: float = 0.05
+
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__", env_file=".env", env_prefix="CALL_PRIORITY_", extra="ignore"
+    )
@@ -1,14 +1,18 @@
 """Step for determining the cause of a product issue."""
 
+import asyncio
 import json
 
 from semantic_kernel import Kernel
-from semantic_kernel.functions import kernel_function
+from semantic_kernel.contents import TextContent
+from semantic_kernel.functions import KernelArguments, kernel_function
 from semantic_kernel.processes.kernel_process import KernelProcessStep, KernelProcessStepContext
 
 from repeated_calls.orchestrator.agents.cause_agent import get_agent
+from repeated_calls.orchestrator.checkpoints import save_checkpoint
 from repeated_calls.orchestrator.entities.state import State
 from repeated_calls.orchestrator.entities.structured_output import CauseResult
+from repeated_calls.orchestrator.settings import StepTimeoutSettings, UpdateCorrelationSettings
 from repeated_calls.prompt_engineering.prompts import CausePrompt
 from repeated_calls.utils.loggers import Logger
 
@@ -28,8 +32,29 @@ class DetermineCauseStep(KernelProcessStep):
         context: KernelProcessStepContext,
         kernel: Kernel,
     ) -> None:
-        """Process function to determine the cause of a product issue."""
-        prompts = CausePrompt(state)
+        """Process function to determine the cause of a product issue, within the step deadline."""
+        try:
+            async with asyncio.timeout(StepTimeoutSettings().cause_s):
+                await self._cause(state, context, kernel)
+        except TimeoutError as e:
+            # The repeated-call result is kept, the cause is undetermined
+            logger.warning(f"Cause step timed out for call event {state.call_event.id}")
+            state.record_incomplete("cause", e)
+            await context.emit_event("TimedOut", data=state)
+        except Exception as e:
+            # The process runtime logs the error and ends the run
+            state.record_incomplete("cause", e)
+            raise
+
+    async def _cause(
+        self,
+        state: State,
+        context: KernelProcessStepContext,
+        kernel: Kernel,
+    ) -> None:
+        """Determine the cause of a product issue."""
+        candidate_updates = await self._get_candidate_updates(state, kernel)
+        prompts = CausePrompt(state, candidate_updates)
 
         agent = get_agent(kernel=kernel, instructions=prompts.get_prompt("system"))
 
@@ -46,6 +71,7 @@ class DetermineCauseStep(KernelProcessStep):
 
         if res.is_relevant:
             # Send event to next step
+            await save_checkpoint(state, "cause")
             await context.emit_event(
                 "IsRelevant",
                 data=state,
@@ -56,3 +82,38 @@ class DetermineCauseStep(KernelProcessStep):
                 "IsNotRelevant",
                 data=state,
             )
+
+    @staticmethod
+    async def _get_candidate_updates(state: State, kernel: Kernel) -> list[dict] | None:
+        """Retrieve the software updates rolled out on the customer's products before the call.
+
+        Returns:
+            The candidate updates, or None if they could not be retrieved. The agent can then still
+            look them up itself.
+        """
+        try:
+            func = kernel.get_function("McpApiKeyPlugin", "get_mcp_api_key")
+            mcp_api_key = (await func.invoke(kernel, KernelArguments())).value
+
+            func = kernel.get_function("OperationsDataPlugin", "get_updates_near")
+            response = await func.invoke(
+                kernel,
+                KernelArguments(
+                    customer_id=state.call_event.customer_id,
+                    at_timestamp=state.call_event.timestamp.isoformat(),
+                    window_days=UpdateCorrelationSettings().window_days,
+                    mcp_api_key=mcp_api_key,
+                ),
+            )
+            raw = response.value
+            if isinstance(raw, list):
+                raw = raw[0]
+            if isinstance(raw, TextContent):
+                raw = raw.text
+            data = json.loads(raw) if isinstance(raw, str) else raw
+            if data.get("error"):
+                raise RuntimeError(data["error"])
+            return data["updates"]
+        except Exception as exc:
+            logger.warning(f"Could not retrieve candidate software updates: {exc}")
+            return None
@@ -1,11 +1,15 @@
 """Step for drafting an offer."""
 
+import asyncio
+
 from semantic_kernel import Kernel
 from semantic_kernel.functions import kernel_function
 from semantic_kernel.processes.kernel_process import KernelProcessStep, KernelProcessStepContext
 
-from repeated_calls.orchestrator.agents.offer_agent import get_agent
+from repeated_calls.orchestrator.agents.offer_agent import get_agent, is_approval
 from repeated_calls.orchestrator.entities.state import State
+from repeated_calls.orchestrator.entities.structured_output import OfferResult
+from repeated_calls.orchestrator.settings import StepTimeoutSettings
 from repeated_calls.prompt_engineering.prompts import RecommendationPrompt
 from repeated_calls.utils.loggers import Logger
 
@@ -22,7 +26,21 @@ class DetermineRecommendationStep(KernelProcessStep):
         context: KernelProcessStepContext,
         kernel: Kernel,
     ) -> None:
-        """Process function to determine the cause of a product issue."""
+        """Process function to draft and review the advice for the CS employee."""
+        try:
+            await self._recommend(state, context, kernel)
+        except Exception as e:
+            # The process runtime logs the error and ends the run
+            state.record_incomplete("recommendation", e)
+            raise
+
+    async def _recommend(
+        self,
+        state: State,
+        context: KernelProcessStepContext,
+        kernel: Kernel,
+    ) -> None:
+        """Draft the advice with the drafter and reviewer agents, within the step deadline."""
         prompts = RecommendationPrompt(state)
 
         chat = get_agent(
@@ -33,14 +51,37 @@ class DetermineRecommendationStep(KernelProcessStep):
 
         # Store all responses
         responses = []
+        advice = None
+        approved = False
 
         await chat.add_chat_message(
             message=prompts.get_prompt("user"),
         )
 
-        async for content in chat.invoke():
-            logger.debug(f">> {content.name.upper()}: {content.content}")
-            # Add the response to our chat history
-            responses.append(f"{content.name}: {content.content}")
+        try:
+            async with asyncio.timeout(StepTimeoutSettings().recommendation_s):
+                async for content in chat.invoke():
+                    logger.debug(f">> {content.name.upper()}: {content.content}")
+                    # Add the response to our chat history
+                    responses.append(f"{content.name}: {content.content}")
+                    # The chat ends after an approval of the reviewer or after its maximum number
+                    # of turns, the last draft is the advice either way
+                    if content.name == "Drafter":
+                        advice = content.content
+                    approved = content.name == "Reviewer" and is_approval(content)
+        except TimeoutError as e:
+            # The last draft, if any, is kept as advice even though it was not approved
+            logger.warning(f"Recommendation step timed out for call event {state.call_event.id}")
+            state.record_incomplete("recommendation", e)
+
+        if advice:
+            state.update(
+                OfferResult(
+                    customer_id=state.call_event.customer_id,
+                    product_id=state.cause_result.product_id,
+                    advice=advice,
+                    approved=approved,
+                )
+            )
 
         await context.emit_event("Exit", data=state)
@@ -1,7 +1,8 @@
 """GetCustomerData step for the process framework."""
 
+import asyncio
 import json
-from datetime import date
+from datetime import date, timedelta
 
 from semantic_kernel import Kernel
 from semantic_kernel.contents import TextContent
@@ -10,8 +11,10 @@ from semantic_kernel.processes.kernel_process import KernelProcessStep, KernelPr
 
 from repeated_calls.database.schemas import Customer, HistoricCallEvent
 from repeated_calls.orchestrator.agents.repeated_call_agent import get_agent
+from repeated_calls.orchestrator.checkpoints import save_checkpoint
 from repeated_calls.orchestrator.entities.state import State
 from repeated_calls.orchestrator.entities.structured_output import RepeatedCallResult
+from repeated_calls.orchestrator.settings import CallHistorySettings, StepTimeoutSettings
 from repeated_calls.prompt_engineering.prompts import RepeatCallerPrompt
 from repeated_calls.utils.loggers import Logger
 
@@ -31,7 +34,26 @@ class DetermineRepeatedCallStep(KernelProcessStep):
         context: KernelProcessStepContext,
         kernel: Kernel,
     ) -> None:
-        """Process function to retrieve customer data and call events using the enhanced database objects."""
+        """Process function to determine whether the call is repeated, within the step deadline."""
+        try:
+            async with asyncio.timeout(StepTimeoutSettings().repeated_call_s):
+                await self._repeated_call(state, context, kernel)
+        except TimeoutError as e:
+            logger.warning(f"Repeated-call step timed out for call event {state.call_event.id}")
+            state.record_incomplete("repeated_call", e)
+            await context.emit_event("TimedOut", data=state)
+        except Exception as e:
+            # The process runtime logs the error and ends the run
+            state.record_incomplete("repeated_call", e)
+            raise
+
+    async def _repeated_call(
+        self,
+        state: State,
+        context: KernelProcessStepContext,
+        kernel: Kernel,
+    ) -> None:
+        """Retrieve customer data and call events using the enhanced database objects."""
         # Check if incoming_message is already the correct type
         # this code below is to 'fix' semantic_kernel.exceptions.kernel_exceptions.KernelException:
         # The function get_call_event on step GetCustomerDataStep has more than one parameter, so a
@@ -42,11 +64,19 @@ class DetermineRepeatedCallStep(KernelProcessStep):
         mcp_api_key_res = await func.invoke(kernel, KernelArguments())
         mcp_api_key = mcp_api_key_res.value
 
-        # Get customer data and historic calls manually
+        # Get customer data and historic calls manually, only the window relevant for repeated calls
+        history_settings = CallHistorySettings()
+        since = state.call_event.timestamp - timedelta(days=history_settings.window_days)
         func = kernel.get_function("CustomerDataPlugin", "get_historic_call_events")
         historic_events_response = await func.invoke(
             kernel,
-            KernelArguments(customer_id=state.call_event.customer_id, mcp_api_key=mcp_api_key),
+            KernelArguments(
+                customer_id=state.call_event.customer_id,
+                mcp_api_key=mcp_api_key,
+                since=since.isoformat(),
+                before=state.call_event.timestamp.isoformat(),
+                limit=history_settings.limit,
+            ),
         )
 
         # --- 1⃣ history ---------------------------------------------------
@@ -132,7 +162,8 @@ class DetermineRepeatedCallStep(KernelProcessStep):
         # Update state
         state.update(customer_obj, historic_events)
 
-        prompts = RepeatCallerPrompt(state)
+        call_stats = await self._get_call_stats(state, kernel, mcp_api_key)
+        prompts = RepeatCallerPrompt(state, call_stats)
 
         agent = get_agent(kernel=kernel, instructions=prompts.get_prompt("system"))
 
@@ -159,6 +190,36 @@ class DetermineRepeatedCallStep(KernelProcessStep):
 
         # Emit event to continue process flow
         if res.is_repeated_call:
+            await save_checkpoint(state, "repeated_call")
             await context.emit_event("IsRepeatedCall", data=state)
         else:
             await context.emit_event("IsNotRepeatedCall", data=state)
+
+    @staticmethod
+    async def _get_call_stats(state: State, kernel: Kernel, mcp_api_key: str) -> dict | None:
+        """Retrieve the call statistics of the customer at the time of the call.
+
+        Returns:
+            The statistics, or None if the customer has no recorded calls or they could not be
+            retrieved.
+        """
+        try:
+            func = kernel.get_function("CustomerDataPlugin", "get_customer_call_stats")
+            response = await func.invoke(
+                kernel,
+                KernelArguments(
+                    customer_id=state.call_event.customer_id,
+                    at_timestamp=state.call_event.timestamp.isoformat(),
+                    mcp_api_key=mcp_api_key,
+                ),
+            )
+            raw = response.value
+            if isinstance(raw, list):
+                raw = raw[0]
+            if isinstance(raw, TextContent):
+                raw = raw.text
+            data = json.loads(raw) if isinstance(raw, str) else raw
+            return data.get("stats")
+        except Exception as exc:
+            logger.warning(f"Could not retrieve call statistics: {exc}")
+            return None
@@ -89,8 +89,14 @@ class _PromptTemplateCollection(ABC):
 class RepeatCallerPrompt(_PromptTemplateCollection):
     """Prompt class for determining repeated calls, managing both system and user prompts."""
 
-    def __init__(self, state: State) -> None:
-        """Initialise the RepeatCallerPrompt with specific templates."""
+    def __init__(self, state: State, call_stats: dict | None = None) -> None:
+        """Initialise the RepeatCallerPrompt with specific templates.
+
+        Args:
+            state (State): The process state.
+            call_stats (dict | None): Call statistics of the customer at the time of the call, or
+                None if they were not retrieved.
+        """
         super().__init__(user="repeat_caller_user.j2", system="repeat_caller_system.j2")
 
         for call in state.call_history:
@@ -102,19 +108,27 @@ class RepeatCallerPrompt(_PromptTemplateCollection):
             call_event=state.call_event,
             call_timestamp=state.call_event.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
             call_history=sorted(state.call_history, key=lambda h: h.start_time, reverse=True),
+            call_stats=call_stats,
         )
 
 
 class CausePrompt(_PromptTemplateCollection):
     """Prompt class for determining the cause of a product issue, managing both system and user prompts."""
 
-    def __init__(self, state: State) -> None:
-        """Initialise the CausePrompt with specific templates."""
+    def __init__(self, state: State, candidate_updates: list[dict] | None = None) -> None:
+        """Initialise the CausePrompt with specific templates.
+
+        Args:
+            state (State): The process state.
+            candidate_updates (list[dict] | None): Software updates rolled out shortly before the
+                call on the customer's products, or None if they were not retrieved.
+        """
         super().__init__(user="cause_user.j2", system="cause_system.j2")
 
         self.update_variables(
             prompt_name="user",
             call_event=state.call_event,
+            candidate_updates=candidate_updates,
         )
 
 
@@ -0,0 +1,115 @@
+"""Backpressure for the receive loop, based on in-flight work and recent overload errors.
+
+A message is in flight from when it is received until it is handled, including while it waits for
+a worker. Receiving stops once `high_water` messages are in flight, or once a large share of the
+recently handled messages failed because a downstream service was overloaded (HTTP 429 or a
+timeout, e.g. from the LLM or an MCP server). It resumes when no more than `low_water` messages
+are in flight and the overload rate has dropped again. Messages that are not received stay in the
+queue unlocked, so during a burst the runs in progress keep their latency instead of all slowing
+down together.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+from repeated_calls.utils.loggers import get_application_logger
+
+logger = get_application_logger(__name__)
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """Return whether `exc`, or an exception it was raised from, signals an overloaded service."""
+    while exc is not None:
+        if getattr(exc, "status_code", None) == 429 or isinstance(exc, TimeoutError):
+            return True
+        if "Timeout" in type(exc).__name__:  # e.g. httpx.ReadTimeout, openai.APITimeoutError
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+class Backpressure:
+    """Decide whether more messages may be received, with hysteresis between two watermarks."""
+
+    def __init__(
+        self,
+        high_water: int,
+        low_water: int,
+        overload_window_s: float = 60.0,
+        max_overload_rate: float = 0.2,
+        min_samples: int = 5,
+    ) -> None:
+        """Initialise the backpressure.
+
+        Args:
+            high_water (int): Number of messages in flight at which receiving stops.
+            low_water (int): Number of messages in flight at or below which receiving resumes.
+            overload_window_s (float): Period over which the overload rate is computed.
+            max_overload_rate (float): Share of the messages handled in the window that failed
+                with an overload error at which receiving stops.
+            min_samples (int): Minimum number of messages handled in the window before the
+                overload rate is taken into account.
+        """
+        if not 0 <= low_water < high_water:
+            raise ValueError("Expected 0 <= low_water < high_water")
+        self.high_water = high_water
+        self.low_water = low_water
+        self.overload_window_s = overload_window_s
+        self.max_overload_rate = max_overload_rate
+        self.min_samples = min_samples
+        self.in_flight = 0
+        self.paused = False
+        self._outcomes: deque[tuple[float, bool]] = deque()  # (finished at, overloaded)
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+
+    def overload_rate(self) -> float:
+        """Return the share of the messages handled in the window that failed with overload."""
+        cutoff = time.monotonic() - self.overload_window_s
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+        if len(self._outcomes) < self.min_samples:
+            return 0.0
+        return sum(overloaded for _, overloaded in self._outcomes) / len(self._outcomes)
+
+    def headroom(self) -> int:
+        """Return the number of messages that may be received before reaching the high water."""
+        return max(self.high_water - self.in_flight, 0)
+
+    def started(self) -> None:
+        """Record that a message was received."""
+        self.in_flight += 1
+        self._update()
+
+    def finished(self, error: BaseException | None = None) -> None:
+        """Record that handling a message finished, with the error it failed with if any."""
+        self.in_flight -= 1
+        self._outcomes.append((time.monotonic(), error is not None and is_overload_error(error)))
+        self._update()
+
+    async def wait(self) -> None:
+        """Wait until receiving may continue."""
+        self._update()
+        while self.paused:
+            try:
+                # Re-evaluate periodically, as old overload errors drop out of the window
+                await asyncio.wait_for(self._resumed.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+            self._update()
+
+    def _update(self) -> None:
+        rate = self.overload_rate()
+        overloaded = rate >= self.max_overload_rate
+        if not self.paused and (self.in_flight >= self.high_water or overloaded):
+            self.paused = True
+            self._resumed.clear()
+            logger.warning(
+                f"Pausing receiving: {self.in_flight} message(s) in flight, "
+                f"overload rate {rate:.0%}"
+            )
+        elif self.paused and self.in_flight <= self.low_water and not overloaded:
+            self.paused = False
+            self._resumed.set()
+            logger.info(f"Resuming receiving: {self.in_flight} message(s) in flight")
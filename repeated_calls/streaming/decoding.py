@@ -0,0 +1,56 @@
+"""Decoding of call events received from a Service Bus queue."""
+
+from azure.servicebus import ServiceBusReceivedMessage
+from azure.servicebus.amqp import AmqpMessageBodyType
+from pydantic import ValidationError
+
+from repeated_calls.database.schemas import CallEvent
+
+
+class MessageDecodeError(ValueError):
+    """Raised when a message does not contain a valid call event."""
+
+
+def message_body(message: ServiceBusReceivedMessage) -> bytes | str | dict:
+    """Return the body of a message, read once according to its AMQP body type.
+
+    Args:
+        message (ServiceBusReceivedMessage): The received message.
+
+    Returns:
+        The concatenated data sections of a `data` body (as sent by `ServiceBusMessage`), or the
+        string, bytes or mapping of a `value` body.
+
+    Raises:
+        MessageDecodeError: If the body is a `sequence` or a `value` of another type.
+    """
+    body_type = message.body_type
+    if body_type == AmqpMessageBodyType.DATA:
+        return b"".join(message.body)
+    if body_type == AmqpMessageBodyType.VALUE:
+        value = message.body
+        if isinstance(value, (bytes, str, dict)):
+            return value
+        raise MessageDecodeError(f"Unsupported value body of type {type(value).__name__}")
+    raise MessageDecodeError(f"Unsupported message body type {body_type}")
+
+
+def decode_call_event(message: ServiceBusReceivedMessage) -> CallEvent:
+    """Decode and validate the call event in a message.
+
+    The JSON body is parsed and validated in a single pass by pydantic.
+
+    Args:
+        message (ServiceBusReceivedMessage): The received message.
+
+    Raises:
+        MessageDecodeError: If the message does not contain a valid call event. Such a message will
+            never be processed and should be dead-lettered.
+    """
+    body = message_body(message)
+    try:
+        if isinstance(body, dict):
+            return CallEvent.model_validate(body)
+        return CallEvent.model_validate_json(body)
+    except ValidationError as exc:
+        raise MessageDecodeError(f"Invalid call event: {exc}") from None
@@ -0,0 +1,147 @@
+"""Batched publishing of messages to a Service Bus queue.
+
+An `AdvicePublisher` keeps a single sender open for its lifetime and groups the published messages
+into `ServiceBusMessageBatch`es: as soon as `batch_size` messages are pending, and otherwise every
+`flush_interval_ms`. A batch is filled up to the maximum batch size of the queue, so the number of
+sends grows with the volume of the messages rather than their count.
+"""
+
+import asyncio
+from collections import deque
+
+from azure.servicebus import ServiceBusMessage, ServiceBusMessageBatch
+from azure.servicebus.aio import ServiceBusClient, ServiceBusSender
+from azure.servicebus.exceptions import MessageSizeExceededError, ServiceBusError
+
+from repeated_calls.streaming.settings import AdvicePublishingSettings
+from repeated_calls.utils.loggers import get_application_logger
+
+logger = get_application_logger(__name__)
+
+
+class AdvicePublisher:
+    """Publish messages to a queue in batches through a long-lived sender.
+
+    Use as an async context manager; leaving the context sends the pending messages.
+    """
+
+    def __init__(
+        self,
+        client: ServiceBusClient,
+        queue: str,
+        settings: AdvicePublishingSettings | None = None,
+    ) -> None:
+        """Initialise the publisher.
+
+        Args:
+            client (ServiceBusClient): The client to create the sender with.
+            queue (str): Name of the queue to publish to.
+            settings (AdvicePublishingSettings | None): The publishing settings. Defaults to the
+                settings from the environment.
+        """
+        self.client = client
+        self.queue = queue
+        self.settings = settings or AdvicePublishingSettings()
+        self._pending: deque[tuple[str, str | None]] = deque()
+        self._full = asyncio.Event()
+        self._closing = False
+        self._lock = asyncio.Lock()
+        self._sender: ServiceBusSender | None = None
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> "AdvicePublisher":
+        """Open the queue sender and start sending in the background."""
+        self._sender = self.client.get_queue_sender(queue_name=self.queue)
+        await self._sender.__aenter__()
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        """Stop sending in the background, send the pending messages and close the sender."""
+        # Let a batch being sent finish, it is no longer pending
+        self._closing = True
+        self._full.set()
+        await self._task
+        await self.flush()
+        await self._sender.close()
+
+    async def publish(self, body: str, message_id: str | None = None) -> None:
+        """Queue a message for the next batch.
+
+        Args:
+            body (str): The message body.
+            message_id (str | None): Optional message ID, lets the queue detect duplicates.
+        """
+        self._pending.append((body, message_id))
+        if len(self._pending) > self.settings.max_pending:
+            self._pending.popleft()
+            logger.warning(f"Publishing buffer full, dropped the oldest message for {self.queue}")
+        if len(self._pending) >= self.settings.batch_size:
+            self._full.set()
+
+    async def flush(self) -> None:
+        """Send all pending messages; a batch that could not be sent is kept for the next flush."""
+        async with self._lock:
+            while self._pending:
+                batch, messages = await self._next_batch()
+                if not messages:
+                    continue
+                try:
+                    sent = await self._send(batch)
+                except asyncio.CancelledError:
+                    # Keep the batch for the final flush, the queue can detect it by message ID
+                    # as a duplicate if it was sent after all
+                    self._pending.extendleft(reversed(messages))
+                    raise
+                if not sent:
+                    self._pending.extendleft(reversed(messages))
+                    return
+
+    async def _next_batch(self) -> tuple[ServiceBusMessageBatch, list[tuple[str, str | None]]]:
+        """Move pending messages into a new batch until it holds `batch_size` or is full."""
+        batch = await self._sender.create_message_batch()
+        messages = []
+        while self._pending and len(messages) < self.settings.batch_size:
+            body, message_id = self._pending[0]
+            try:
+                batch.add_message(
+                    ServiceBusMessage(body, message_id=message_id, content_type="application/json")
+                )
+            except MessageSizeExceededError:
+                if messages:
+                    break  # the batch is full, the message goes into the next one
+                logger.error(f"Dropped message {message_id} exceeding the maximum batch size")
+            else:
+                messages.append((body, message_id))
+            self._pending.popleft()
+        return batch, messages
+
+    async def _send(self, batch: ServiceBusMessageBatch) -> bool:
+        """Send a batch, retrying with exponential backoff. Returns whether it was sent."""
+        for attempt in range(self.settings.retries + 1):
+            try:
+                await self._sender.send_messages(batch)
+                logger.debug(f"Published {len(batch)} message(s) to {self.queue}")
+                return True
+            except ServiceBusError as exc:
+                if attempt == self.settings.retries:
+                    logger.error(f"Publishing {len(batch)} message(s) failed: {exc}")
+                    return False
+                delay = self.settings.retry_backoff_s * 2**attempt
+                logger.warning(f"Publishing to {self.queue} failed ({exc}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+        return False
+
+    async def _run(self) -> None:
+        """Send whenever a batch is full or the flush interval has passed, until closing."""
+        interval = self.settings.flush_interval_ms / 1000
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.error(f"Publishing to {self.queue} failed", exc_info=True)
@@ -0,0 +1,164 @@
+"""Adaptive receive loop for a Service Bus queue.
+
+`receive_loop` asks the receiver for as many messages as there are idle workers and hands each
+message to a worker task. While the queue keeps every receive full the batch size doubles (up to
+`max_batch_size`), so a burst is drained at full speed; once a receive comes back short it drops to
+the number of messages that were available. An empty queue is waited on with a long poll of
+`max_wait_s` on the AMQP link, which uses next to no CPU, and receive errors are retried with
+exponential backoff. An optional `Backpressure` stops receiving while too many received messages
+are not handled yet or downstream services report overload.
+
+With a `priority` function, up to `buffer_size` received messages wait for a worker in a priority
+queue, and the message with the highest priority is handled next. The priority of a waiting message
+grows by `aging_per_s` per second, so messages of a low priority are still handled during a burst.
+The high-water mark of the backpressure should leave room for the buffer, otherwise receiving
+stops as soon as all workers are busy and the queue never holds more than one message to choose
+from.
+
+With a `decode` function, every message is decoded once when it is received, and `priority` and
+`handle` get the decoded body along with the message.
+"""
+
+import asyncio
+import itertools
+import time
+from typing import Any, Awaitable, Callable
+
+from azure.servicebus import ServiceBusReceivedMessage
+from azure.servicebus.aio import AutoLockRenewer, ServiceBusReceiver
+
+from repeated_calls.streaming.backpressure import Backpressure
+from repeated_calls.utils.loggers import get_application_logger
+
+logger = get_application_logger(__name__)
+
+
+async def receive_loop(
+    receiver: ServiceBusReceiver,
+    handle: Callable[..., Awaitable[BaseException | None]],
+    should_stop: Callable[[], bool],
+    concurrency: int = 4,
+    max_batch_size: int = 32,
+    max_wait_s: float = 5.0,
+    error_backoff_s: float = 1.0,
+    max_error_backoff_s: float = 30.0,
+    backpressure: Backpressure | None = None,
+    priority: Callable[..., Awaitable[float]] | None = None,
+    buffer_size: int = 0,
+    aging_per_s: float = 0.0,
+    renewer: AutoLockRenewer | None = None,
+    decode: Callable[[ServiceBusReceivedMessage], Any] | None = None,
+) -> None:
+    """Receive messages and handle them concurrently until `should_stop` returns `True`.
+
+    Args:
+        receiver (ServiceBusReceiver): The receiver to get messages from.
+        handle (Callable): Coroutine function handling (and settling) a single message, called
+            with the message and, with `decode`, its decoded body. An error it raises is logged and
+            reported to `backpressure`. It may also return an error it handled the message with,
+            e.g. of a step of the run that failed, which is only reported to `backpressure`.
+        should_stop (Callable[[], bool]): Checked before every receive.
+        concurrency (int): Maximum number of messages handled at the same time.
+        max_batch_size (int): Maximum number of messages requested in a single receive.
+        max_wait_s (float): Maximum time a receive waits for the first message.
+        error_backoff_s (float): Delay after a failed receive, doubled for every next failure.
+        max_error_backoff_s (float): Maximum delay after a failed receive.
+        backpressure (Backpressure | None): Optional backpressure deciding whether to receive.
+        priority (Callable | None): Optional coroutine function returning the priority of a
+            message, higher is handled first, called like `handle`. It should not raise. Without it
+            messages are handled in the order they were received.
+        buffer_size (int): Maximum number of received messages waiting for a worker.
+        aging_per_s (float): Increase of the priority of a waiting message per second.
+        renewer (AutoLockRenewer | None): Optional lock renewer, keeping the lock of a received
+            message until it is settled.
+        decode (Callable | None): Optional function decoding a received message. It should not
+            raise, e.g. return the error of a message that cannot be decoded instead.
+
+    Messages still waiting or being handled when the loop stops are handled before returning.
+    """
+    slots = asyncio.Semaphore(concurrency + buffer_size)  # messages waiting or being handled
+    waiting: asyncio.PriorityQueue = asyncio.PriorityQueue()
+    order = itertools.count()  # handles messages of the same priority in the order received
+    batch_size = 1
+    backoff = error_backoff_s
+
+    async def work() -> None:
+        while True:
+            *_, message, args = await waiting.get()
+            error = None
+            try:
+                error = await handle(message, *args)
+            except Exception as e:
+                error = e
+                logger.error(
+                    f"Error handling message {message.message_id}: {str(e)}", exc_info=True
+                )
+            finally:
+                waiting.task_done()
+                slots.release()
+                if backpressure:
+                    backpressure.finished(error)
+
+    workers = [asyncio.create_task(work()) for _ in range(concurrency)]
+    try:
+        while not should_stop():
+            limit = batch_size
+            if backpressure:
+                await backpressure.wait()
+                limit = min(limit, backpressure.headroom())
+
+            # Wait for room for a message, then claim the room up to the batch size
+            await slots.acquire()
+            count = 1
+            while count < limit and not slots.locked():
+                await slots.acquire()
+                count += 1
+
+            try:
+                messages = await receiver.receive_messages(
+                    max_message_count=count, max_wait_time=max_wait_s
+                )
+            except Exception as e:
+                for _ in range(count):
+                    slots.release()
+                logger.error(f"Error receiving messages, retrying in {backoff}s: {str(e)}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, max_error_backoff_s)
+                continue
+            backoff = error_backoff_s
+
+            # Release the room claimed for messages that were not there
+            for _ in range(count - len(messages)):
+                slots.release()
+
+            # Grow the batch while the queue fills it, otherwise fall back to what was available
+            if len(messages) == count:
+                batch_size = min(count * 2, max_batch_size)
+            else:
+                batch_size = max(len(messages), 1)
+
+            if renewer:
+                for message in messages:
+                    renewer.register(receiver, message)
+            if backpressure:
+                for _ in messages:
+                    backpressure.started()
+
+            args = [(decode(message),) if decode else () for message in messages]
+            priorities = [0.0] * len(messages)
+            if priority:
+                priorities = await asyncio.gather(
+                    *(priority(message, *a) for message, a in zip(messages, args))
+                )
+
+            # As all waiting messages age at the same rate, ordering them by their priority minus
+            # the aging up to the time they were received orders them by their current priority
+            received_at = time.monotonic()
+            for message, a, message_priority in zip(messages, args, priorities):
+                key = aging_per_s * received_at - message_priority
+                waiting.put_nowait((key, next(order), message, a))
+    finally:
+        await waiting.join()
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -32,3 +32,39 @@ class StreamingSettings(BaseSettings):
     model_config = SettingsConfigDict(
         env_nested_delimiter="__", env_file=".env", env_prefix="AZURE_SERVICEBUS_", extra="ignore"
     )
+
+
+class AdvicePublishingSettings(BaseSettings):
+    """Settings for publishing advice to the advice queue.
+
+    Pydantic will determine the values of all fields in the following order of precedence
+    (descending order of priority):
+    1. Arguments passed to the class constructor
+    2. Environment variables (prefixed with `ADVICE_PUBLISHING_`)
+    3. Variables in a .env file if present (prefixed with `ADVICE_PUBLISHING_`)
+
+    Attributes:
+        enabled (bool): Whether the listener publishes the results of every processed call event
+            to the advice queue. Defaults to `True`.
+        batch_size (int): Number of pending messages that triggers a send. Messages are split over
+            several batches when they exceed the maximum batch size of the queue. Defaults to 100.
+        flush_interval_ms (int): Maximum time a message stays pending before it is sent. Defaults
+            to 200.
+        retries (int): Number of times sending a batch is retried after a Service Bus error.
+            Defaults to 3.
+        retry_backoff_s (float): Delay before the first retry, doubled for every next retry.
+            Defaults to 0.5.
+        max_pending (int): Maximum number of messages kept pending while the queue is
+            unavailable; the oldest are dropped beyond it. Defaults to 1000.
+    """
+
+    enabled: bool = True
+    batch_size: int = 100
+    flush_interval_ms: int = 200
+    retries: int = 3
+    retry_backoff_s: float = 0.5
+    max_pending: int = 1000
+
+    model_config = SettingsConfigDict(
+        env_nested_delimiter="__", env_file=".env", env_prefix="ADVICE_PUBLISHING_", extra="ignore"
+    )
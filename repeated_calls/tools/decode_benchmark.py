@@ -0,0 +1,78 @@
+"""Benchmark of the decoding of call event messages.
+
+Builds Service Bus messages in memory, as the receiver hands them to the listener, and measures how
+many per second `decode_call_event` turns into a `CallEvent`: valid messages with a data body (as
+sent by `ServiceBusMessage`) and a value body, and poison messages that are dead-lettered. For
+comparison it also measures the previous approach of `str(message)`, `json.loads` and building the
+`CallEvent` from the resulting dict.
+
+Example:
+    python -m repeated_calls.tools.decode_benchmark --messages 100000
+"""
+
+import argparse
+import json
+import time
+from typing import Callable
+
+from azure.servicebus import ServiceBusReceivedMessage
+from azure.servicebus._pyamqp.message import Message
+
+from repeated_calls.database.schemas import CallEvent
+from repeated_calls.streaming.decoding import MessageDecodeError, decode_call_event
+
+EVENT = {
+    "id": 1,
+    "customer_id": 7,
+    "sdc": "My AutoMow 3000 stops working",
+    "timestamp": "2024-01-10 10:00:00",
+}
+
+
+def received(**body) -> ServiceBusReceivedMessage:
+    """Return a received message with the given AMQP body (`data` or `value`)."""
+    # Not linked to a receiver, as the messages are only decoded
+    return ServiceBusReceivedMessage(Message(**body), receive_mode="peeklock", receiver=None)
+
+
+def str_json_decode(message: ServiceBusReceivedMessage) -> CallEvent:
+    """Decode a message the way the listener did before `decode_call_event`."""
+    event_data = json.loads(str(message))
+    return CallEvent(
+        id=int(event_data.get("id", -1)),
+        customer_id=int(event_data.get("customer_id", -1)),
+        sdc=event_data.get("sdc", "No description available"),
+        timestamp=event_data.get("timestamp"),
+    )
+
+
+def measure(name: str, decode: Callable, message: ServiceBusReceivedMessage, n: int) -> None:
+    """Decode `message` `n` times and print the throughput."""
+    start = time.perf_counter()
+    for _ in range(n):
+        try:
+            decode(message)
+        except MessageDecodeError:
+            pass
+    elapsed = time.perf_counter() - start
+    print(f"{name:>32}: {n / elapsed:>10,.0f} msg/s ({elapsed / n * 1e6:.2f} µs/msg)")
+
+
+def main(n: int) -> None:
+    """Run the benchmark and print the decode throughput per message kind."""
+    data = received(data=[json.dumps(EVENT).encode()])
+    value = received(value=json.dumps(EVENT))
+    poison = received(data=[b'{"id": "not a number"}'])
+
+    measure("decode_call_event (data body)", decode_call_event, data, n)
+    measure("decode_call_event (value body)", decode_call_event, value, n)
+    measure("decode_call_event (poison)", decode_call_event, poison, n)
+    measure("str + json.loads + CallEvent", str_json_decode, data, n)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Repeated Calls message decoding benchmark")
+    parser.add_argument("--messages", type=int, default=100_000, help="Messages decoded per case")
+    args = parser.parse_args()
+
+    main(args.messages)
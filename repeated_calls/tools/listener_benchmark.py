@@ -0,0 +1,194 @@
+"""Benchmark of the Service Bus receive loop.
+
+Runs the receive loop of the listener against an in-memory receiver that simulates the round trip
+to Service Bus and waits on an empty queue like the real long poll. Reports the throughput when
+draining a burst of messages, and the CPU used while the queue is empty, for the adaptive
+`receive_loop` and the previous loop (receive one message, handle it, sleep 0.1 s).
+
+Moreover, it drains a burst of call events of customers with a mix of CLVs, in the order they were
+received and by `CallPriority` with the backpressure and buffer of the listener, and reports how
+many positions the call events of each CLV moved ahead in the queue on average before they were
+handled (negative if they fell behind).
+
+Example:
+    python -m repeated_calls.tools.listener_benchmark --messages 500 --handle-ms 50
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from types import SimpleNamespace
+
+from azure.servicebus.amqp import AmqpMessageBodyType
+
+from repeated_calls.database.schemas import CallEvent
+from repeated_calls.orchestrator.prioritization import CallPriority
+from repeated_calls.orchestrator.settings import CallPrioritySettings
+from repeated_calls.streaming.backpressure import Backpressure
+from repeated_calls.streaming.backpressure import logger as backpressure_logger
+from repeated_calls.streaming.decoding import decode_call_event
+from repeated_calls.streaming.receiving import receive_loop
+
+
+class FakeReceiver:
+    """In-memory stand-in for `ServiceBusReceiver.receive_messages`."""
+
+    def __init__(self, messages: int | list, round_trip_ms: float) -> None:
+        """Initialise the receiver with `messages` messages, or the given messages, in the queue."""
+        if isinstance(messages, int):
+            messages = [SimpleNamespace(message_id=str(i)) for i in range(messages)]
+        self.queue = deque(messages)
+        self.round_trip_s = round_trip_ms / 1000
+        self.receives = 0
+
+    async def receive_messages(self, max_message_count: int, max_wait_time: float) -> list:
+        """Return up to `max_message_count` messages, waiting `max_wait_time` on an empty queue."""
+        self.receives += 1
+        await asyncio.sleep(self.round_trip_s)
+        if not self.queue:
+            await asyncio.sleep(max_wait_time)
+            return []
+        count = min(max_message_count, len(self.queue))
+        return [self.queue.popleft() for _ in range(count)]
+
+
+async def polling_loop(receiver, handle, should_stop) -> None:
+    """Receive a single message, handle it and sleep 0.1 s, like the previous listener loop."""
+    while not should_stop():
+        for message in await receiver.receive_messages(max_message_count=1, max_wait_time=5):
+            await handle(message)
+        await asyncio.sleep(0.1)
+
+
+async def drain(loop, messages: int, handle_ms: float, round_trip_ms: float, **kwargs) -> None:
+    """Measure the time `loop` takes to handle a burst of `messages`."""
+    receiver = FakeReceiver(messages, round_trip_ms)
+    handled, done = 0, 0.0
+
+    async def handle(message) -> None:
+        nonlocal handled, done
+        await asyncio.sleep(handle_ms / 1000)
+        handled += 1
+        done = time.perf_counter()
+
+    start = time.perf_counter()
+    await loop(receiver, handle, should_stop=lambda: handled >= messages, **kwargs)
+    # Up to the last handled message, the loop may still wait on the empty queue afterwards
+    elapsed = done - start
+    print(
+        f"  drain: {messages / elapsed:8.1f} msg/s ({elapsed:.2f}s, {receiver.receives} receives)"
+    )
+
+
+async def idle(loop, seconds: float, round_trip_ms: float, **kwargs) -> None:
+    """Measure the CPU `loop` uses on an empty queue during `seconds`."""
+    receiver = FakeReceiver(0, round_trip_ms)
+    deadline = time.perf_counter() + seconds
+
+    async def handle(message) -> None:
+        pass
+
+    cpu = time.process_time()
+    start = time.perf_counter()
+    await loop(receiver, handle, should_stop=lambda: time.perf_counter() >= deadline, **kwargs)
+    cpu, elapsed = time.process_time() - cpu, time.perf_counter() - start
+    print(f"  idle:  {cpu / elapsed * 100:8.3f}% CPU ({receiver.receives} receives)")
+
+
+def call_event_message(i: int, clv: str, priority: float) -> SimpleNamespace:
+    """Return a message with a call event, carrying the priority of the CLV of its customer."""
+    call_event = CallEvent(id=i, customer_id=i, sdc="SDC", timestamp=datetime(2025, 1, 1))
+    return SimpleNamespace(
+        message_id=str(i),
+        body_type=AmqpMessageBodyType.DATA,
+        body=[call_event.model_dump_json().encode()],
+        application_properties={b"priority": str(priority).encode()},
+        clv=clv,
+    )
+
+
+async def prioritize(
+    messages: int, handle_ms: float, round_trip_ms: float, concurrency: int, buffer_size: int
+) -> None:
+    """Measure how far the call events of each CLV move ahead in the queue during a burst."""
+    settings = CallPrioritySettings(buffer_size=buffer_size)
+    rng = random.Random(0)
+    clvs = rng.choices(["High", "Med", "Low"], weights=[1, 2, 7], k=messages)
+
+    for name, priority, buffer in [
+        ("in order received", None, 0),
+        (f"by priority (buffer {buffer_size})", CallPriority(settings), buffer_size),
+    ]:
+        receiver = FakeReceiver(
+            [
+                call_event_message(i, clv, settings.clv_priorities[clv])
+                for i, clv in enumerate(clvs)
+            ],
+            round_trip_ms,
+        )
+        moved = defaultdict(list)
+        started = 0
+
+        async def handle(message, call_event) -> None:
+            nonlocal started
+            moved[message.clv].append(call_event.id - started)  # the ID is the queue position
+            started += 1
+            await asyncio.sleep(handle_ms / 1000)
+
+        # The backpressure of the listener, with its default watermarks relative to the concurrency
+        await receive_loop(
+            receiver,
+            handle,
+            should_stop=lambda: started >= messages,
+            concurrency=concurrency,
+            max_wait_s=0.1,
+            backpressure=Backpressure(
+                high_water=concurrency + buffer, low_water=concurrency // 2 + buffer
+            ),
+            priority=priority,
+            buffer_size=buffer,
+            aging_per_s=settings.aging_per_s,
+            decode=decode_call_event,
+        )
+        means = "  ".join(
+            f"{clv} {statistics.mean(moved[clv]):+6.1f}" for clv in ("High", "Med", "Low")
+        )
+        print(f"  {name}: positions moved ahead {means}")
+
+
+async def main(
+    messages: int, handle_ms: float, round_trip_ms: float, concurrency: int, buffer_size: int
+) -> None:
+    """Run the benchmark for both loops and print the results."""
+    print("previous loop (receive 1, handle, sleep 0.1s)")
+    await drain(polling_loop, messages, handle_ms, round_trip_ms)
+    await idle(polling_loop, 10, round_trip_ms)
+
+    print(f"receive_loop (concurrency {concurrency})")
+    await drain(receive_loop, messages, handle_ms, round_trip_ms, concurrency=concurrency)
+    await idle(receive_loop, 10, round_trip_ms, concurrency=concurrency, max_wait_s=5)
+
+    print(f"receive_loop (concurrency {concurrency}), burst of call events")
+    await prioritize(messages, handle_ms, round_trip_ms, concurrency, buffer_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Repeated Calls receive loop benchmark")
+    parser.add_argument("--messages", type=int, default=500, help="Messages in the burst")
+    parser.add_argument("--handle-ms", type=float, default=50, help="Time to handle a message")
+    parser.add_argument("--round-trip-ms", type=float, default=5, help="Round trip of a receive")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrency of receive_loop")
+    parser.add_argument("--buffer-size", type=int, default=16, help="Call events in the buffer")
+    parser.add_argument("--loglevel", default="ERROR", help="Log level of the backpressure")
+    args = parser.parse_args()
+
+    # The backpressure logs every pause during the burst
+    backpressure_logger.setLevel(args.loglevel.upper())
+
+    asyncio.run(
+        main(args.messages, args.handle_ms, args.round_trip_ms, args.concurrency, args.buffer_size)
+    )
@@ -0,0 +1,102 @@
+"""Load test for the MCP data services.
+
+Opens a number of concurrent MCP sessions against a running server and calls a mix of tools in a
+loop. Reports the end-to-end latency as seen by the client and the `query_time_ms` reported by the
+server, so changes to the data access layer (prepared statements, pool sizing, ...) can be compared
+by running the same load against two server configurations.
+
+Example:
+    python -m repeated_calls.tools.mcp_load_test --url http://localhost:8000/sse --sessions 8
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from repeated_calls.mcp_server.common.settings import MCPSettings
+
+CUSTOMER_TOOLS = [
+    ("get_call_event", "customer_id"),
+    ("get_historic_call_events", "customer_id"),
+    ("get_customer_by_id", "customer_id"),
+    ("get_subscriptions", "customer_id"),
+]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the `pct` percentile of `values` (nearest-rank)."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+async def run_session(
+    url: str, customer_ids: list[int], calls: int, mcp_api_key: str, results: dict[str, list]
+) -> None:
+    """Run `calls` tool invocations over a single MCP session."""
+    async with sse_client(url) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            for i in range(calls):
+                name, arg = CUSTOMER_TOOLS[i % len(CUSTOMER_TOOLS)]
+                params = {arg: customer_ids[i % len(customer_ids)], "mcp_api_key": mcp_api_key}
+
+                start = time.perf_counter()
+                resp = await session.call_tool(name, params)
+                results["client_ms"].append((time.perf_counter() - start) * 1000)
+
+                if resp.isError or not resp.content:
+                    results["errors"].append(name)
+                    continue
+                data = json.loads(resp.content[0].text)
+                if "query_time_ms" in data:
+                    results["server_ms"].append(data["query_time_ms"])
+
+
+async def main(url: str, sessions: int, calls: int, customer_ids: list[int]) -> None:
+    """Run the load test and print a latency summary."""
+    mcp_api_key = MCPSettings().mcpapikey.get_secret_value()
+    results = {"client_ms": [], "server_ms": [], "errors": []}
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(run_session(url, customer_ids, calls, mcp_api_key, results) for _ in range(sessions))
+    )
+    elapsed = time.perf_counter() - start
+
+    total = len(results["client_ms"])
+    print(
+        f"{total} calls over {sessions} sessions in {elapsed:.2f}s "
+        f"({total / elapsed:.1f} calls/s)"
+    )
+    print(f"errors: {len(results['errors'])}")
+    for key in ("client_ms", "server_ms"):
+        values = results[key]
+        if not values:
+            continue
+        print(
+            f"{key:>10}: mean={statistics.fmean(values):.2f} p50={percentile(values, 50):.2f} "
+            f"p95={percentile(values, 95):.2f} p99={percentile(values, 99):.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Repeated Calls MCP load test")
+    parser.add_argument(
+        "--url", default="http://localhost:8000/sse", help="SSE endpoint of the MCP server"
+    )
+    parser.add_argument("--sessions", type=int, default=8, help="Number of concurrent MCP sessions")
+    parser.add_argument("--calls", type=int, default=200, help="Tool calls per session")
+    parser.add_argument(
+        "--customers", type=int, nargs="+", default=[7, 22, 1, 2], help="Customer IDs to query"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.url, args.sessions, args.calls, args.customers))
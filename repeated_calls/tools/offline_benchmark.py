@@ -0,0 +1,182 @@
+"""Offline end-to-end benchmark of `run_sequence` and the listener.
+
+Runs call events from the CSV data through `run_sequence`, with the mock model instead of Azure
+OpenAI and the stand-in MCP servers (served by this process over SSE) instead of the real ones. The
+`sequence` benchmark runs the call events with a fixed concurrency. The `listener` benchmark feeds
+them as messages to the receive loop and `handle_message` of the listener, without a writer or
+publisher. Both report the throughput, the time per run and the orchestration overhead: the time
+per run not spent waiting on the model.
+
+The latency and results of the mock model are configured with the `MOCK_MODEL_` settings. No
+database or Application Insights is used, but their settings must be set as the orchestrator reads
+them when it is imported; a dummy connection string works. `CUSTOMER_MCP_URL` and
+`OPERATIONS_MCP_URL` are set to the stand-in servers, overriding those of the environment or an
+.env file. A run that fell back to the CSV plugins in the orchestrator, e.g. because a stand-in
+server did not answer in time, fails the benchmark, as it did not measure the MCP round trips.
+
+Example:
+    MOCK_MODEL_LATENCY_MEAN_MS=500 python -m repeated_calls.tools.offline_benchmark --runs 100
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from collections import deque
+from importlib.resources import files
+from types import SimpleNamespace
+
+from azure.servicebus.amqp import AmqpMessageBodyType
+
+from repeated_calls.database.schemas import CallEvent
+from repeated_calls.orchestrator.main import run_sequence
+from repeated_calls.orchestrator.offline import stand_in_mcp_servers, stats
+from repeated_calls.orchestrator.plugins import circuit_breaker
+from repeated_calls.orchestrator.servicebus_listener import decode_message, handle_message
+from repeated_calls.streaming.receiving import receive_loop
+from repeated_calls.utils.loggers import Logger
+
+
+class InMemoryReceiver:
+    """In-memory stand-in for a `ServiceBusReceiver` on a queue of call events."""
+
+    def __init__(self, call_events: list[CallEvent]) -> None:
+        """Initialise the receiver with a message for each call event in the queue."""
+        self.queue = deque(
+            SimpleNamespace(
+                message_id=str(i),
+                body_type=AmqpMessageBodyType.DATA,
+                body=[call_event.model_dump_json().encode()],
+                application_properties=None,
+            )
+            for i, call_event in enumerate(call_events)
+        )
+        self.settled = {"completed": 0, "abandoned": 0, "dead-lettered": 0}
+
+    async def receive_messages(self, max_message_count: int, max_wait_time: float) -> list:
+        """Return up to `max_message_count` messages, waiting `max_wait_time` on an empty queue."""
+        if not self.queue:
+            await asyncio.sleep(max_wait_time)
+            return []
+        count = min(max_message_count, len(self.queue))
+        return [self.queue.popleft() for _ in range(count)]
+
+    async def complete_message(self, message) -> None:
+        """Count a completed message."""
+        self.settled["completed"] += 1
+
+    async def abandon_message(self, message) -> None:
+        """Count a abandoned message."""
+        self.settled["abandoned"] += 1
+
+    async def dead_letter_message(self, message, **kwargs) -> None:
+        """Count a dead-lettered message."""
+        self.settled["dead-lettered"] += 1
+
+
+def report(name: str, runs: int, elapsed: float, times: list[float]) -> None:
+    """Print the throughput, time per run and orchestration overhead of a benchmark."""
+    times = sorted(times)
+    model_s = stats.latency_s / runs
+    print(
+        f"{name}: {runs / elapsed:7.2f} runs/s ({runs} runs in {elapsed:.1f}s, "
+        f"{stats.requests / runs:.1f} model requests per run)"
+    )
+    if times:
+        print(
+            f"  per run: mean {statistics.mean(times) * 1000:8.1f} ms  "
+            f"p50 {times[len(times) // 2] * 1000:8.1f} ms  "
+            f"p95 {times[int(len(times) * 0.95)] * 1000:8.1f} ms"
+        )
+        print(
+            f"  model latency {model_s * 1000:8.1f} ms per run, "
+            f"overhead {(statistics.mean(times) - model_s) * 1000:8.1f} ms per run"
+        )
+
+
+async def bench_sequence(call_events: list[CallEvent], concurrency: int) -> None:
+    """Run the call events through `run_sequence`, `concurrency` at a time."""
+    slots = asyncio.Semaphore(concurrency)
+    times = []
+
+    async def run(call_event: CallEvent) -> None:
+        async with slots:
+            start = time.perf_counter()
+            await run_sequence(call_event)
+            times.append(time.perf_counter() - start)
+
+    stats.requests, stats.latency_s = 0, 0.0
+    start = time.perf_counter()
+    await asyncio.gather(*(run(call_event) for call_event in call_events))
+    elapsed = time.perf_counter() - start
+    report(f"sequence (concurrency {concurrency})", len(call_events), elapsed, times)
+
+
+async def bench_listener(call_events: list[CallEvent], concurrency: int) -> None:
+    """Handle the call events as messages with the receive loop of the listener."""
+    receiver = InMemoryReceiver(call_events)
+    times = []
+
+    async def handle(message, call_event) -> BaseException | None:
+        start = time.perf_counter()
+        error = await handle_message(receiver, message, call_event)
+        times.append(time.perf_counter() - start)
+        return error
+
+    stats.requests, stats.latency_s = 0, 0.0
+    start = time.perf_counter()
+    await receive_loop(
+        receiver,
+        handle,
+        should_stop=lambda: sum(receiver.settled.values()) >= len(call_events),
+        concurrency=concurrency,
+        max_wait_s=0.1,
+        decode=decode_message,
+    )
+    elapsed = time.perf_counter() - start
+    report(f"listener (concurrency {concurrency})", len(call_events), elapsed, times)
+    print(f"  settled: {json.dumps(receiver.settled)}")
+
+
+async def main(mode: str, runs: int, concurrency: int, customer_port: int, operations_port: int):
+    """Run the benchmarks against the stand-in MCP servers and print the results."""
+    data_path = os.path.join(os.path.dirname(files("repeated_calls")), "data")
+    events = CallEvent.from_csv(os.path.join(data_path, "call_event.csv"))
+    call_events = [events[i % len(events)] for i in range(runs)]
+
+    async with stand_in_mcp_servers(customer_port, operations_port) as (customer, operations):
+        os.environ["CUSTOMER_MCP_URL"], os.environ["OPERATIONS_MCP_URL"] = customer, operations
+        os.environ["MOCK_MODEL_ENABLED"] = "true"
+        # Resuming from the checkpoints of earlier runs of the same call events would skew the runs
+        os.environ["CHECKPOINT_ENABLED"] = "false"
+
+        if mode in ("sequence", "both"):
+            await bench_sequence(call_events, concurrency)
+        if mode in ("listener", "both"):
+            await bench_listener(call_events, concurrency)
+
+    if circuit_breaker.fallback_count:
+        raise RuntimeError(
+            f"{circuit_breaker.fallback_count} MCP connection(s) or tool call(s) fell back to the "
+            "CSV plugins instead of using the stand-in servers, the results are not comparable"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Repeated Calls offline end-to-end benchmark")
+    parser.add_argument("--mode", choices=["sequence", "listener", "both"], default="both")
+    parser.add_argument("--runs", type=int, default=50, help="Call events to process")
+    parser.add_argument("--concurrency", type=int, default=8, help="Runs at the same time")
+    parser.add_argument("--customer-port", type=int, default=8100, help="Stand-in server port")
+    parser.add_argument("--operations-port", type=int, default=8101, help="Stand-in server port")
+    parser.add_argument("--loglevel", default="WARNING", help="Log level of the steps")
+    args = parser.parse_args()
+
+    # The debug logs of the steps would dominate the time per run
+    Logger().setLevel(args.loglevel.upper())
+
+    asyncio.run(
+        main(args.mode, args.runs, args.concurrency, args.customer_port, args.operations_port)
+    )
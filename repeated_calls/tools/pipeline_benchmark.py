@@ -0,0 +1,104 @@
+"""Benchmark of the engines running the steps of the Repeated Calls process.
+
+Runs the steps with the `process` engine (Semantic Kernel process framework) and the `native`
+engine (direct calls) on the same kernel, with the mock model answering without latency and the
+CSV-backed plugins instead of the MCP servers. As both engines run the same step logic, the
+difference of their time per run is the overhead of the process framework.
+
+No database is used, but the database settings must be set as the schemas module reads them.
+
+Example:
+    python -m repeated_calls.tools.pipeline_benchmark --runs 200
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from importlib.resources import files
+from typing import Annotated
+
+from semantic_kernel import Kernel
+from semantic_kernel.functions import KernelPlugin, kernel_function
+
+from repeated_calls.database.schemas import CallEvent
+from repeated_calls.orchestrator.entities.state import State
+from repeated_calls.orchestrator.offline import MockChatCompletion
+from repeated_calls.orchestrator.pipeline import ENGINES
+from repeated_calls.orchestrator.plugins.csv.customer import CustomerDataPlugin
+from repeated_calls.orchestrator.plugins.csv.operations import OperationsDataPlugin
+from repeated_calls.orchestrator.settings import MockModelSettings
+from repeated_calls.utils.loggers import Logger
+
+
+class StaticMcpApiKeyPlugin:
+    """Stand-in for `McpApiKeyPlugin`, the CSV-backed plugins ignore the key."""
+
+    @kernel_function
+    def get_mcp_api_key(self) -> Annotated[str, "Returns the MCP API key."]:
+        """Return a dummy MCP API key."""
+        return "benchmark"
+
+
+def get_kernel(data_path: str) -> Kernel:
+    """Create a kernel with the mock model, without latency, and the CSV-backed plugins."""
+    kernel = Kernel()
+    kernel.add_service(MockChatCompletion(MockModelSettings(latency="constant", latency_mean_ms=0)))
+    kernel.add_plugin(KernelPlugin.from_object("CustomerDataPlugin", CustomerDataPlugin(data_path)))
+    kernel.add_plugin(
+        KernelPlugin.from_object("OperationsDataPlugin", OperationsDataPlugin(data_path))
+    )
+    kernel.add_plugin(StaticMcpApiKeyPlugin(), "McpApiKeyPlugin")
+    return kernel
+
+
+async def bench(engine: str, kernel: Kernel, call_event: CallEvent, runs: int) -> list[float]:
+    """Return the time of each of `runs` runs of `engine` on `call_event`."""
+    times = []
+    for _ in range(runs):
+        state = State.from_call_event(call_event)
+        start = time.perf_counter()
+        await ENGINES[engine](kernel, state, "Start")
+        times.append(time.perf_counter() - start)
+        assert state.offer_result is not None, f"{engine} engine did not complete the run"
+    return times
+
+
+async def main(runs: int, warmup: int) -> None:
+    """Run the benchmark for both engines and print the results."""
+    # Checkpoints are written alike by both engines, they would only add noise
+    os.environ.setdefault("CHECKPOINT_ENABLED", "false")
+
+    data_path = os.path.join(os.path.dirname(files("repeated_calls")), "data")
+    call_event = CallEvent.from_csv(os.path.join(data_path, "call_event.csv"))[0]
+    kernel = get_kernel(data_path)
+
+    means = {}
+    for engine in ENGINES:
+        await bench(engine, kernel, call_event, warmup)
+        times = sorted(await bench(engine, kernel, call_event, runs))
+        means[engine] = statistics.mean(times)
+        print(
+            f"{engine:8} mean {means[engine] * 1000:7.2f} ms  "
+            f"p50 {times[len(times) // 2] * 1000:7.2f} ms  "
+            f"p95 {times[int(len(times) * 0.95)] * 1000:7.2f} ms"
+        )
+    overhead = means["process"] - means["native"]
+    print(
+        f"process framework overhead: {overhead * 1000:.2f} ms per run "
+        f"({overhead / means['process'] * 100:.0f}% of the run without model latency)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser("Repeated Calls pipeline engine benchmark")
+    parser.add_argument("--runs", type=int, default=200, help="Measured runs per engine")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured runs per engine")
+    parser.add_argument("--loglevel", default="WARNING", help="Log level of the steps")
+    args = parser.parse_args()
+
+    # The debug logs of the steps would dominate the time per run
+    Logger().setLevel(args.loglevel.upper())
+
+    asyncio.run(main(args.runs, args.warmup))
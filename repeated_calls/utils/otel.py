@@ -3,8 +3,12 @@
 import logging
 import os
 
-from azure.monitor.opentelemetry.exporter import AzureMonitorLogExporter, AzureMonitorTraceExporter
-from opentelemetry import trace
+from azure.monitor.opentelemetry.exporter import (
+    AzureMonitorLogExporter,
+    AzureMonitorMetricExporter,
+    AzureMonitorTraceExporter,
+)
+from opentelemetry import metrics, trace
 
 # for OpenAI
 from opentelemetry.instrumentation.openai_v2 import OpenAIInstrumentor
@@ -12,6 +16,8 @@ from opentelemetry.instrumentation.openai_v2 import OpenAIInstrumentor
 # For logging
 from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
 from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
@@ -46,6 +52,9 @@ class TelemetrySetup:
         # Set up tracing
         self._setup_tracing()
 
+        # Set up metrics
+        self._setup_metrics()
+
         # Set up logging
         self._setup_logging()
 
@@ -61,6 +70,14 @@ class TelemetrySetup:
         span_processor = BatchSpanProcessor(azure_exporter)
         tracer_provider.add_span_processor(span_processor)
 
+    def _setup_metrics(self):
+        """Configure metric export to Azure Monitor."""
+        metric_reader = PeriodicExportingMetricReader(
+            AzureMonitorMetricExporter(connection_string=self.connection_string)
+        )
+        meter_provider = MeterProvider(resource=self.resource, metric_readers=[metric_reader])
+        metrics.set_meter_provider(meter_provider)
+
     def _setup_logging(self):
         """Configure logging export to Azure Monitor."""
         # Create Azure Monitor log exporter